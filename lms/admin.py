@@ -1,9 +1,80 @@
 from django.contrib import admin
+from django.db.models import F
+from django.urls import reverse
+from django.utils.html import format_html
 
-# Register your models here.
+from . import progress
 from .models import Course, Lesson, Enrollment, Review
+from .pagination import EstimatedCountPaginator
 
-admin.site.register(Course)
-admin.site.register(Lesson)
-admin.site.register(Enrollment)
-admin.site.register(Review)
\ No newline at end of file
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Base for the changelists of tables that grow to millions of rows: no
+    exact COUNT(*) of the whole table (estimated paginator, no "N total"
+    link) and no <select> with every related row in the change forms
+    (subclasses list their foreign keys in ``autocomplete_fields``).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Cada página recorre el índice de la PK hasta llenar el LIMIT en vez de ordenar toda la tabla
+    ordering = ("-id",)
+
+
+def _changelist_link(model, course_id, count):
+    # Filtra por course_id, que está indexado
+    url = reverse(f"admin:lms_{model._meta.model_name}_changelist")
+    return format_html('<a href="{}?course__id__exact={}">{}</a>', url, course_id, count)
+
+
+@admin.register(Course)
+class CourseAdmin(LargeTableAdmin):
+    list_display = ("title", "instructor", "is_published", "price", "enrollments", "reviews", "created_at")
+    list_select_related = ("instructor",)
+    list_filter = ("is_published",)
+    search_fields = ("title", "slug")
+    autocomplete_fields = ("instructor",)
+    prepopulated_fields = {"slug": ("title",)}
+
+    def get_queryset(self, request):
+        # Contadores de CourseStats (un LEFT JOIN) en vez de COUNT sobre inscripciones y reseñas
+        return super().get_queryset(request).annotate(
+            enrollment_total=F("stats__enrollment_count"),
+            review_total=F("stats__review_count"),
+        )
+
+    @admin.display(description="Enrollments", ordering="enrollment_total")
+    def enrollments(self, obj):
+        return _changelist_link(Enrollment, obj.pk, obj.enrollment_total or 0)
+
+    @admin.display(description="Reviews", ordering="review_total")
+    def reviews(self, obj):
+        return _changelist_link(Review, obj.pk, obj.review_total or 0)
+
+
+@admin.register(Lesson)
+class LessonAdmin(LargeTableAdmin):
+    list_display = ("title", "course", "order", "duration_minutes", "updated_at")
+    list_select_related = ("course",)
+    search_fields = ("title",)
+    autocomplete_fields = ("course",)
+
+    def delete_queryset(self, request, queryset):
+        # Un forget_slots por curso en vez de uno por lección borrada
+        progress.delete_lessons(queryset)
+
+
+@admin.register(Enrollment)
+class EnrollmentAdmin(LargeTableAdmin):
+    list_display = ("__str__", "user", "course", "enrolled_at", "is_completed", "completed_lessons")
+    list_select_related = ("user", "course")
+    list_filter = ("is_completed",)
+    autocomplete_fields = ("user", "course")
+
+
+@admin.register(Review)
+class ReviewAdmin(LargeTableAdmin):
+    list_display = ("__str__", "course", "rating", "published_at")
+    list_select_related = ("user", "course")
+    list_filter = ("rating",)
+    autocomplete_fields = ("user", "course")
@@ -0,0 +1,153 @@
+# lms/async_views.py
+"""
+Async variants of the read-heavy catalog views, meant to be served through
+``project.asgi`` (see the ``web-asgi`` service in docker-compose.yaml).
+
+Django's async ORM still sends every query through the same thread-sensitive
+executor, so gathering ORM coroutines interleaves them but does not overlap
+them on the database. With ``LMS_ASYNC_PARALLEL_QUERIES`` the independent
+queries of ``course_detail`` each run in a worker thread with its own
+connection and really overlap; leave it off for SQLite and inside
+transactions (tests), where other connections cannot see uncommitted rows.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.core.paginator import Paginator
+from django.db import close_old_connections
+from django.http import Http404, JsonResponse
+
+from . import cache, catalog, conditional, exports, profiling
+from .models import Course, CourseStats, Enrollment
+from .replicas import use_replica
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def _list_isolated(queryset):
+    try:
+        return list(queryset)
+    finally:
+        close_old_connections()
+
+
+async def fetch(queryset):
+    """
+    Evaluate ``queryset`` without blocking the event loop.
+    """
+    if getattr(settings, "LMS_ASYNC_PARALLEL_QUERIES", False):
+        return await sync_to_async(_list_isolated, thread_sensitive=False)(queryset)
+    return [obj async for obj in queryset]
+
+
+async def cached_fragments(names, vary_on):
+    """
+    Names of the ``{% cache %}`` fragments already stored for ``vary_on``.
+    """
+    try:
+        fragment_cache = caches["template_fragments"]
+    except InvalidCacheBackendError:
+        fragment_cache = caches["default"]
+    keys = {make_template_fragment_key(name, vary_on): name for name in names}
+    found = await fragment_cache.aget_many(list(keys))
+    return {keys[key] for key in found}
+
+
+async def fetch_unless_cached(queryset, cached):
+    # Con el fragmento en caché el queryset llega sin evaluar a la plantilla,
+    # que solo lo ejecuta si el fragmento expira antes de renderizar
+    return queryset if cached else await fetch(queryset)
+
+
+@use_replica
+async def index(request):
+    sort = request.GET.get('sort') if request.GET.get('sort') in catalog.SORTS else catalog.DEFAULT_SORT
+    queryset = catalog.catalog_queryset(sort)
+    paginator = Paginator(queryset, catalog.PAGE_SIZE)
+    paginator.count = await queryset.acount()  # evita el COUNT síncrono dentro de get_page
+    page = paginator.get_page(request.GET.get('page'))
+    page.object_list = [course async for course in page.object_list]
+    context = {
+        'courses': await sync_to_async(catalog.with_content_versions)(page.object_list),
+        'page_obj': page,
+        'sort': sort,
+        'sorts': catalog.SORT_LABELS,
+        'fragment_timeout': cache.fragment_timeout(),
+    }
+    return await sync_to_async(profiling.render)(request, 'index.html', context)
+
+
+@use_replica
+@conditional.conditional_course_page
+async def course_detail(request, slug):
+    """
+    Same page as ``views.course_detail``; lessons, reviews and the enrollment
+    lookup are fetched concurrently once the course is known, skipping the
+    lessons/reviews whose template fragment is already cached.
+    """
+    try:
+        course = await Course.objects.select_related('instructor', 'stats').aget(slug=slug)
+    except Course.DoesNotExist:
+        raise Http404("No Course matches the given query.")
+    user = await request.auser()
+
+    content_version = (await sync_to_async(cache.content_versions)([course.pk]))[course.pk]
+    cached = await cached_fragments(("course_lessons", "course_reviews"), [course.pk, content_version])
+
+    enrollment_query = None
+    if user.is_authenticated:
+        enrollment_query = fetch(Enrollment.objects.filter(user=user, course=course)[:1])
+    lessons, reviews, enrollment = await asyncio.gather(
+        fetch_unless_cached(course.lessons.all().order_by('order', 'id'), "course_lessons" in cached),
+        fetch_unless_cached(course.reviews.all().select_related('user'), "course_reviews" in cached),
+        enrollment_query or asyncio.sleep(0, result=[]),
+    )
+    enrollment = enrollment[0] if enrollment else None
+
+    try:
+        stats = course.stats
+    except CourseStats.DoesNotExist:
+        stats = await sync_to_async(course.get_stats)()
+
+    context = {
+        'course': course,
+        'lessons': lessons,
+        'reviews': reviews,
+        'avg_rating': stats.avg_rating,
+        'total_reviews': stats.review_count,
+        'total_lessons': stats.lesson_count,
+        'is_enrolled': enrollment is not None,
+        'enrollment': enrollment,
+        'is_instructor': user.is_authenticated and user.pk == course.instructor_id,
+        'total_duration': stats.total_duration,
+        'enrollment_count': stats.enrollment_count,
+        'rating_breakdown': stats.rating_breakdown,
+        'content_version': content_version,
+        'fragment_timeout': cache.fragment_timeout(),
+    }
+    return await sync_to_async(profiling.render)(request, 'course_detail.html', context)
+
+
+@use_replica
+async def list_courses(request):
+    """
+    Paginated course catalog as JSON: ``{"count", "courses"}``. Accepts the
+    ``fields``/``since`` params of ``list_courses_ajax`` plus
+    ``offset``/``limit``.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'bad request'}, status=400)
+    try:
+        courses, fields = exports.course_export_query(request.GET)
+        offset = max(int(request.GET.get('offset', 0)), 0)
+        limit = min(max(int(request.GET.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    count = await courses.acount()
+    rows = [row async for row in courses.values(*fields)[offset:offset + limit]]
+    return JsonResponse({'count': count, 'courses': rows})
@@ -0,0 +1,120 @@
+# lms/authentication.py
+"""
+``CachedTokenAuthentication``: DRF token authentication without the
+``Token`` + ``User`` query on every request.
+
+Resolved tokens (with their user) are kept in a bounded in-process LRU and,
+when ``LMS_TOKEN_AUTH_CACHE["CACHE_ALIAS"]`` names a cache, in that shared
+cache too, both for ``TIMEOUT`` seconds. Entries are keyed by a hash of the
+token, never the token itself. Signals in lms/signals.py revoke them when a
+token is deleted or regenerated and when its user is saved (deactivated,
+demoted...): at once in this process and in the shared cache, within
+``TIMEOUT`` in the local LRU of other processes.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+
+DEFAULTS = {"TIMEOUT": 60, "MAX_ENTRIES": 10_000, "CACHE_ALIAS": None}
+KEY_PREFIX = "lms:token:"
+
+
+def _config():
+    return {**DEFAULTS, **getattr(settings, "LMS_TOKEN_AUTH_CACHE", {})}
+
+
+def _cache_key(key):
+    return KEY_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+
+class TokenCache:
+    """
+    Bounded LRU of ``key -> (expires, token)`` in front of an optional shared
+    cache. Callers get copies: a cached user is never shared between requests.
+    """
+
+    def __init__(self, timeout, max_entries, alias=None):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.alias = alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry[1])
+            self._entries.pop(key, None)
+        if self.alias is None:
+            return None
+        token = caches[self.alias].get(_cache_key(key))
+        if token is not None:
+            self._remember(key, copy.deepcopy(token))
+        return token
+
+    def set(self, key, token):
+        self._remember(key, copy.deepcopy(token))
+        if self.alias is not None:
+            caches[self.alias].set(_cache_key(key), token, self.timeout)
+
+    def _remember(self, key, token):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, token)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revoke(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if self.alias is not None and keys:
+            caches[self.alias].delete_many([_cache_key(key) for key in keys])
+
+
+_token_cache = None
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        config = _config()
+        _token_cache = TokenCache(config["TIMEOUT"], config["MAX_ENTRIES"], config["CACHE_ALIAS"])
+    return _token_cache
+
+
+@receiver(setting_changed)
+def _reset_token_cache(setting, **kwargs):
+    global _token_cache
+    if setting == "LMS_TOKEN_AUTH_CACHE":
+        _token_cache = None
+
+
+def revoke(*keys):
+    get_token_cache().revoke(*keys)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    ``TokenAuthentication`` reading resolved tokens from ``TokenCache``. A
+    miss runs the usual query (and its inactive-user/invalid-token errors);
+    only valid tokens of active users are cached.
+    """
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        token = token_cache.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, token)
+        return token.user, token
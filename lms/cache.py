@@ -0,0 +1,208 @@
+# lms/cache.py
+"""
+Response cache for the read-only actions (list/retrieve) of the lms viewsets,
+plus the version numbers of the cached template fragments of course pages.
+
+Cached entries are keyed by path, query params, auth scope and the current
+*version* of every tag the response depends on. Signals in lms/signals.py
+bump those versions on model writes, so stale entries are simply never read
+again and expire on their own. Only get/set/add/incr are used, which keeps it
+compatible with the local-memory and file-based cache backends.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+KEY_PREFIX = "lms:api"
+
+
+def _config():
+    # Se leen en cada llamada para que override_settings y los cambios de settings apliquen
+    return {
+        "CACHE_ALIAS": getattr(settings, "LMS_API_CACHE_ALIAS", "default"),
+        "CACHE_TIMEOUT": getattr(settings, "LMS_API_CACHE_TIMEOUT", 300),
+        "FRAGMENT_TIMEOUT": getattr(settings, "LMS_FRAGMENT_CACHE_TIMEOUT", 3600),
+    }
+
+
+def get_cache():
+    return caches[_config()["CACHE_ALIAS"]]
+
+
+def fragment_timeout():
+    return _config()["FRAGMENT_TIMEOUT"]
+
+
+def object_tag(model_name, pk):
+    return f"{model_name}:{pk}"
+
+
+def list_tag(model_name, scope=None, value=None):
+    if scope:
+        return f"{model_name}:list:{scope}:{value}"
+    return f"{model_name}:list"
+
+
+def _version_key(tag):
+    return f"{KEY_PREFIX}:version:{tag}"
+
+
+def get_version_map(tags):
+    """
+    Current version of each tag, as ``{tag: version}``. Missing versions are
+    initialised with a timestamp so an evicted counter never goes back to a
+    value already used.
+    """
+    cache = get_cache()
+    keys = {_version_key(tag): tag for tag in tags}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        cache.add(key, time.time_ns(), None)
+        found[key] = cache.get(key)
+    return {tag: found[key] for key, tag in keys.items()}
+
+
+def get_versions(tags):
+    versions = get_version_map(tags)
+    return [versions[tag] for tag in sorted(versions, key=_version_key)]
+
+
+def bump(*tags):
+    cache = get_cache()
+    for tag in tags:
+        key = _version_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate_object(model_name, pk, scopes=None):
+    """
+    Invalidate the detail entry of one object, the unscoped list and every
+    scoped list it belongs to, e.g. ``scopes={"course": 3}``.
+    """
+    tags = [object_tag(model_name, pk), list_tag(model_name)]
+    for scope, value in (scopes or {}).items():
+        tags.append(list_tag(model_name, scope, value))
+    bump(*tags)
+
+
+def content_tag(course_id):
+    """
+    Tag of what a course page renders from the course, its lessons and its
+    reviews; enrollments do not touch it, so launches keep the fragments warm.
+    """
+    return f"course:{course_id}:content"
+
+
+def content_versions(course_ids):
+    """
+    ``{course_id: version}`` for the ``{% cache %}`` fragments of course
+    cards and course pages, with one cache round trip.
+    """
+    versions = get_version_map([content_tag(pk) for pk in course_ids])
+    return {pk: versions[content_tag(pk)] for pk in course_ids}
+
+
+def _etag_matches(request, etag):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip() for value in header.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+class CachedResponseMixin:
+    """
+    Viewset mixin that caches ``list``/``retrieve`` payloads and answers
+    ``If-None-Match`` with 304.
+
+    ``cache_list_scope`` names a query param that narrows the list (e.g.
+    ``"course"``), so writes only invalidate the lists they can appear in.
+    ``cache_per_user`` caches per user instead of per anonymous/authenticated.
+    ``cache_timeout`` defaults to ``LMS_API_CACHE_TIMEOUT``.
+    """
+    cache_list_scope = None
+    cache_per_user = False
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_model_name(self):
+        return self.queryset.model._meta.model_name
+
+    def get_cache_tags(self):
+        model_name = self.get_cache_model_name()
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return [object_tag(model_name, self.kwargs[lookup_url_kwarg])]
+        scope = self.cache_list_scope
+        if scope and self.request.query_params.get(scope):
+            return [list_tag(model_name, scope, self.request.query_params[scope])]
+        return [list_tag(model_name)]
+
+    def get_cache_scope(self):
+        user = self.request.user
+        if not user.is_authenticated:
+            return "anon"
+        return f"user:{user.pk}" if self.cache_per_user else "auth"
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return _config()["CACHE_TIMEOUT"]
+
+    def get_cache_key(self):
+        tags = self.get_cache_tags()
+        parts = [
+            self.request.path,
+            self.action,
+            self.get_cache_scope(),
+            sorted(self.request.query_params.lists()),
+            tags,
+            get_versions(tags),
+        ]
+        digest = hashlib.md5(json.dumps(parts, default=str).encode()).hexdigest()
+        return f"{KEY_PREFIX}:response:{digest}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_cache_key()
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            payload = json.dumps(response.data, cls=JSONEncoder).encode()
+            entry = {
+                "data": json.loads(payload),
+                "etag": '"%s"' % hashlib.md5(payload).hexdigest(),
+            }
+            cache.set(key, entry, self.get_cache_timeout())
+        else:
+            response = None
+
+        if _etag_matches(request, entry["etag"]):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif response is None:
+            response = Response(entry["data"])
+        response["ETag"] = entry["etag"]
+        patch_vary_headers(response, ["Cookie", "Authorization"])
+        return response
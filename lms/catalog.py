@@ -0,0 +1,51 @@
+# lms/catalog.py
+"""
+Public course catalog: published courses only, sorted on columns of the
+course table that the partial indexes in ``Course.Meta.indexes`` cover.
+
+``popularity`` and ``rating_avg`` are copies of the CourseStats counters,
+refreshed in batches by the ``sync_sort_keys`` command (and by
+``CourseStats.rebuild``), so no sort aggregates enrollments or reviews at
+request time and no enrollment writes the course row. Every ordering ends
+with ``id`` so the order is total: pages are stable and the keyset cursor
+(lms/pagination.py) carries ``(sort key, id)``.
+"""
+from . import cache
+from .models import Course
+
+SORTS = {
+    "popular": ("-popularity", "-id"),
+    "rating": ("-rating_avg", "-id"),
+    "price": ("price", "id"),
+    "-price": ("-price", "-id"),
+    "newest": ("-created_at", "-id"),
+}
+SORT_LABELS = [
+    ("popular", "Más populares"),
+    ("rating", "Mejor valorados"),
+    ("newest", "Más recientes"),
+    ("price", "Precio: menor a mayor"),
+    ("-price", "Precio: mayor a menor"),
+]
+DEFAULT_SORT = "popular"
+PAGE_SIZE = 24
+
+
+def published_courses():
+    return Course.objects.filter(is_published=True)
+
+
+def catalog_queryset(sort=DEFAULT_SORT):
+    return published_courses().order_by(*SORTS.get(sort, SORTS[DEFAULT_SORT]))
+
+
+def with_content_versions(courses):
+    """
+    Evaluate ``courses`` and tag each with ``content_version``, the key of
+    its cached card fragment in index.html.
+    """
+    courses = list(courses)
+    versions = cache.content_versions([course.pk for course in courses])
+    for course in courses:
+        course.content_version = versions[course.pk]
+    return courses
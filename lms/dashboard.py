@@ -0,0 +1,41 @@
+# lms/dashboard.py
+"""
+The courses a user is enrolled in, with their counters and the user's
+progress, in a single query. Shared by the ``my_courses`` page and
+``/api/dashboard/``.
+
+Counters come from the CourseStats row joined to each course. Courses whose
+row is missing fall back to the correlated subquery aggregates of
+``CourseStats.counter_subqueries``; COALESCE only evaluates them for those
+rows, so the common case stays a plain join.
+"""
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from .models import CourseStats, Enrollment
+
+# Anotación -> contador de CourseStats
+COUNTERS = {
+    "lesson_total": "lesson_count",
+    "duration_total": "total_duration",
+    "enrollment_total": "enrollment_count",
+}
+
+
+def dashboard_enrollments(user):
+    """
+    Enrollments of ``user``, newest first, with ``course``/``course.instructor``
+    loaded and ``lesson_total``, ``duration_total`` and ``enrollment_total``
+    annotated (``progress_percent`` then needs no query).
+    """
+    fallbacks = CourseStats.counter_subqueries(course_ref="course")
+    return (
+        Enrollment.objects.filter(user=user)
+        .select_related("course", "course__instructor")
+        .defer("progress")
+        .annotate(**{
+            name: Coalesce(F(f"course__stats__{counter}"), fallbacks[counter])
+            for name, counter in COUNTERS.items()
+        })
+        .order_by("-enrolled_at", "-id")
+    )
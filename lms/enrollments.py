@@ -0,0 +1,88 @@
+# lms/enrollments.py
+"""
+Enrollment writes that stay correct when thousands of students hit the same
+course at once (launches, flash sales).
+
+``enroll`` is a single ``INSERT ... ON CONFLICT DO NOTHING RETURNING id``: a
+repeated request costs one statement and never raises IntegrityError, where
+``get_or_create`` selects, inserts, catches the error and selects again.
+Courses with a ``capacity`` reserve the seat in the same transaction with a
+conditional UPDATE of ``CourseStats.enrollment_count``, so the counter that
+already exists doubles as the seat count and the course cannot be oversold.
+
+The raw insert skips the Enrollment post_save signal; its side effects
+(stats counter, API cache) are applied here instead. The catalog sort keys
+follow later, in batches (``CourseStats.sync_sort_keys``).
+"""
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import cache
+from .models import CourseStats, Enrollment
+
+
+class CourseFull(Exception):
+    pass
+
+
+def _insert(user_id, course_id, using):
+    """
+    Insert the enrollment unless it exists; returns ``(pk or None, enrolled_at)``.
+    """
+    connection = connections[using]
+    opts = Enrollment._meta
+    quote = connection.ops.quote_name
+    enrolled_at = timezone.now()
+    values = {
+        "user": user_id,
+        "course": course_id,
+        "enrolled_at": enrolled_at,
+        "is_completed": False,
+        "progress": b"",
+        "completed_lessons": 0,
+    }
+    columns = [quote(opts.get_field(name).column) for name in values]
+    params = [opts.get_field(name).get_db_prep_save(value, connection) for name, value in values.items()]
+    sql = (
+        f"INSERT INTO {quote(opts.db_table)} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(params))}) "
+        f"ON CONFLICT ({quote(opts.get_field('user').column)}, {quote(opts.get_field('course').column)}) "
+        f"DO NOTHING RETURNING {quote(opts.pk.column)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    return (row[0] if row else None), enrolled_at
+
+
+def _reserve_seat(course, using):
+    seats = CourseStats.objects.using(using).filter(course_id=course.pk, enrollment_count__lt=course.capacity)
+    if seats.update(enrollment_count=F("enrollment_count") + 1, updated_at=timezone.now()):
+        return True
+    if CourseStats.objects.using(using).filter(course_id=course.pk).exists():
+        return False
+    # Sin fila de stats: el recálculo ya cuenta la inscripción recién insertada
+    return CourseStats.rebuild(course_ids=[course.pk])[0].enrollment_count <= course.capacity
+
+
+def enroll(user, course):
+    """
+    Enroll ``user`` in ``course`` and return ``(enrollment, created)`` like
+    ``get_or_create``. Raises CourseFull (with nothing written) when the
+    course has no seats left.
+    """
+    using = router.db_for_write(Enrollment)
+    with transaction.atomic(using=using):
+        pk, enrolled_at = _insert(user.pk, course.pk, using)
+        if pk is None:
+            return Enrollment.objects.using(using).get(user=user, course=course), False
+        if course.capacity is None:
+            CourseStats.bump(course.pk, enrollment_count=1)
+        elif not _reserve_seat(course, using):
+            raise CourseFull(f"Course {course.pk} has no seats left.")
+    cache.invalidate_object("course", course.pk)
+
+    enrollment = Enrollment(pk=pk, user=user, course=course, enrolled_at=enrolled_at)
+    enrollment._state.adding = False
+    enrollment._state.db = using
+    return enrollment, True
@@ -0,0 +1,74 @@
+# lms/exports.py
+"""
+Incremental JSON / NDJSON encoders for catalog exports.
+
+The queryset is consumed with ``.iterator(chunk_size=...)`` (a server-side
+cursor on PostgreSQL), so memory per request stays constant no matter how
+many courses there are.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Course
+
+COURSE_EXPORT_FIELDS = (
+    "id", "title", "slug", "short_description", "description", "instructor_id",
+    "price", "is_published", "created_at", "updated_at",
+)
+DEFAULT_COURSE_FIELDS = ("id", "title", "description")
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 5000
+
+_encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+def course_export_query(params):
+    """
+    Course queryset and columns for the ``fields``/``since`` query params.
+    Raises ValueError with a client-facing message on invalid input.
+    """
+    fields = DEFAULT_COURSE_FIELDS
+    if params.get("fields"):
+        fields = tuple(dict.fromkeys(f.strip() for f in params["fields"].split(",") if f.strip()))
+        invalid = [f for f in fields if f not in COURSE_EXPORT_FIELDS]
+        if invalid or not fields:
+            raise ValueError(f"invalid fields: {', '.join(invalid)}")
+
+    courses = Course.objects.all()
+    if params.get("since"):
+        since = parse_datetime(params["since"])
+        if since is None:
+            raise ValueError("invalid since")
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        # Orden estable para que el cliente guarde el último updated_at visto
+        courses = courses.filter(updated_at__gt=since).order_by("updated_at", "id")
+    return courses, fields
+
+
+def iter_rows(queryset, fields, chunk_size=DEFAULT_CHUNK_SIZE):
+    return queryset.values(*fields).iterator(chunk_size=chunk_size)
+
+
+def stream_json(rows, key):
+    """
+    Yield ``{"<key>": [row, row, ...]}`` piece by piece.
+    """
+    yield '{"%s": [' % key
+    first = True
+    for row in rows:
+        yield ("" if first else ",") + _encoder.encode(row)
+        first = False
+    yield "]}"
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield _encoder.encode(row) + "\n"
+
+
+def encode(payload):
+    return json.dumps(payload, cls=DjangoJSONEncoder)
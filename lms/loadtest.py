@@ -0,0 +1,333 @@
+# lms/loadtest.py
+"""
+Load-testing harness for the LMS HTTP surface (see ``manage.py loadtest``).
+
+Every scenario is one request template (HTML page or ``/api/`` route) run by
+``concurrency`` workers until ``requests`` responses are collected. In
+process, each worker drives the WSGI handler through a test ``Client`` and
+counts its queries with ``profiling.QueryRecorder``. Against a local server
+(``base_url``), workers use ``requests`` sessions authenticated with a
+session cookie created in the shared database, and queries per request are
+not available. Nothing leaves the machine either way.
+"""
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.utils.crypto import get_random_string
+
+from .models import Course, Enrollment, Lesson, Review
+from .profiling import QueryRecorder
+from .seeding import seed_catalog
+
+SEED_PREFIX = "load"
+# Métricas comparadas contra el baseline: (campo, mayor es mejor)
+COMPARED_METRICS = (("rps", True), ("p95_ms", False), ("queries", False))
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    role: str = "anon"  # anon | student | staff
+    body: object = None
+    params: dict = field(default_factory=dict)
+    headers: dict = field(default_factory=dict)
+    ok: tuple = (200,)
+
+
+def seed(**options):
+    """
+    Seed the synthetic ``load-`` catalog (unless it exists) and the
+    ``load-staff`` user the staff scenarios log in as. ``options`` go to
+    ``seed_catalog``.
+    """
+    if not Course.objects.filter(slug__startswith=f"{SEED_PREFIX}-").exists():
+        seed_catalog(prefix=SEED_PREFIX, **options)
+    User.objects.get_or_create(
+        username=f"{SEED_PREFIX}-staff",
+        defaults={"is_staff": True, "is_superuser": True, "email": f"{SEED_PREFIX}-staff@example.com"},
+    )
+
+
+class Fixtures:
+    """
+    Ids the scenarios pick from, read once from the seeded database. Only
+    ``load-`` courses and users are used: several scenarios write (enroll,
+    progress, lesson reorder and bulk patch), so running against real data
+    is refused instead of falling back to it.
+    """
+
+    def __init__(self, prefix=SEED_PREFIX):
+        self.courses = list(
+            Course.objects.filter(is_published=True, slug__startswith=f"{prefix}-").values_list("pk", "slug")[:200]
+        )
+        self.student = User.objects.filter(username__startswith=f"{prefix}-student-").order_by("pk").first()
+        self.staff = User.objects.filter(username=f"{prefix}-staff").first()
+        if not self.courses or self.student is None or self.staff is None:
+            raise ValueError(f"No seeded '{prefix}-' courses and users to load test; run with --seed.")
+        course_ids = [pk for pk, _ in self.courses]
+        self.lessons = list(Lesson.objects.filter(course_id__in=course_ids).values_list("pk", flat=True)[:500])
+        self.reviews = list(Review.objects.filter(course_id__in=course_ids).values_list("pk", flat=True)[:500])
+        enrollments = Enrollment.objects.filter(user=self.student, course_id__in=course_ids)
+        self.enrollments = list(enrollments.values_list("pk", flat=True))
+        self.progress_enrollment = enrollments.first()
+        if self.progress_enrollment is None:
+            raise ValueError(f"The seeded student has no '{prefix}-' enrollments; run with --seed.")
+        self.progress_lessons = list(
+            Lesson.objects.filter(course_id=self.progress_enrollment.course_id).values_list("pk", flat=True)
+        )
+
+    def course(self, rng):
+        return rng.choice(self.courses)
+
+    def reorder_payload(self, rng):
+        pk, _ = self.course(rng)
+        lessons = list(Lesson.objects.filter(course_id=pk).values_list("pk", flat=True))
+        rng.shuffle(lessons)
+        return {"course": pk, "lessons": lessons}
+
+
+def build_scenarios(fixtures):
+    """
+    Scenarios for the home page, course_detail, my_courses, enroll_course
+    and every ``/api/`` route. Paths and bodies may be callables taking a
+    ``random.Random`` so each request hits a different object.
+    """
+    fx = fixtures
+
+    def course_slug(rng):
+        return fx.course(rng)[1]
+
+    def course_id(rng):
+        return fx.course(rng)[0]
+
+    def pick(values):
+        return lambda rng: rng.choice(values) if values else 0
+
+    enrollment_id = pick(fx.enrollments)
+    xhr = {"X-Requested-With": "XMLHttpRequest"}
+    return [
+        # HTML
+        Scenario("home", "GET", "/"),
+        Scenario("home-sorted", "GET", lambda rng: f"/?sort={rng.choice(['rating', 'price', 'newest'])}&page={rng.randint(1, 3)}"),
+        Scenario("course_detail", "GET", lambda rng: f"/course/{course_slug(rng)}/"),
+        Scenario("course_detail-auth", "GET", lambda rng: f"/course/{course_slug(rng)}/", role="student"),
+        Scenario("my_courses", "GET", "/my-courses/", role="student"),
+        Scenario("enroll_course", "POST", lambda rng: f"/course/{course_slug(rng)}/enroll/", role="student", ok=(302,)),
+        # API
+        Scenario("api-courses", "GET", "/api/courses/"),
+        Scenario("api-courses-sparse", "GET", "/api/courses/", params={"fields": "id,title", "expand": ""}),
+        Scenario("api-courses-search", "GET", "/api/courses/", params={"search": "python django"}),
+        Scenario("api-course-detail", "GET", lambda rng: f"/api/courses/{course_id(rng)}/"),
+        Scenario("api-catalog", "GET", "/api/catalog/", params={"ordering": "-rating_avg"}),
+        Scenario("api-catalog-cursor", "GET", "/api/catalog/", params={"paginate": "cursor"}),
+        Scenario("api-lessons", "GET", "/api/lessons/"),
+        Scenario("api-lessons-by-course", "GET", lambda rng: f"/api/lessons/?course={course_id(rng)}"),
+        Scenario("api-lesson-detail", "GET", lambda rng: f"/api/lessons/{pick(fx.lessons)(rng)}/"),
+        Scenario("api-enrollments", "GET", "/api/enrollments/", role="student"),
+        Scenario("api-enrollment-detail", "GET", lambda rng: f"/api/enrollments/{enrollment_id(rng)}/", role="student"),
+        Scenario("api-enrollments-progress", "GET", "/api/enrollments/progress/", role="student"),
+        Scenario(
+            "api-enrollment-progress-post", "POST", f"/api/enrollments/{fx.progress_enrollment.pk}/progress/",
+            role="student", body=lambda rng: {"lessons": rng.sample(fx.progress_lessons, min(3, len(fx.progress_lessons)))},
+        ),
+        Scenario("api-enrollment-create", "POST", "/api/enrollments/", role="student",
+                 body=lambda rng: {"course": course_id(rng)}, ok=(201, 400)),
+        Scenario("api-reviews", "GET", "/api/reviews/"),
+        Scenario("api-reviews-by-course", "GET", lambda rng: f"/api/reviews/?course={course_id(rng)}"),
+        Scenario("api-review-detail", "GET", lambda rng: f"/api/reviews/{pick(fx.reviews)(rng)}/"),
+        Scenario("api-lessons-reorder", "POST", "/api/lessons/reorder/", role="staff", body=fx.reorder_payload),
+        Scenario("api-lessons-bulk-patch", "PATCH", "/api/lessons/bulk/", role="staff",
+                 body=lambda rng: [{"id": pick(fx.lessons)(rng), "duration_minutes": rng.randint(3, 45)}]),
+        Scenario("api-ajax-courses", "GET", "/api/ajax/courses/", headers=xhr),
+        Scenario("api-ajax-courses-ndjson", "GET", "/api/ajax/courses/", params={"stream": "ndjson"}, headers=xhr),
+        Scenario("api-async-courses", "GET", "/api/async/courses/"),
+        Scenario("api-profiling", "GET", "/api/profiling/", role="staff"),
+    ]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(sample["ms"] for sample in samples)
+    queries = [sample["queries"] for sample in samples if sample["queries"] is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if not sample["ok"]),
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries": round(statistics.mean(queries), 2) if queries else None,
+    }
+
+
+def _host():
+    return next((host for host in settings.ALLOWED_HOSTS if host not in ("*", "")), "localhost").lstrip(".")
+
+
+class InProcessTransport:
+    """
+    WSGI handler through ``django.test.Client``; one client per worker.
+    """
+
+    def __init__(self, users):
+        self.users = users
+        self.local = threading.local()
+
+    def client(self, role):
+        clients = getattr(self.local, "clients", None)
+        if clients is None:
+            clients = self.local.clients = {}
+        if role not in clients:
+            client = Client(HTTP_HOST=_host(), raise_request_exception=False)
+            if self.users.get(role):
+                client.force_login(self.users[role])
+            clients[role] = client
+        return clients[role]
+
+    def request(self, scenario, path, body):
+        client = self.client(scenario.role)
+        headers = {f"HTTP_{key.upper().replace('-', '_')}": value for key, value in scenario.headers.items()}
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            method = getattr(client, scenario.method.lower())
+            if scenario.method == "GET":
+                response = method(path, scenario.params, **headers)
+            else:
+                response = method(path, json.dumps(body) if body is not None else None,
+                                  content_type="application/json", **headers)
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+        return response.status_code, recorder.count
+
+    def close(self):
+        close_old_connections()
+
+
+class HttpTransport:
+    """
+    A running server at ``base_url`` (runserver, uvicorn...). Sessions are
+    created directly in the shared database and CSRF uses a double-submit
+    cookie, so no login form is involved.
+    """
+
+    def __init__(self, base_url, users):
+        import requests  # solo para el modo contra servidor
+
+        self.requests = requests
+        self.base_url = base_url.rstrip("/")
+        self.cookies = {}
+        for role, user in users.items():
+            if user is not None:
+                client = Client()
+                client.force_login(user)
+                self.cookies[role] = client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.local = threading.local()
+
+    def session(self, role):
+        sessions = getattr(self.local, "sessions", None)
+        if sessions is None:
+            sessions = self.local.sessions = {}
+        if role not in sessions:
+            session = self.requests.Session()
+            token = get_random_string(32)
+            session.cookies.set(settings.CSRF_COOKIE_NAME, token)
+            session.headers.update({"X-CSRFToken": token, "Referer": self.base_url + "/"})
+            if role in self.cookies:
+                session.cookies.set(settings.SESSION_COOKIE_NAME, self.cookies[role])
+            sessions[role] = session
+        return sessions[role]
+
+    def request(self, scenario, path, body):
+        response = self.session(scenario.role).request(
+            scenario.method, self.base_url + path, params=scenario.params or None,
+            json=body, headers=scenario.headers, allow_redirects=False, timeout=30,
+        )
+        return response.status_code, None
+
+    def close(self):
+        pass
+
+
+def run_scenario(transport, scenario, requests, concurrency, seed=0):
+    """
+    Send ``requests`` requests for ``scenario`` from ``concurrency`` workers
+    and return the summary. With ``concurrency=1`` everything runs in the
+    calling thread (and its database connection).
+    """
+    def worker(index, count):
+        rng = random.Random(seed * 1000 + index)
+        samples = []
+        try:
+            for _ in range(count):
+                path = scenario.path(rng) if callable(scenario.path) else scenario.path
+                body = scenario.body(rng) if callable(scenario.body) else scenario.body
+                start = time.perf_counter()
+                status, queries = transport.request(scenario, path, body)
+                samples.append({
+                    "ms": (time.perf_counter() - start) * 1000,
+                    "ok": status in scenario.ok,
+                    "status": status,
+                    "queries": queries,
+                })
+        finally:
+            if concurrency > 1:
+                transport.close()
+        return samples
+
+    concurrency = max(1, min(concurrency, requests))
+    base, extra = divmod(requests, concurrency)
+    counts = [base + (1 if i < extra else 0) for i in range(concurrency)]
+    start = time.perf_counter()
+    if concurrency == 1:
+        samples = worker(0, counts[0])
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = [s for chunk in executor.map(worker, range(concurrency), counts) for s in chunk]
+    summary = summarize(samples, time.perf_counter() - start)
+    summary["statuses"] = sorted({sample["status"] for sample in samples})
+    return summary
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Per-scenario deltas against a saved baseline. A metric regresses when it
+    is worse than the baseline by more than ``tolerance``; query counts
+    regress once they grow by a whole query per request (fractional changes
+    are just cache hits shifting between runs).
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            if metric == "queries":
+                regressed = new - old >= 1
+            elif higher_is_better:
+                regressed = change < -tolerance
+            else:
+                regressed = change > tolerance
+            rows.append({"scenario": name, "metric": metric, "baseline": old, "current": new,
+                         "change": round(change * 100, 1), "regressed": regressed})
+    return rows
@@ -0,0 +1,109 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import AsyncClient, Client
+
+from lms.models import Course
+from lms.seeding import seed_catalog
+
+# (etiqueta, vista sync servida por WSGI, variante async servida por ASGI)
+PAIRS = [
+    ("index", "/", "/async/"),
+    ("course_detail", "/course/{slug}/", "/async/course/{slug}/"),
+    ("catalog", "/api/ajax/courses/", "/api/async/courses/?limit=1000"),
+]
+
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the sync views (WSGI handler, thread pool) and their "
+        "async variants (ASGI handler, event loop) on the same data under concurrent load."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300, help="Requests per view and mode.")
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--seed", action="store_true", help="Seed the benchmark catalog first (prefix 'bench').")
+        parser.add_argument("--courses", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["seed"] and not Course.objects.filter(slug__startswith="bench-").exists():
+            self.stdout.write(f"Seeding {options['courses']} courses...")
+            seed_catalog(courses=options["courses"], students=options["courses"], prefix="bench")
+        course = Course.objects.filter(slug__startswith="bench-").first() or Course.objects.first()
+        if course is None:
+            self.stderr.write("No courses to benchmark; run with --seed.")
+            return
+
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ("*", "")), "localhost").lstrip(".")
+        header = f"{'view':<15} {'mode':<5} {'reqs':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for label, sync_path, async_path in PAIRS:
+            results = [
+                ("wsgi", self.run_wsgi(sync_path.format(slug=course.slug), host, options)),
+                ("asgi", self.run_asgi(async_path.format(slug=course.slug), host, options)),
+            ]
+            for mode, row in results:
+                self.stdout.write(
+                    f"{label:<15} {mode:<5} {row['requests']:>6} {row['rps']:>8.1f} {row['p50']:>8.1f} {row['p95']:>8.1f}"
+                )
+
+    def run_wsgi(self, path, host, options):
+        def worker(count):
+            client = Client(HTTP_HOST=host, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+            latencies = []
+            try:
+                for _ in range(count):
+                    start = time.perf_counter()
+                    response = client.get(path)
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200, (path, response.status_code)
+            finally:
+                close_old_connections()
+            return latencies
+
+        counts = self.split(options)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(counts)) as executor:
+            latencies = [value for chunk in executor.map(worker, counts) for value in chunk]
+        return summarize(latencies, time.perf_counter() - start)
+
+    def run_asgi(self, path, host, options):
+        async def worker(count):
+            client = AsyncClient(headers={"host": host})
+            latencies = []
+            for _ in range(count):
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, (path, response.status_code)
+            return latencies
+
+        async def run():
+            chunks = await asyncio.gather(*(worker(count) for count in self.split(options)))
+            return [value for chunk in chunks for value in chunk]
+
+        start = time.perf_counter()
+        latencies = asyncio.run(run())
+        return summarize(latencies, time.perf_counter() - start)
+
+    def split(self, options):
+        concurrency = max(1, min(options["concurrency"], options["requests"]))
+        base, extra = divmod(options["requests"], concurrency)
+        return [base + (1 if i < extra else 0) for i in range(concurrency)]
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lms import query_audit
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the registered hot querysets (lms.query_audit) and flag sequential scans over large tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=int, default=10_000, help="Flag scans over tables with more rows than this.")
+        parser.add_argument("--only", default="", help="Only the querysets whose name contains this text.")
+        parser.add_argument("--plans", action="store_true", help="Print the full plan of every queryset.")
+        parser.add_argument("--fail-on-scan", action="store_true", help="Exit with an error when a scan is flagged.")
+
+    def handle(self, *args, **options):
+        queries = {name: qs for name, qs in query_audit.registered_queries().items() if options["only"] in name}
+        flagged = 0
+        for name, scans in query_audit.audit(options["threshold"], queries):
+            if scans:
+                flagged += 1
+                tables = ", ".join(f"{table} (~{rows} rows)" for table, rows in scans)
+                self.stdout.write(self.style.WARNING(f"SEQ SCAN  {name}: {tables}"))
+            else:
+                self.stdout.write(f"ok        {name}")
+            if options["plans"]:
+                for line in queries[name].explain().splitlines():
+                    self.stdout.write(f"    {line}")
+        self.stdout.write(f"{len(queries)} querysets, {flagged} with sequential scans over {options['threshold']} rows.")
+        if flagged and options["fail_on_scan"]:
+            raise CommandError(f"{flagged} querysets scan large tables sequentially.")
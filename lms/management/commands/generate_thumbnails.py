@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from lms import thumbnails
+from lms.models import Course
+
+
+class Command(BaseCommand):
+    help = "Generate the resized WebP thumbnail variants for courses that do not have them yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Regenerate (overwrite) the variants of every course with a thumbnail."
+        )
+
+    def handle(self, *args, **options):
+        courses = Course.objects.exclude(thumbnail="").exclude(thumbnail__isnull=True)
+        if not options["force"]:
+            courses = courses.filter(thumbnail_digest="")
+        done = 0
+        for course in courses.iterator():
+            try:
+                thumbnails.generate_variants(course, force=options["force"])
+            except thumbnails.GENERATION_ERRORS as exc:
+                self.stderr.write(f"Course {course.pk}: {exc}")
+            else:
+                done += 1
+        self.stdout.write(self.style.SUCCESS(f"Generated thumbnails for {done} course(s)."))
@@ -0,0 +1,113 @@
+import json
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from lms import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive concurrent load against the HTML pages and every /api/ route, in process "
+        "or against a local server, and compare with a saved baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", action="store_true", help="Seed a synthetic catalog first (prefix 'load').")
+        parser.add_argument("--courses", type=int, default=300)
+        parser.add_argument("--lessons", type=int, default=10, help="Lessons per course.")
+        parser.add_argument("--students", type=int, default=500)
+        parser.add_argument("--enrollments", type=int, default=5, help="Enrollments per student.")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--only", nargs="*", help="Scenario names (prefix match) to run.")
+        parser.add_argument("--url", help="Base URL of a running local server; in process when omitted.")
+        parser.add_argument("--baseline", help="Baseline JSON to compare against.")
+        parser.add_argument("--save", help="Write the results to this JSON file (e.g. a new baseline).")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative change before flagging.")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        # se lee antes de correr por si --save apunta al mismo archivo
+        baseline = self.read_baseline(options["baseline"]) if options["baseline"] else None
+        if options["seed"]:
+            self.stdout.write("Seeding synthetic catalog...")
+            loadtest.seed(
+                courses=options["courses"], lessons_per_course=options["lessons"], students=options["students"],
+                enrollments_per_student=options["enrollments"],
+            )
+        try:
+            fixtures = loadtest.Fixtures()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        users = {"anon": None, "student": fixtures.student, "staff": fixtures.staff}
+        if options["url"]:
+            transport = loadtest.HttpTransport(options["url"], users)
+        else:
+            transport = loadtest.InProcessTransport(users)
+
+        scenarios = loadtest.build_scenarios(fixtures)
+        if options["only"]:
+            scenarios = [s for s in scenarios if any(s.name.startswith(prefix) for prefix in options["only"])]
+
+        header = f"{'scenario':<30} {'reqs':>5} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q/req':>6}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        results = {}
+        for scenario in scenarios:
+            # En proceso todos los workers son el mismo cliente: sin throttling, se mide la app
+            with nullcontext() if options["url"] else override_settings(LMS_THROTTLE_RATES={}):
+                row = results[scenario.name] = loadtest.run_scenario(
+                    transport, scenario, options["requests"], options["concurrency"]
+                )
+            queries = "-" if row["queries"] is None else row["queries"]
+            line = (
+                f"{scenario.name[:30]:<30} {row['requests']:>5} {row['errors']:>4} {row['rps']:>8} "
+                f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} {queries:>6}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row["errors"] else line)
+            if row["errors"]:
+                self.stdout.write(f"    statuses: {row['statuses']}")
+
+        if options["save"]:
+            payload = {
+                "meta": {
+                    "created_at": timezone.now().isoformat(),
+                    "mode": options["url"] or "in-process",
+                    "requests": options["requests"],
+                    "concurrency": options["concurrency"],
+                },
+                "scenarios": results,
+            }
+            Path(options["save"]).write_text(json.dumps(payload, indent=2))
+            self.stdout.write(f"Results saved to {options['save']}")
+
+        if baseline is not None:
+            self.report_comparison(results, baseline, options)
+
+    def read_baseline(self, path):
+        try:
+            return json.loads(Path(path).read_text())
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read baseline: {exc}")
+
+    def report_comparison(self, results, baseline, options):
+        rows = loadtest.compare(results, baseline, tolerance=options["tolerance"])
+        self.stdout.write("")
+        self.stdout.write(f"{'scenario':<30} {'metric':<8} {'baseline':>10} {'current':>10} {'change %':>9}")
+        regressions = 0
+        for row in rows:
+            line = (
+                f"{row['scenario'][:30]:<30} {row['metric']:<8} {row['baseline']:>10} "
+                f"{row['current']:>10} {row['change']:>9}"
+            )
+            if row["regressed"]:
+                regressions += 1
+                line = self.style.ERROR(line + "  REGRESSION")
+            self.stdout.write(line)
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"{regressions} metric(s) regressed beyond the baseline.")
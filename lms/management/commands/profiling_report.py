@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from lms import profiling
+
+
+class Command(BaseCommand):
+    help = "Show the per-endpoint query/latency profile collected by QueryProfilingMiddleware."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--json", action="store_true", help="Print the raw report as JSON.")
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--reset", action="store_true", help="Clear the collected data afterwards.")
+
+    def handle(self, *args, **options):
+        rows = profiling.store.report()[: options["limit"]]
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+        elif not rows:
+            self.stdout.write("No profiling data (is LMS_PROFILING enabled with a shared cache?).")
+        else:
+            header = f"{'endpoint':<45} {'reqs':>6} {'avg q':>7} {'max q':>6} {'dup q':>6} {'sql ms':>8} {'py ms':>8} {'render':>8} {'total':>8}"
+            self.stdout.write(header)
+            self.stdout.write("-" * len(header))
+            for row in rows:
+                self.stdout.write(
+                    f"{row['endpoint'][:45]:<45} {row['requests']:>6} {row['avg_queries']:>7} "
+                    f"{row['max_queries']:>6} {row['duplicate_queries']:>6} {row['avg_sql_ms']:>8} "
+                    f"{row['avg_python_ms']:>8} {row['avg_render_ms']:>8} {row['avg_total_ms']:>8}"
+                )
+                for sql, count in row["duplicates"].items():
+                    self.stdout.write(f"    x{count} {sql[:110]}")
+        if options["reset"]:
+            profiling.store.reset()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from lms.models import CourseStats
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized CourseStats rows from Review, Enrollment and Lesson."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "course_ids", nargs="*", type=int,
+            help="Only rebuild these course ids (default: every course).",
+        )
+
+    def handle(self, *args, **options):
+        course_ids = options["course_ids"] or None
+        stats = CourseStats.rebuild(course_ids=course_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {len(stats)} course(s)."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from lms import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the fallback full-text index (SearchEntry) for courses and lessons. "
+        "PostgreSQL keeps its tsvector columns up to date by itself."
+    )
+
+    def handle(self, *args, **options):
+        if search.is_postgres():
+            self.stdout.write("PostgreSQL search vectors are generated columns; nothing to rebuild.")
+            return
+        for model in search.SEARCH_DOCUMENTS:
+            count = search.rebuild_index(model)
+            self.stdout.write(self.style.SUCCESS(f"Indexed {count} {model._meta.verbose_name_plural}."))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from lms import outbox
+
+
+class Command(BaseCommand):
+    help = "Send queued emails from the outbox in batches over a single SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep polling the outbox instead of exiting once it is drained.",
+        )
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = outbox.send_pending(batch_size=options["batch_size"])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}.")
+            if sent + failed >= options["batch_size"]:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Done: {total_sent} sent, {total_failed} failed."))
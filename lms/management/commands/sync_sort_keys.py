@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from lms.models import CourseStats
+
+
+class Command(BaseCommand):
+    help = "Copy the CourseStats counters onto the catalog sort keys (Course.popularity / rating_avg)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep refreshing instead of exiting after one pass.",
+        )
+        parser.add_argument("--interval", type=float, default=60.0, help="Seconds between passes with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            changed = CourseStats.sync_sort_keys()
+            if changed:
+                self.stdout.write(f"Updated sort keys of {changed} course(s).")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
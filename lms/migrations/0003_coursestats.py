@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_course_stats(apps, schema_editor):
+    Course = apps.get_model('lms', 'Course')
+    CourseStats = apps.get_model('lms', 'CourseStats')
+    Lesson = apps.get_model('lms', 'Lesson')
+    Review = apps.get_model('lms', 'Review')
+    Enrollment = apps.get_model('lms', 'Enrollment')
+
+    stats = {pk: CourseStats(course_id=pk) for pk in Course.objects.values_list('pk', flat=True)}
+    for row in Review.objects.values('course').annotate(n=Count('pk'), total=Sum('rating')).order_by():
+        stats[row['course']].review_count = row['n']
+        stats[row['course']].rating_sum = row['total'] or 0
+    for row in Enrollment.objects.values('course').annotate(n=Count('pk')).order_by():
+        stats[row['course']].enrollment_count = row['n']
+    for row in Lesson.objects.values('course').annotate(n=Count('pk'), total=Sum('duration_minutes')).order_by():
+        stats[row['course']].lesson_count = row['n']
+        stats[row['course']].total_duration = row['total'] or 0
+    CourseStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0002_course_is_published_course_price_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='lms.course')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('enrollment_count', models.PositiveIntegerField(default=0)),
+                ('lesson_count', models.PositiveIntegerField(default=0)),
+                ('total_duration', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'course stats',
+            },
+        ),
+        migrations.RunPython(populate_course_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:52
+
+from django.db import migrations, models
+
+
+# Columnas tsvector generadas (español + inglés) con índice GIN, solo en PostgreSQL.
+# Los demás motores usan la tabla SearchEntry (ver lms/search.py).
+SEARCH_VECTORS = {
+    'lms_course': [('title', 'A'), ('description', 'B')],
+    'lms_lesson': [('title', 'A'), ('content', 'B')],
+}
+
+
+def vector_sql(fields):
+    return ' || '.join(
+        f"setweight(to_tsvector('{config}'::regconfig, coalesce(\"{field}\", '')), '{weight}')"
+        for field, weight in fields
+        for config in ('spanish', 'english')
+    )
+
+
+def add_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, fields in SEARCH_VECTORS.items():
+        schema_editor.execute(
+            f'ALTER TABLE "{table}" ADD COLUMN "search_vector" tsvector '
+            f'GENERATED ALWAYS AS ({vector_sql(fields)}) STORED'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX "{table}_search_vector_gin" ON "{table}" USING gin ("search_vector")'
+        )
+
+
+def remove_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SEARCH_VECTORS:
+        schema_editor.execute(f'ALTER TABLE "{table}" DROP COLUMN IF EXISTS "search_vector"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0003_coursestats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('token', models.CharField(max_length=64)),
+                ('weight', models.FloatField(default=1.0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['label', 'token', 'object_id'], name='lms_searche_label_74ac57_idx'), models.Index(fields=['label', 'object_id'], name='lms_searche_label_e48709_idx')],
+            },
+        ),
+        migrations.RunPython(add_search_vectors, remove_search_vectors),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0005_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='thumbnail_digest',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+def assign_lesson_slots(apps, schema_editor):
+    Course = apps.get_model('lms', 'Course')
+    Lesson = apps.get_model('lms', 'Lesson')
+    # Curso a curso: en memoria solo están las lecciones de uno
+    for course_id in Course.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=2000):
+        lessons = list(Lesson.objects.filter(course_id=course_id).order_by('order', 'id').only('pk'))
+        for slot, lesson in enumerate(lessons):
+            lesson.slot = slot
+        Lesson.objects.bulk_update(lessons, ['slot'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0006_course_thumbnail_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='slot',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(assign_lesson_slots, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='lesson',
+            unique_together={('course', 'order'), ('course', 'slot')},
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='progress',
+            field=models.BinaryField(default=bytes, editable=False),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lessons',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_sort_keys(apps, schema_editor):
+    Course = apps.get_model('lms', 'Course')
+    CourseStats = apps.get_model('lms', 'CourseStats')
+    courses = []
+    for stats in CourseStats.objects.all().iterator(chunk_size=2000):
+        rating = stats.rating_sum / stats.review_count if stats.review_count else 0
+        courses.append(Course(pk=stats.course_id, popularity=stats.enrollment_count, rating_avg=rating))
+    Course.objects.bulk_update(courses, ['popularity', 'rating_avg'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0007_lesson_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='popularity',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_sort_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-popularity', '-id'], name='course_catalog_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-rating_avg', '-id'], name='course_catalog_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['price', 'id'], name='course_catalog_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-created_at', '-id'], name='course_catalog_newest_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:18
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_histogram(apps, schema_editor):
+    CourseStats = apps.get_model('lms', 'CourseStats')
+    Review = apps.get_model('lms', 'Review')
+    counts = Review.objects.order_by().values_list('course_id', 'rating').annotate(total=Count('pk'))
+    stats = {}
+    for course_id, rating, total in counts.iterator(chunk_size=2000):
+        row = stats.setdefault(course_id, CourseStats(course_id=course_id))
+        setattr(row, f'rating_{rating}', total)
+    existing = set(CourseStats.objects.filter(course_id__in=stats).values_list('course_id', flat=True))
+    CourseStats.objects.bulk_update(
+        [row for course_id, row in stats.items() if course_id in existing],
+        [f'rating_{rating}' for rating in range(1, 6)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0009_course_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='coursestats',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_histogram, migrations.RunPython.noop),
+    ]
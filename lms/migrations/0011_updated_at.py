@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:02
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Sin historial de ediciones: la última modificación conocida es la creación
+    apps.get_model('lms', 'Lesson').objects.update(updated_at=F('created_at'))
+    apps.get_model('lms', 'Review').objects.update(updated_at=F('published_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0010_rating_histogram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursestats',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['course', '-updated_at'], name='lesson_course_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['course', '-updated_at'], name='review_course_updated_idx'),
+        ),
+    ]
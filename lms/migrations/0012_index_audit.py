@@ -0,0 +1,107 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# En PostgreSQL el índice (user, -enrolled_at) guarda también las columnas que leen
+# my_courses, /api/dashboard/ y el progreso por usuario, para escaneos index-only.
+# INCLUDE no existe en SQLite, por eso no está en Meta.indexes.
+ENROLLMENT_INDEX = 'enrollment_user_recent_idx'
+ENROLLMENT_COLUMNS = '"user_id", "enrolled_at" DESC'
+
+
+def cover_enrollment_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{ENROLLMENT_INDEX}"')
+    schema_editor.execute(
+        f'CREATE INDEX "{ENROLLMENT_INDEX}" ON "lms_enrollment" ({ENROLLMENT_COLUMNS}) '
+        f'INCLUDE ("course_id", "completed_lessons", "is_completed")'
+    )
+
+
+def uncover_enrollment_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{ENROLLMENT_INDEX}"')
+    schema_editor.execute(f'CREATE INDEX "{ENROLLMENT_INDEX}" ON "lms_enrollment" ({ENROLLMENT_COLUMNS})')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0011_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['-created_at'], name='course_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['instructor', '-created_at'], name='course_instructor_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['updated_at', 'id'], name='course_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['user', '-enrolled_at'], name='enrollment_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['-enrolled_at'], name='enrollment_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(condition=models.Q(('completed_lessons__gt', 0)), fields=['course', 'id'], name='enrollment_progress_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['order', 'id'], name='lesson_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['created_at'], name='lesson_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['course', '-published_at'], name='review_course_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-published_at'], name='review_recent_idx'),
+        ),
+        migrations.RunPython(cover_enrollment_index, uncover_enrollment_index),
+        # Los índices propios de estas FK quedan cubiertos por los compuestos de arriba
+        migrations.AlterField(
+            model_name='course',
+            name='instructor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='courses_taught', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='enrollment',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='lesson',
+            name='course',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='lessons', to='lms.course'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='course',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='lms.course'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
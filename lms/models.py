@@ -1,8 +1,13 @@
 # lms/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.text import slugify
 
+from . import cache
+
 class Course(models.Model):
     title = models.CharField(max_length=200)
     # Slug único para URLs amigables (ej: /curso/aprende-django/)
@@ -11,20 +16,51 @@ class Course(models.Model):
     short_description = models.CharField(max_length=150, blank=True) 
     description = models.TextField(blank=True)
     
-    instructor = models.ForeignKey(User, on_delete=models.CASCADE, related_name="courses_taught")
+    # Sin índice propio: lo cubre course_instructor_recent_idx
+    instructor = models.ForeignKey(User, on_delete=models.CASCADE, related_name="courses_taught", db_index=False)
     
     thumbnail = models.ImageField(upload_to='courses/thumbnails/', blank=True, null=True)
+    # Hash del original; las variantes WebP viven en courses/thumbnails/derived/<digest>/ (ver lms/thumbnails.py)
+    thumbnail_digest = models.CharField(max_length=64, blank=True, editable=False)
     
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     
     # Control de visibilidad
     is_published = models.BooleanField(default=False)
+
+    # Cupo máximo de alumnos; vacío = sin límite (ver lms/enrollments.py)
+    capacity = models.PositiveIntegerField(null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Claves de orden del catálogo, copiadas de CourseStats para poder indexarlas (ver lms/catalog.py)
+    popularity = models.PositiveIntegerField(default=0, editable=False)
+    rating_avg = models.FloatField(default=0, editable=False)
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Parciales: el catálogo solo lista cursos publicados
+            models.Index(
+                fields=["-popularity", "-id"], condition=models.Q(is_published=True), name="course_catalog_popular_idx"
+            ),
+            models.Index(
+                fields=["-rating_avg", "-id"], condition=models.Q(is_published=True), name="course_catalog_rating_idx"
+            ),
+            models.Index(fields=["price", "id"], condition=models.Q(is_published=True), name="course_catalog_price_idx"),
+            models.Index(
+                fields=["-created_at", "-id"], condition=models.Q(is_published=True), name="course_catalog_newest_idx"
+            ),
+            # /api/courses/ (orden por defecto y ?instructor=) y la exportación incremental (?since=)
+            models.Index(fields=["-created_at"], name="course_recent_idx"),
+            models.Index(fields=["instructor", "-created_at"], name="course_instructor_recent_idx"),
+            models.Index(fields=["updated_at", "id"], name="course_updated_idx"),
+            # Filtro "publicado" del admin en el orden de su changelist (-id). Parciales porque
+            # Django filtra booleanos como WHERE "is_published" y SQLite no lo casa con (is_published, id)
+            models.Index(fields=["-id"], condition=models.Q(is_published=True), name="course_admin_published_idx"),
+            models.Index(fields=["-id"], condition=models.Q(is_published=False), name="course_admin_draft_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -34,9 +70,20 @@ class Course(models.Model):
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
 
+    def get_stats(self):
+        """
+        Return the denormalized CourseStats row, rebuilding it if missing.
+        """
+        try:
+            return self.stats
+        except CourseStats.DoesNotExist:
+            self.stats = CourseStats.rebuild(course_ids=[self.pk])[0]
+            return self.stats
+
 
 class Lesson(models.Model):
-    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="lessons")
+    # Sin índice propio: unique (course, order) empieza por course
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="lessons", db_index=False)
     title = models.CharField(max_length=200)
     content = models.TextField(blank=True) # El texto puede ser opcional si es solo video
     
@@ -47,45 +94,317 @@ class Lesson(models.Model):
     duration_minutes = models.PositiveIntegerField(default=0)
     
     order = models.PositiveIntegerField(default=1)
+    # Posición fija del bit de la lección en Enrollment.progress (no cambia al reordenar)
+    slot = models.PositiveIntegerField(null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["order", "id"]
-        unique_together = [("course", "order")]
+        unique_together = [("course", "order"), ("course", "slot")]
+        indexes = [
+            # Última lección modificada de un curso (validadores de lms/conditional.py)
+            models.Index(fields=["course", "-updated_at"], name="lesson_course_updated_idx"),
+            # /api/lessons/ sin filtro (orden por defecto y ?ordering=created_at)
+            models.Index(fields=["order", "id"], name="lesson_order_idx"),
+            models.Index(fields=["created_at"], name="lesson_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.course.title} - {self.title}"
 
+    def save(self, *args, **kwargs):
+        # progress.next_slot bloquea el curso en pre_save: el bloqueo debe durar hasta el INSERT
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class Enrollment(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="enrollments")
+    # Sin índice propio: unique (user, course) empieza por user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="enrollments", db_index=False)
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="enrollments")
     enrolled_at = models.DateTimeField(auto_now_add=True)
     
     # Progreso
     is_completed = models.BooleanField(default=False)
+    # Bitmap de lecciones completadas indexado por Lesson.slot (ver lms/progress.py)
+    progress = models.BinaryField(default=bytes, editable=False)
+    completed_lessons = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         unique_together = [("user", "course")]
+        indexes = [
+            # my_courses, /api/dashboard/ y el progreso por usuario; en PostgreSQL es covering (migración 0012)
+            models.Index(fields=["user", "-enrolled_at"], name="enrollment_user_recent_idx"),
+            # /api/enrollments/
+            models.Index(fields=["-enrolled_at"], name="enrollment_recent_idx"),
+            # progress.forget_slots: solo inscripciones con progreso
+            models.Index(
+                fields=["course", "id"], condition=models.Q(completed_lessons__gt=0), name="enrollment_progress_idx"
+            ),
+            # Filtro "completado" del admin en el orden de su changelist (-id), parciales como en Course
+            models.Index(fields=["-id"], condition=models.Q(is_completed=True), name="enrollment_admin_done_idx"),
+            models.Index(fields=["-id"], condition=models.Q(is_completed=False), name="enrollment_admin_open_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} -> {self.course.title}"
 
+    @property
+    def progress_percent(self):
+        """
+        Share of the course's current lessons completed, 0-100. Uses the
+        ``lesson_total`` annotation of lms/dashboard.py when present, else
+        the CourseStats row, so select_related("course__stats") to avoid a query.
+        """
+        total = getattr(self, "lesson_total", None)
+        if total is None:
+            total = self.course.get_stats().lesson_count
+        if not total:
+            return 0
+        return min(100, round(self.completed_lessons * 100 / total))
+
 
 class Review(models.Model): # Renombrado de Comment a Review para ser más preciso
-    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="reviews")
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reviews")
+    # Sin índices propios: los cubren review_course_recent_idx y unique (user, course)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="reviews", db_index=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reviews", db_index=False)
     comment = models.TextField()
     
     # Calificación de 1 a 5 estrellas
     rating = models.PositiveIntegerField(choices=[(i, i) for i in range(1, 6)], default=5)
     
     published_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-published_at"]
         # Evita que un usuario califique el mismo curso dos veces
         unique_together = [("user", "course")] 
+        indexes = [
+            models.Index(fields=["course", "-updated_at"], name="review_course_updated_idx"),
+            # Reseñas de un curso (ficha y ?course=) y /api/reviews/ sin filtro
+            models.Index(fields=["course", "-published_at"], name="review_course_recent_idx"),
+            models.Index(fields=["-published_at"], name="review_recent_idx"),
+            # Filtro por nota del admin, en el orden de su changelist (-id)
+            models.Index(fields=["rating", "-id"], name="review_admin_rating_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.rating} stars - {self.user.username} on {self.course.title}"
+
+
+class CourseStats(models.Model):
+    """
+    Denormalized per-course counters, kept up to date incrementally by the
+    Review/Enrollment/Lesson signals in lms/signals.py. Use the
+    ``rebuild_course_stats`` management command to recompute from scratch.
+    """
+    course = models.OneToOneField(Course, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    enrollment_count = models.PositiveIntegerField(default=0)
+    lesson_count = models.PositiveIntegerField(default=0)
+    total_duration = models.PositiveIntegerField(default=0)
+    # Histograma de calificaciones: reseñas con 1..5 estrellas
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    # Último cambio de cualquier contador; los UPDATE con F() lo fijan a mano
+    updated_at = models.DateTimeField(auto_now=True)
+
+    RATINGS = range(1, 6)
+
+    class Meta:
+        verbose_name_plural = "course stats"
+
+    def __str__(self):
+        return f"Stats for course #{self.course_id}"
+
+    @property
+    def avg_rating(self):
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 1)
+
+    @staticmethod
+    def rating_field(rating):
+        return f"rating_{rating}"
+
+    @property
+    def histogram(self):
+        return {rating: getattr(self, self.rating_field(rating)) for rating in self.RATINGS}
+
+    @property
+    def rating_breakdown(self):
+        """
+        Histogram rows from 5 to 1 stars with their share of the reviews, for templates.
+        """
+        return [
+            {
+                "rating": rating,
+                "count": count,
+                "percent": round(count * 100 / self.review_count) if self.review_count else 0,
+            }
+            for rating, count in sorted(self.histogram.items(), reverse=True)
+        ]
+
+    @classmethod
+    def bump(cls, course_id, **deltas):
+        """
+        Apply counter deltas (e.g. ``review_count=1, rating_sum=4``) with a
+        single UPDATE. Missing rows are left alone: they are rebuilt lazily by
+        ``Course.get_stats`` and the course may be in the middle of a cascade
+        delete.
+        """
+        updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if updates:
+            cls.objects.filter(course_id=course_id).update(**updates, updated_at=timezone.now())
+
+    @classmethod
+    def sync_sort_keys(cls, course_ids=None):
+        """
+        Copy enrollment_count and the average rating onto
+        ``Course.popularity``/``rating_avg`` with one UPDATE, so the catalog
+        sorts on indexed columns of the course table. Only rows whose keys
+        changed are written; returns how many.
+
+        Not called from ``bump``: writing the course row on every enrollment
+        or review would bring back the contention CourseStats avoids. The
+        ``sync_sort_keys`` command refreshes them in batches. When some key
+        changed, the cached course lists are invalidated.
+        """
+        stats = cls.objects.filter(course=OuterRef("pk"))
+        rating = stats.annotate(
+            value=Case(
+                When(review_count=0, then=Value(0.0)),
+                default=ExpressionWrapper(F("rating_sum") * 1.0 / F("review_count"), output_field=FloatField()),
+                output_field=FloatField(),
+            )
+        ).values("value")[:1]
+        courses = Course.objects.all()
+        if course_ids is not None:
+            courses = courses.filter(pk__in=course_ids)
+        keys = {
+            "popularity": Coalesce(Subquery(stats.values("enrollment_count")[:1]), Value(0)),
+            "rating_avg": Coalesce(Subquery(rating), Value(0.0)),
+        }
+        changed = courses.exclude(**keys).update(**keys)
+        if changed:
+            # Las listas cacheadas del catálogo cambian de orden
+            cache.bump(cache.list_tag("course"))
+        return changed
+
+    @classmethod
+    def counter_subqueries(cls, course_ref="pk"):
+        """
+        ``{counter: expression}`` recomputing each counter from the related
+        tables with a correlated subquery on ``OuterRef(course_ref)``.
+        """
+        def aggregate(model, expression):
+            subquery = (
+                model.objects.filter(course=OuterRef(course_ref))
+                .order_by()
+                .values("course")
+                .annotate(value=expression)
+                .values("value")
+            )
+            return Coalesce(Subquery(subquery), Value(0))
+
+        counters = {
+            "review_count": aggregate(Review, Count("pk")),
+            "rating_sum": aggregate(Review, Sum("rating")),
+            "enrollment_count": aggregate(Enrollment, Count("pk")),
+            "lesson_count": aggregate(Lesson, Count("pk")),
+            "total_duration": aggregate(Lesson, Sum("duration_minutes")),
+        }
+        for rating in cls.RATINGS:
+            counters[cls.rating_field(rating)] = aggregate(Review, Count("pk", filter=Q(rating=rating)))
+        return counters
+
+    @classmethod
+    def rebuild(cls, course_ids=None):
+        """
+        Recompute the stats rows for the given courses (all courses when
+        ``course_ids`` is None) with one aggregate query per related table.
+        """
+        courses = Course.objects.all()
+        if course_ids is not None:
+            courses = courses.filter(pk__in=course_ids)
+
+        counters = cls.counter_subqueries()
+        rows = courses.order_by().annotate(
+            **{f"_{field}": expression for field, expression in counters.items()}
+        ).values_list("pk", *(f"_{field}" for field in counters))
+
+        stats = [cls(course_id=pk, **dict(zip(counters, values))) for pk, *values in rows]
+        cls.objects.bulk_create(
+            stats,
+            update_conflicts=True,
+            unique_fields=["course"],
+            update_fields=[*counters, "updated_at"],
+        )
+        cls.sync_sort_keys(course_ids=course_ids)
+        return stats
+
+
+class SearchEntry(models.Model):
+    """
+    Token table used by lms.search when the database is not PostgreSQL
+    (SQLite in tests and local development). One row per distinct stemmed
+    token of an indexed object.
+    """
+    label = models.CharField(max_length=50)  # ej: "lms.lesson"
+    object_id = models.BigIntegerField()
+    token = models.CharField(max_length=64)
+    weight = models.FloatField(default=1.0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["label", "token", "object_id"]),
+            models.Index(fields=["label", "object_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.label}#{self.object_id}: {self.token}"
+
+
+class OutboundEmail(models.Model):
+    """
+    Email queued for delivery by the ``send_outbox`` worker (lms/outbox.py),
+    so request handlers never block on SMTP.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_SENDING = "sending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENDING, "Sending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    to = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    # Cuándo lo reservó un worker (status "sending"); pasado el timeout se reintenta
+    claimed_at = models.DateTimeField(blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ["next_attempt_at", "id"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
 
     def __str__(self):
-        return f"{self.rating} stars - {self.user.username} on {self.course.title}"
\ No newline at end of file
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,115 @@
+# lms/outbox.py
+"""
+Database-backed outbound email queue.
+
+``enqueue`` only inserts a row; the ``send_outbox`` management command
+claims pending rows in batches and delivers them over a single SMTP
+connection, retrying failures with exponential backoff.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+BATCH_SIZE = getattr(settings, "LMS_OUTBOX_BATCH_SIZE", 50)
+MAX_ATTEMPTS = getattr(settings, "LMS_OUTBOX_MAX_ATTEMPTS", 5)
+RETRY_BASE_SECONDS = getattr(settings, "LMS_OUTBOX_RETRY_BASE_SECONDS", 60)
+CLAIM_TIMEOUT_SECONDS = getattr(settings, "LMS_OUTBOX_CLAIM_TIMEOUT_SECONDS", 600)
+
+
+def enqueue(subject, body, to, from_email=None):
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+    )
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff: base, 2*base, 4*base... after each failed attempt.
+    """
+    return timedelta(seconds=RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+
+
+def claim(batch_size=BATCH_SIZE, now=None):
+    """
+    Mark up to ``batch_size`` due emails as ``sending`` in a short
+    transaction and return them, so SMTP runs without holding row locks.
+    Rows left in ``sending`` for longer than CLAIM_TIMEOUT_SECONDS (a worker
+    that died mid-batch) are due again.
+    """
+    now = now or timezone.now()
+    due = OutboundEmail.objects.filter(
+        Q(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+        | Q(status=OutboundEmail.STATUS_SENDING, claimed_at__lt=now - timedelta(seconds=CLAIM_TIMEOUT_SECONDS))
+    )
+    with transaction.atomic():
+        candidates = due
+        if connection.features.has_select_for_update_skip_locked:
+            # Varios workers pueden correr a la vez sin tomar los mismos correos
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list("pk", flat=True)[:batch_size])
+        # Repetir el filtro: sin SKIP LOCKED otro worker pudo reservarlos entre medias
+        due.filter(pk__in=ids).update(status=OutboundEmail.STATUS_SENDING, claimed_at=now)
+    return list(OutboundEmail.objects.filter(pk__in=ids, status=OutboundEmail.STATUS_SENDING, claimed_at=now))
+
+
+def send_pending(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Deliver one batch of due emails. Returns ``(sent, failed)`` counts.
+
+    The batch is claimed first (see ``claim``); each result is then written
+    on its own, only if the row is still claimed by this worker.
+    """
+    now = timezone.now()
+    batch = claim(batch_size, now)
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    smtp = get_connection(fail_silently=False)
+    try:
+        smtp.open()
+    except Exception as exc:
+        for email in batch:
+            _record_failure(email, exc, now, max_attempts)
+        return 0, len(batch)
+
+    try:
+        for email in batch:
+            message = EmailMessage(email.subject, email.body, email.from_email, email.to, connection=smtp)
+            try:
+                message.send()
+            except Exception as exc:
+                _record_failure(email, exc, now, max_attempts)
+                failed += 1
+            else:
+                _release(email, status=OutboundEmail.STATUS_SENT, sent_at=timezone.now(), last_error="")
+                sent += 1
+    finally:
+        smtp.close()
+    return sent, failed
+
+
+def _release(email, **fields):
+    fields.update(attempts=email.attempts + 1, claimed_at=None)
+    OutboundEmail.objects.filter(
+        pk=email.pk, status=OutboundEmail.STATUS_SENDING, claimed_at=email.claimed_at
+    ).update(**fields)
+
+
+def _record_failure(email, exc, now, max_attempts):
+    attempts = email.attempts + 1
+    fields = {"last_error": f"{type(exc).__name__}: {exc}"}
+    if attempts >= max_attempts:
+        fields["status"] = OutboundEmail.STATUS_FAILED
+    else:
+        fields.update(status=OutboundEmail.STATUS_PENDING, next_attempt_at=now + retry_delay(attempts))
+    _release(email, **fields)
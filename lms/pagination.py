@@ -0,0 +1,220 @@
+# lms/pagination.py
+import binascii
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination, _reverse_ordering
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset (cursor) pagination over the viewset ordering with an ``id``
+    tiebreak. The cursor carries the values of every ordering field of the
+    last (or first) row, plus the ordering it belongs to, and the next page
+    filters past that tuple, so rows that tie on the sort key never fall
+    back to an OFFSET. No COUNT(*) and
+    no OFFSET scans: deep pages cost the same as the first one.
+    """
+    ordering = "-id"
+
+    def get_ordering(self, request, queryset, view):
+        ordering = [
+            "-id" if field == "-pk" else "id" if field == "pk" else field
+            for field in super().get_ordering(request, queryset, view)
+        ]
+        if not any(field.lstrip("-") == "id" for field in ordering):
+            # Desempate estable con la misma dirección que el primer campo
+            ordering.append("-id" if ordering[0].startswith("-") else "id")
+        return tuple(ordering[: next(i for i, field in enumerate(ordering) if field.lstrip("-") == "id") + 1])
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, position = (False, None) if self.cursor is None else (self.cursor.reverse, self.cursor.position)
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position, reverse))
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def position_filter(self, position, reverse):
+        """
+        Rows strictly after ``position`` in the ordering (before it when
+        ``reverse``): ``f1 > p1 OR (f1 = p1 AND f2 > p2) OR ...``.
+        """
+        condition = Q(pk__in=[])
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") != reverse else "gt"
+            equal = {other.lstrip("-"): value for other, value in zip(self.ordering[:index], position)}
+            condition |= Q(**equal, **{f"{name}__{lookup}": position[index]})
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Página vacía de un cursor hacia atrás: seguir desde el mismo punto
+            return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.cursor.position))
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self._get_position_from_instance(self.page[-1], self.ordering)))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.cursor.position))
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self._get_position_from_instance(self.page[0], self.ordering)))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = parse.parse_qs(b64decode(encoded.encode("ascii")).decode("ascii"), keep_blank_values=True)
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+            position = tokens.get("p")
+            ordering = tokens.get("o", [""])[0]
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if position is not None and (ordering != ",".join(self.ordering) or len(position) != len(self.ordering)):
+            # Cursor de otro ordenamiento (p. ej. cambió ?ordering=): sus valores son de otras columnas
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {"r": "1"} if cursor.reverse else {}
+        if cursor.position is not None:
+            tokens["o"] = ",".join(self.ordering)
+            tokens["p"] = list(cursor.position)
+        encoded = b64encode(parse.urlencode(tokens, doseq=True).encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [field.lstrip("-") for field in ordering]
+        if isinstance(instance, dict):
+            return [str(instance[field]) for field in fields]
+        return [str(getattr(instance, field)) for field in fields]
+
+
+class LmsPagination(PageNumberPagination):
+    """
+    Default API pagination. Uses page numbers unless the request asks for
+    keyset mode (``?paginate=cursor`` or a ``cursor`` parameter) or the
+    viewset sets ``pagination_mode = "cursor"``.
+    """
+    mode_query_param = "paginate"
+    cursor_class = KeysetPagination
+
+    def __init__(self):
+        self._cursor_paginator = None
+
+    def use_cursor(self, request, view):
+        mode = request.query_params.get(self.mode_query_param)
+        if mode:
+            return mode == "cursor"
+        if self.cursor_class.cursor_query_param in request.query_params:
+            return True
+        return getattr(view, "pagination_mode", "page") == "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self._cursor_paginator = None
+        if self.use_cursor(request, view):
+            self._cursor_paginator = self.cursor_class()
+            self._cursor_paginator.page_size = self.get_page_size(request)
+            page = self._cursor_paginator.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self._cursor_paginator.display_page_controls
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self._cursor_paginator is not None:
+            return self._cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self._cursor_paginator is not None:
+            return self._cursor_paginator.to_html()
+        return super().to_html()
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Pagination mode: 'page' (default) or 'cursor'.",
+                "schema": {"type": "string", "enum": ["page", "cursor"]},
+            },
+            {
+                "name": self.cursor_class.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_class.cursor_query_description,
+                "schema": {"type": "string"},
+            },
+        ]
+
+
+def estimated_count(queryset):
+    """
+    Row estimate of the queryset's table from the PostgreSQL planner
+    statistics (``pg_class.reltuples``, kept fresh by autovacuum/ANALYZE).
+    None when the queryset is filtered, sliced, distinct or not on
+    PostgreSQL, or when the table was never analyzed.
+    """
+    query = queryset.query
+    if query.where or query.distinct or query.combinator or query.is_sliced:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # -1 = tabla nunca analizada
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists of large tables: only an unfiltered list
+    avoids COUNT(*), counted from ``estimated_count`` once the table is past
+    ``exact_threshold`` rows. Filtered lists (list_filter, search, the
+    course links) still run an exact COUNT(*), so every admin filter needs
+    an index to keep that count off a full scan.
+    """
+    exact_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and estimate > self.exact_threshold:
+            return estimate
+        return super().count
@@ -0,0 +1,281 @@
+# lms/profiling.py
+"""
+Opt-in per-endpoint profiling (``LMS_PROFILING = True``).
+
+``QueryProfilingMiddleware`` records, for every request, the SQL query count
+and time, duplicated query fingerprints (the N+1 signature), view time,
+serializer time (``SerializationTimingMixin``) and response render time, aggregated per URL name / viewset action. Aggregates
+live in-process and are flushed periodically to the Django cache so the
+``profiling_report`` command and the admin-only ``/api/profiling/`` endpoint
+can read them (use a shared cache backend for multi-process servers).
+"""
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django import shortcuts
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+CACHE_ALIAS = getattr(settings, "LMS_PROFILING_CACHE_ALIAS", "default")
+FLUSH_EVERY = getattr(settings, "LMS_PROFILING_FLUSH_EVERY", 50)
+TOP_DUPLICATES = 5
+CACHE_KEY = "lms:profiling:report"
+LOCK_KEY = f"{CACHE_KEY}:lock"
+LOCK_TIMEOUT = 5
+
+_NUMBER_RE = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\?|%s)(?:, (?:\?|%s))*\)")
+
+
+def fingerprint(sql):
+    """
+    Normalise literals so the same query with different ids compares equal.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    return _IN_LIST_RE.sub("IN (...)", sql)
+
+
+class QueryRecorder:
+    """
+    ``connection.execute_wrapper`` hook that counts and times queries.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        return {sql: n for sql, n in self.fingerprints.items() if n > 1}
+
+
+def empty_stats():
+    return {
+        "requests": 0,
+        "queries": 0,
+        "max_queries": 0,
+        "sql_ms": 0.0,
+        "view_ms": 0.0,
+        "serialize_ms": 0.0,
+        "render_ms": 0.0,
+        "total_ms": 0.0,
+        "max_total_ms": 0.0,
+        "duplicate_queries": 0,
+        "duplicates": {},
+    }
+
+
+def merge_stats(into, other):
+    for field in ("requests", "queries", "sql_ms", "view_ms", "serialize_ms", "render_ms", "total_ms", "duplicate_queries"):
+        # .get: informes guardados antes de que existiera el campo
+        into[field] = into.get(field, 0) + other.get(field, 0)
+    into["max_queries"] = max(into["max_queries"], other["max_queries"])
+    into["max_total_ms"] = max(into["max_total_ms"], other["max_total_ms"])
+    duplicates = Counter(into["duplicates"])
+    duplicates.update(other["duplicates"])
+    into["duplicates"] = dict(duplicates.most_common(TOP_DUPLICATES))
+    return into
+
+
+class ProfileStore:
+    """
+    Thread-safe in-process aggregates, flushed into the cache every
+    ``FLUSH_EVERY`` requests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pending_requests = 0
+
+    def record(self, endpoint, recorder, view_ms, render_ms, total_ms, serialize_ms=0.0):
+        duplicates = recorder.duplicates()
+        sample = empty_stats()
+        sample.update(
+            requests=1,
+            queries=recorder.count,
+            max_queries=recorder.count,
+            sql_ms=recorder.duration * 1000,
+            view_ms=view_ms,
+            serialize_ms=serialize_ms,
+            render_ms=render_ms,
+            total_ms=total_ms,
+            max_total_ms=total_ms,
+            duplicate_queries=sum(n - 1 for n in duplicates.values()),
+            duplicates=duplicates,
+        )
+        with self._lock:
+            merge_stats(self._pending.setdefault(endpoint, empty_stats()), sample)
+            self._pending_requests += 1
+            should_flush = self._pending_requests >= FLUSH_EVERY
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Merge the pending aggregates into the shared report. The cache
+        get/set is not atomic, so processes serialise on a ``cache.add``
+        lock; when another one holds it the samples stay pending for the
+        next flush instead of overwriting its write.
+        """
+        with self._lock:
+            pending, self._pending, self._pending_requests = self._pending, {}, 0
+        if not pending:
+            return
+        cache = caches[CACHE_ALIAS]
+        if not cache.add(LOCK_KEY, 1, LOCK_TIMEOUT):
+            with self._lock:
+                for endpoint, stats in pending.items():
+                    merge_stats(self._pending.setdefault(endpoint, empty_stats()), stats)
+                    self._pending_requests += stats["requests"]
+            return
+        try:
+            report = cache.get(CACHE_KEY) or {}
+            for endpoint, stats in pending.items():
+                merge_stats(report.setdefault(endpoint, empty_stats()), stats)
+            cache.set(CACHE_KEY, report, None)
+        finally:
+            cache.delete(LOCK_KEY)
+
+    def report(self):
+        """
+        Aggregated stats per endpoint with averages, worst offenders first.
+        """
+        self.flush()
+        report = caches[CACHE_ALIAS].get(CACHE_KEY) or {}
+        rows = []
+        for endpoint, stats in report.items():
+            requests = stats["requests"] or 1
+            rows.append({
+                "endpoint": endpoint,
+                **stats,
+                "avg_queries": round(stats["queries"] / requests, 2),
+                "avg_sql_ms": round(stats["sql_ms"] / requests, 2),
+                # El tiempo de serialización incluye las queries que dispare (N+1 perezosos)
+                "avg_serialize_ms": round(stats.get("serialize_ms", 0) / requests, 2),
+                "avg_python_ms": round(
+                    max(stats["view_ms"] - stats["sql_ms"] - stats.get("serialize_ms", 0), 0) / requests, 2
+                ),
+                "avg_render_ms": round(stats["render_ms"] / requests, 2),
+                "avg_total_ms": round(stats["total_ms"] / requests, 2),
+            })
+        return sorted(rows, key=lambda row: (row["avg_queries"], row["avg_total_ms"]), reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._pending, self._pending_requests = {}, 0
+        caches[CACHE_ALIAS].delete(CACHE_KEY)
+
+
+store = ProfileStore()
+
+
+def endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return f"{request.method} {request.path}"
+    name = match.view_name or match._func_path
+    actions = getattr(match.func, "actions", None)  # ViewSets de DRF
+    if actions and request.method.lower() in actions:
+        name = f"{name}#{actions[request.method.lower()]}"
+    return f"{request.method} {name}"
+
+
+class SerializationTimingMixin:
+    """
+    Serializer mixin adding the time of the outermost ``to_representation``
+    of a request (nested and per-item calls are not counted twice) to the
+    request's serializer time. No-op unless profiling is on.
+    """
+
+    def to_representation(self, instance):
+        timings = getattr(self.context.get("request"), "_profiling", None)
+        if timings is None or timings.get("serializing"):
+            return super().to_representation(instance)
+        timings["serializing"] = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            timings["serializing"] = False
+            timings["serialize"] = timings.get("serialize", 0.0) + time.perf_counter() - start
+
+
+def render(request, template_name, context=None, **kwargs):
+    """
+    ``django.shortcuts.render`` that reports its time as the request's render
+    time. Function views render eagerly, so ``process_template_response``
+    only sees DRF responses; the HTML views call this instead.
+    """
+    timings = getattr(request, "_profiling", None)
+    if timings is None:
+        return shortcuts.render(request, template_name, context, **kwargs)
+    timings["render_start"] = time.perf_counter()
+    try:
+        return shortcuts.render(request, template_name, context, **kwargs)
+    finally:
+        timings["render_end"] = time.perf_counter()
+
+
+class QueryProfilingMiddleware:
+    """
+    Records query count/time and view/render timings per endpoint. Disabled
+    (removed from the chain) unless ``settings.LMS_PROFILING`` is true.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "LMS_PROFILING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request._profiling = {"render_start": None, "render_end": None}
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        end = time.perf_counter()
+
+        timings = request._profiling
+        view_end = timings["render_start"] or end
+        view_start = timings.get("view_start") or start
+        render_ms = 0.0
+        if timings["render_start"] and timings["render_end"]:
+            render_ms = (timings["render_end"] - timings["render_start"]) * 1000
+        store.record(
+            endpoint_name(request),
+            recorder,
+            view_ms=(view_end - view_start) * 1000,
+            serialize_ms=timings.get("serialize", 0.0) * 1000,
+            render_ms=render_ms,
+            total_ms=(end - start) * 1000,
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._profiling["view_start"] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timings = request._profiling
+        timings["render_start"] = time.perf_counter()
+        response.add_post_render_callback(lambda _: timings.update(render_end=time.perf_counter()))
+        return response
+
@@ -0,0 +1,194 @@
+# lms/progress.py
+"""
+Lesson-level progress stored as one bitmap per enrollment.
+
+Every lesson gets a ``slot`` when it is created (0, 1, 2... within its
+course) that never changes on reorder; bit ``slot`` of
+``Enrollment.progress`` is set once the student completes that lesson. 50
+lessons fit in 7 bytes, so progress costs one small column per enrollment
+instead of one row per (user, lesson). ``Enrollment.completed_lessons``
+keeps the popcount so percentages are read without decoding bitmaps.
+"""
+from django.db import transaction
+from django.db.models import Max
+
+from .models import Course, Enrollment, Lesson
+
+CHUNK_SIZE = 1000
+
+
+def set_bits(bitmap, slots, value=True):
+    data = bytearray(bitmap or b"")
+    if value and slots:
+        needed = max(slots) // 8 + 1
+        if needed > len(data):
+            data.extend(bytes(needed - len(data)))
+    for slot in slots:
+        index, mask = divmod(slot, 8)
+        if index >= len(data):
+            continue
+        if value:
+            data[index] |= 1 << mask
+        else:
+            data[index] &= ~(1 << mask) & 0xFF
+    return bytes(data.rstrip(b"\x00"))
+
+
+def has_bit(bitmap, slot):
+    index, mask = divmod(slot, 8)
+    return index < len(bitmap or b"") and bool(bitmap[index] & (1 << mask))
+
+
+def count_bits(bitmap):
+    return int.from_bytes(bitmap or b"", "little").bit_count()
+
+
+def set_slots(bitmap):
+    value = int.from_bytes(bitmap or b"", "little")
+    return [slot for slot in range(value.bit_length()) if value >> slot & 1]
+
+
+def next_slot(course_id):
+    """
+    Next free slot of a course. Locks the course row first so concurrent
+    inserts wait for each other instead of reading the same Max(slot); call
+    it inside the transaction that saves the lesson (Lesson.save does).
+    """
+    Course.objects.select_for_update().filter(pk=course_id).values_list("pk", flat=True).first()
+    current = Lesson.objects.filter(course_id=course_id).aggregate(top=Max("slot"))["top"]
+    return 0 if current is None else current + 1
+
+
+def assign_slots(lessons):
+    """
+    Give unsaved (or moved) lessons the next free slots of their course with
+    one aggregate query per course. Used by bulk_create callers, which skip
+    the pre_save signal.
+    """
+    by_course = {}
+    for lesson in lessons:
+        by_course.setdefault(lesson.course_id, []).append(lesson)
+    for course_id, course_lessons in by_course.items():
+        start = next_slot(course_id)
+        for offset, lesson in enumerate(course_lessons):
+            lesson.slot = start + offset
+
+
+def mark_lessons(enrollment, lessons, completed=True):
+    """
+    Set (or clear) the bits of ``lessons`` in the enrollment's bitmap under a
+    row lock and refresh ``completed_lessons``/``is_completed``.
+    """
+    slots = [lesson.slot for lesson in lessons if lesson.slot is not None]
+    with transaction.atomic():
+        locked = Enrollment.objects.select_for_update().only(
+            "progress", "completed_lessons", "is_completed", "course_id"
+        ).get(pk=enrollment.pk)
+        bitmap = set_bits(locked.progress, slots, value=completed)
+        total = enrollment.course.get_stats().lesson_count
+        enrollment.progress = bitmap
+        enrollment.completed_lessons = count_bits(bitmap)
+        enrollment.is_completed = bool(total) and enrollment.completed_lessons >= total
+        enrollment.save(update_fields=["progress", "completed_lessons", "is_completed"])
+    return enrollment
+
+
+def completed_lesson_ids(enrollment):
+    slots = set_slots(enrollment.progress)
+    if not slots:
+        return []
+    return list(
+        Lesson.objects.filter(course_id=enrollment.course_id, slot__in=slots)
+        .order_by("order", "id")
+        .values_list("pk", flat=True)
+    )
+
+
+def user_progress_rows(user):
+    return (
+        Enrollment.objects.filter(user=user)
+        .order_by("-enrolled_at")
+        .values("id", "course_id", "course__title", "completed_lessons", "is_completed", "course__stats__lesson_count")
+    )
+
+
+def user_progress(user):
+    """
+    Progress of every enrollment of ``user`` in a single query.
+    """
+    result = []
+    for row in user_progress_rows(user):
+        total = row["course__stats__lesson_count"] or 0
+        result.append({
+            "enrollment": row["id"],
+            "course": row["course_id"],
+            "course_title": row["course__title"],
+            "completed_lessons": row["completed_lessons"],
+            "total_lessons": total,
+            "percent": min(100, round(row["completed_lessons"] * 100 / total)) if total else 0,
+            "is_completed": row["is_completed"],
+        })
+    return result
+
+
+def enrollments_with_progress(course_id):
+    return (
+        Enrollment.objects.filter(course_id=course_id, completed_lessons__gt=0)
+        .only("pk", "progress", "completed_lessons")
+        .order_by("pk")
+    )
+
+
+def forget_slots(course_id, slots):
+    """
+    Clear ``slots`` from every enrollment of a course after its lessons were
+    deleted or moved to another course, so counts match the remaining lessons.
+    Only enrollments with some progress are visited, in chunks.
+    """
+    slots = [slot for slot in slots if slot is not None]
+    enrollments = enrollments_with_progress(course_id)
+    changed = []
+    with transaction.atomic():
+        for enrollment in enrollments.iterator(chunk_size=CHUNK_SIZE) if slots else ():
+            if not any(has_bit(enrollment.progress, slot) for slot in slots):
+                continue
+            enrollment.progress = set_bits(enrollment.progress, slots, value=False)
+            enrollment.completed_lessons = count_bits(enrollment.progress)
+            changed.append(enrollment)
+            if len(changed) >= CHUNK_SIZE:
+                Enrollment.objects.bulk_update(changed, ["progress", "completed_lessons"])
+                changed = []
+        Enrollment.objects.bulk_update(changed, ["progress", "completed_lessons"])
+        # Con menos lecciones, quien tenía todas las restantes ha completado el curso
+        refresh_completion([course_id])
+
+
+def refresh_completion(course_ids):
+    """
+    Recompute ``is_completed`` of the enrollments of ``course_ids`` after
+    their lesson count or ``completed_lessons`` changed: two UPDATEs per
+    course that only touch the rows whose status flips.
+    """
+    for course_id in course_ids:
+        total = Lesson.objects.filter(course_id=course_id).count()
+        enrollments = Enrollment.objects.filter(course_id=course_id)
+        if total:
+            enrollments.filter(is_completed=False, completed_lessons__gte=total).update(is_completed=True)
+            enrollments.filter(is_completed=True, completed_lessons__lt=total).update(is_completed=False)
+        else:
+            enrollments.filter(is_completed=True).update(is_completed=False)
+
+
+def delete_lessons(queryset):
+    """
+    Delete a queryset of lessons clearing their slots with one forget_slots()
+    per course; the post_delete signal only handles single-lesson deletes.
+    """
+    with transaction.atomic():
+        slots = {}
+        for course_id, slot in queryset.values_list("course_id", "slot"):
+            slots.setdefault(course_id, []).append(slot)
+        deleted = queryset.delete()
+        for course_id, course_slots in slots.items():
+            forget_slots(course_id, course_slots)
+    return deleted
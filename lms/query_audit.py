@@ -0,0 +1,208 @@
+# lms/query_audit.py
+"""
+Registry of the hot querysets of the lms views and viewsets, and EXPLAIN
+helpers to check them against the indexes (``explain_queries`` command).
+
+Each registered function takes a ``Sample`` (a real course and a user with
+enrollments when the database has them) and returns ``{name: queryset}``.
+``seq_scans`` lists the tables a queryset reads with a sequential scan:
+from the JSON plan on PostgreSQL, from the ``SCAN`` lines of ``EXPLAIN
+QUERY PLAN`` on SQLite (a scan in index order only counts as partial when
+the queryset is sliced or the index is partial, i.e. holds only the
+matching rows).
+"""
+import json
+import re
+from collections import namedtuple
+
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connections
+from django.utils import timezone
+
+from . import catalog, conditional, dashboard, progress
+from .models import Course, Enrollment, Lesson, Review
+from .views import CatalogViewSet, CourseViewSet, EnrollmentViewSet, LessonViewSet, ReviewViewSet
+
+Sample = namedtuple("Sample", ["course", "user"])
+
+API_PAGE_SIZE = 20
+SQLITE_SCAN_RE = re.compile(r"\bSCAN (?:TABLE )?(\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+
+_registry = []
+
+
+def register(factory):
+    """
+    Decorator adding a ``factory(sample) -> {name: queryset}`` to the audit.
+    """
+    _registry.append(factory)
+    return factory
+
+
+def get_sample():
+    course = Course.objects.filter(is_published=True).order_by("-popularity", "-id").first() or Course.objects.first()
+    user_id = Enrollment.objects.order_by("-id").values_list("user_id", flat=True).first()
+    user = User.objects.filter(pk=user_id).first() or User.objects.first()
+    # Sin datos el plan sigue siendo válido con pk que no existen
+    return Sample(course or Course(pk=0, slug="-"), user or User(pk=0))
+
+
+def registered_queries(sample=None):
+    sample = sample or get_sample()
+    queries = {}
+    for factory in _registry:
+        queries.update(factory(sample))
+    return queries
+
+
+@register
+def catalog_pages(sample):
+    return {f"catalog:{sort}": catalog.catalog_queryset(sort)[: catalog.PAGE_SIZE] for sort in catalog.SORTS}
+
+
+@register
+def course_page(sample):
+    course, user = sample
+    return {
+        "course_page:course": Course.objects.select_related("instructor", "stats").filter(slug=course.slug),
+        "course_page:validators": conditional.validator_queryset({"slug": course.slug}, user),
+        "course_page:lessons": Lesson.objects.filter(course=course).order_by("order", "id"),
+        "course_page:reviews": Review.objects.filter(course=course).select_related("user"),
+        "course_page:enrollment": Enrollment.objects.filter(user=user, course=course),
+    }
+
+
+@register
+def user_pages(sample):
+    return {
+        "dashboard": dashboard.dashboard_enrollments(sample.user),
+        "progress": progress.user_progress_rows(sample.user),
+        "progress:forget_slots": progress.enrollments_with_progress(sample.course.pk),
+        "export:since": Course.objects.filter(updated_at__gt=timezone.now()).order_by("updated_at", "id"),
+    }
+
+
+@register
+def api_lists(sample):
+    values = {"course": sample.course.pk, "user": sample.user.pk, "instructor": sample.course.instructor_id}
+    viewsets = {
+        "courses": CourseViewSet,
+        "catalog": CatalogViewSet,
+        "lessons": LessonViewSet,
+        "enrollments": EnrollmentViewSet,
+        "reviews": ReviewViewSet,
+    }
+    queries = {}
+    for name, viewset in viewsets.items():
+        queryset = viewset.queryset.order_by(*viewset.ordering)
+        queries[f"api:{name}"] = queryset[:API_PAGE_SIZE]
+        for field in getattr(viewset, "filterset_fields", ()):
+            queries[f"api:{name}?{field}="] = queryset.filter(**{field: values[field]})[:API_PAGE_SIZE]
+        for field in getattr(viewset, "ordering_fields", ()):
+            for ordering in (field, f"-{field}"):
+                queries[f"api:{name}?ordering={ordering}"] = viewset.queryset.order_by(ordering)[:API_PAGE_SIZE]
+    return queries
+
+
+@register
+def admin_filters(sample):
+    # Página y COUNT(*) de cada list_filter del admin (EstimatedCountPaginator no estima filtrados)
+    values = {"is_published": [True, False], "is_completed": [True, False], "rating": [5]}
+    queries = {}
+    for model, model_admin in admin.site._registry.items():
+        if model._meta.app_label != "lms":
+            continue
+        for field in model_admin.list_filter:
+            for value in values[field]:
+                queryset = model._default_manager.filter(**{field: value})
+                name = f"admin:{model._meta.model_name}?{field}={value}"
+                queries[name] = queryset.order_by(*model_admin.get_ordering(None))[:API_PAGE_SIZE]
+                queries[f"{name}:count"] = queryset.order_by().values("pk")
+    return queries
+
+
+def _walk(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _walk(child)
+
+
+def table_rows(connection, table):
+    """
+    Planner estimate of the rows of ``table`` on PostgreSQL, exact count elsewhere.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [connection.ops.quote_name(table)])
+            row = cursor.fetchone()
+            return max(int(row[0]), 0) if row else 0
+        cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+        return cursor.fetchone()[0]
+
+
+def _subqueries(node):
+    if hasattr(node, "alias_map"):
+        yield node
+        return
+    inner = getattr(node, "query", None)
+    children = [inner] if inner is not None else [*getattr(node, "children", ()), *node.get_source_expressions()]
+    for child in children:
+        if child is not None and not isinstance(child, (str, int, float)):
+            yield from _subqueries(child)
+
+
+def _aliases(query, tables=None):
+    # alias -> tablas; los alias de subconsultas (U0...) se repiten entre subconsultas
+    tables = {} if tables is None else tables
+    for alias, join in query.alias_map.items():
+        tables.setdefault(alias, set()).add(join.table_name)
+    for node in [*query.annotations.values(), query.where]:
+        for inner in _subqueries(node):
+            _aliases(inner, tables)
+    return tables
+
+
+def partial_indexes():
+    return {
+        index.name
+        for model in apps.get_app_config("lms").get_models()
+        for index in model._meta.indexes
+        if index.condition is not None
+    }
+
+
+def seq_scans(queryset):
+    """
+    ``[(table, rows)]`` read with a sequential scan by ``queryset``, with the
+    table size (the rows such a scan visits).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        plan = json.loads(queryset.explain(format="json"))
+        plan = plan[0] if isinstance(plan, list) else plan
+        tables = {node["Relation Name"] for node in _walk(plan["Plan"]) if node["Node Type"] == "Seq Scan"}
+    else:
+        aliases = _aliases(queryset.query)
+        tables = set()
+        # "SCAN t USING [COVERING] INDEX i" recorre el índice en orden: solo un LIMIT lo corta
+        limited = queryset.query.is_sliced
+        partial = partial_indexes()
+        for line in queryset.explain().splitlines():
+            match = SQLITE_SCAN_RE.search(line)
+            if match and not ((limited and "USING" in line) or match.group(2) in partial):
+                tables |= aliases.get(match.group(1), {match.group(1)})
+    return sorted((table, table_rows(connection, table)) for table in tables)
+
+
+def audit(threshold, queries=None):
+    """
+    ``[(name, [(table, rows)])]`` for every registered queryset, keeping only
+    the sequential scans over more than ``threshold`` rows.
+    """
+    queries = registered_queries() if queries is None else queries
+    return [
+        (name, [(table, rows) for table, rows in seq_scans(queryset) if rows > threshold])
+        for name, queryset in queries.items()
+    ]
@@ -0,0 +1,153 @@
+# lms/replicas.py
+"""
+Read-replica routing for the ``replica`` alias built by project/database.py.
+
+Nothing is read from the replica unless a view opts in: ``use_replica``
+decorates the HTML catalog views and ``ReplicaReadMixin`` covers the
+read-only viewset actions, and both only for GET/HEAD. Writes always go to
+the primary. A client that wrote something gets a short-lived cookie that
+pins its following reads to the primary (``PrimaryPinningMiddleware``), so
+replication lag never hides its own enrollment or review.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from project.database import REPLICA_ALIAS
+
+PIN_COOKIE = "lms_primary"
+PIN_SECONDS = getattr(settings, "LMS_REPLICA_PIN_SECONDS", 5)
+SAFE_METHODS = ("GET", "HEAD")
+
+_replica_reads = ContextVar("lms_replica_reads", default=False)
+# Estado mutable de la petición en curso: {"pinned": bool, "wrote": bool}
+_request_state = ContextVar("lms_replica_request", default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in connections.settings
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """
+    Route the reads inside the block to the replica (when configured and the
+    current request is not pinned to the primary).
+    """
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def use_replica(view):
+    """
+    Decorator for function views (sync or async) whose GET/HEAD requests can
+    read from the replica.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            with replica_reads(request.method in SAFE_METHODS):
+                return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads(request.method in SAFE_METHODS):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """
+    Viewset mixin that serves ``replica_actions`` from the replica on
+    GET/HEAD. Authentication and permission checks run before the switch,
+    against the primary.
+    """
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and self.action in self.replica_actions:
+            self._replica_token = _replica_reads.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _replica_reads.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or not replica_configured():
+            return None
+        state = _request_state.get()
+        if state is not None and (state["pinned"] or state["wrote"]):
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state["wrote"] = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica y primaria tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
+
+
+class PrimaryPinningMiddleware:
+    """
+    Tracks whether the request wrote to the database and, if so, pins the
+    client's reads to the primary for ``LMS_REPLICA_PIN_SECONDS``. Removed
+    from the chain when there is no replica.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.finish(state, response)
+
+    def start(self, request):
+        state = {"pinned": PIN_COOKIE in request.COOKIES, "wrote": False}
+        return state, _request_state.set(state)
+
+    def finish(self, state, response):
+        if state["wrote"]:
+            response.set_cookie(PIN_COOKIE, "1", max_age=PIN_SECONDS, httponly=True, samesite="Lax")
+        return response
@@ -0,0 +1,216 @@
+# lms/search.py
+"""
+Full-text search for courses and lessons.
+
+On PostgreSQL every indexed table has a generated ``search_vector`` tsvector
+column (Spanish + English stemming, weighted per field) backed by a GIN
+index, see migration 0004. Other databases (SQLite in tests and local
+development) fall back to the ``SearchEntry`` token table, which is kept in
+sync by the signals in lms/signals.py.
+"""
+import re
+import unicodedata
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections, transaction
+from django.db.models import Count, Expression, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from rest_framework.filters import SearchFilter
+
+from .models import Course, Lesson, SearchEntry
+
+
+# Campos indexados por modelo y su peso (A > B), igual que en la migración 0004
+SEARCH_DOCUMENTS = {
+    Course: {"title": "A", "description": "B"},
+    Lesson: {"title": "A", "content": "B"},
+}
+SEARCH_CONFIGS = ("spanish", "english")
+WEIGHTS = {"A": 1.0, "B": 0.4}
+
+STOPWORDS = frozenset(
+    """
+    a al algo como con de del el ella en es esta este hay la las lo los mas
+    me mi no o para pero por que se si sin son su sus te tu un una uno y ya
+    an and are as at be by for from has have in is it its of on or that the
+    this to was were will with you your
+    """.split()
+)
+# Sufijos ordenados de mayor a menor longitud (español e inglés)
+SUFFIXES = sorted(
+    """
+    amientos imientos aciones uciones amiento imiento adoras adores ancias
+    mente acion ucion ables ibles istas ismos ation ness ment ings edly
+    ador ante anza able ible ista ismo idad ivas ivos ando iendo ing ers ies
+    ar er ir ed es ly os as s a o e
+    """.split(),
+    key=len,
+    reverse=True,
+)
+TOKEN_RE = re.compile(r"\w+")
+MIN_STEM_LENGTH = 3
+
+
+def is_postgres(using="default"):
+    return connections[using].vendor == "postgresql"
+
+
+def stem(word):
+    """
+    Light suffix-stripping stemmer shared by indexing and querying in the
+    fallback backend. It only needs to be consistent, not linguistically exact.
+    """
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            word = word[: -len(suffix)]
+            break
+    # "programming" -> "programm" -> "program"
+    if len(word) > MIN_STEM_LENGTH and word[-1] == word[-2] and word[-1] not in "aeiou":
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return [stem(word) for word in TOKEN_RE.findall(text) if word not in STOPWORDS]
+
+
+def _label(model):
+    return model._meta.label_lower
+
+
+def build_entries(instance):
+    """
+    Token rows for one instance; repeated tokens accumulate weight.
+    """
+    weights = {}
+    for field, weight in SEARCH_DOCUMENTS[type(instance)].items():
+        for token in tokenize(getattr(instance, field)):
+            token = token[:64]
+            weights[token] = weights.get(token, 0) + WEIGHTS[weight]
+    label = _label(type(instance))
+    return [
+        SearchEntry(label=label, object_id=instance.pk, token=token, weight=weight)
+        for token, weight in weights.items()
+    ]
+
+
+def index_instance(instance, using="default"):
+    if is_postgres(using):
+        return  # La columna generada se mantiene sola
+    with transaction.atomic(using=using):
+        remove_instance(type(instance), instance.pk, using=using)
+        SearchEntry.objects.using(using).bulk_create(build_entries(instance))
+
+
+def index_instances(instances, using="default"):
+    """
+    Bulk variant of ``index_instance`` for bulk_create/bulk_update callers,
+    which bypass model signals.
+    """
+    if is_postgres(using) or not instances:
+        return
+    by_label = {}
+    for instance in instances:
+        by_label.setdefault(_label(type(instance)), []).append(instance.pk)
+    with transaction.atomic(using=using):
+        for label, pks in by_label.items():
+            SearchEntry.objects.using(using).filter(label=label, object_id__in=pks).delete()
+        entries = [entry for instance in instances for entry in build_entries(instance)]
+        SearchEntry.objects.using(using).bulk_create(entries)
+
+
+def remove_instance(model, pk, using="default"):
+    if not is_postgres(using):
+        SearchEntry.objects.using(using).filter(label=_label(model), object_id=pk).delete()
+
+
+def rebuild_index(model, using="default", chunk_size=2000):
+    """
+    Rebuild the fallback token table for ``model``. No-op on PostgreSQL.
+    """
+    if is_postgres(using):
+        return 0
+    count = 0
+    with transaction.atomic(using=using):
+        SearchEntry.objects.using(using).filter(label=_label(model)).delete()
+        entries = []
+        fields = ["pk", *SEARCH_DOCUMENTS[model]]
+        for instance in model.objects.using(using).only(*fields).iterator(chunk_size=chunk_size):
+            entries.extend(build_entries(instance))
+            count += 1
+            if len(entries) >= chunk_size:
+                SearchEntry.objects.using(using).bulk_create(entries)
+                entries = []
+        SearchEntry.objects.using(using).bulk_create(entries)
+    return count
+
+
+class GeneratedSearchVector(Expression):
+    """
+    The ``search_vector`` column of the queryset's table. It only exists on
+    PostgreSQL (migration 0004), so it is not a model field.
+    """
+    output_field = SearchVectorField()
+
+    def as_sql(self, compiler, connection):
+        alias = compiler.query.get_initial_alias()
+        return f"{compiler.quote_name_unless_alias(alias)}.{connection.ops.quote_name('search_vector')}", []
+
+
+def search_query(text):
+    # Una consulta por configuración: coincide si casa con el stemming español o el inglés
+    queries = [SearchQuery(text, config=config, search_type="websearch") for config in SEARCH_CONFIGS]
+    query = queries[0]
+    for other in queries[1:]:
+        query |= other
+    return query
+
+
+def search(queryset, text):
+    """
+    Filter ``queryset`` to rows matching every term in ``text`` and annotate
+    ``search_rank`` (higher is better).
+    """
+    model = queryset.model
+    if is_postgres(queryset.db):
+        query = search_query(text)
+        return queryset.alias(search_vector=GeneratedSearchVector()).filter(search_vector=query).annotate(
+            search_rank=SearchRank(GeneratedSearchVector(), query)
+        )
+
+    tokens = sorted({token[:64] for token in tokenize(text)})
+    if not tokens:
+        return queryset.none()
+    matches = (
+        SearchEntry.objects.filter(label=_label(model), token__in=tokens)
+        .values("object_id")
+        .annotate(matched=Count("token"), score=Sum("weight"))
+        .filter(matched=len(tokens))
+    )
+    rank = matches.filter(object_id=OuterRef("pk")).values("score")[:1]
+    return queryset.filter(pk__in=matches.values("object_id")).annotate(
+        search_rank=Coalesce(Subquery(rank, output_field=FloatField()), 0.0)
+    )
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for DRF's SearchFilter using the full-text index for
+    models in SEARCH_DOCUMENTS. Results are ranked by relevance unless the
+    request passes an explicit ``ordering``. Should run after OrderingFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if queryset.model not in SEARCH_DOCUMENTS or not getattr(view, "search_fields", None):
+            return super().filter_queryset(request, queryset, view)
+
+        text = " ".join(self.get_search_terms(request))
+        if not text:
+            return queryset
+
+        queryset = search(queryset, text)
+        if "ordering" not in request.query_params:
+            queryset = queryset.order_by("-search_rank", *queryset.query.order_by)
+        return queryset
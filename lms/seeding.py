@@ -0,0 +1,89 @@
+# lms/seeding.py
+"""
+Synthetic catalog data for performance tests and benchmarks.
+
+Everything is written with bulk_create, so model signals do not run; the
+denormalized CourseStats rows and the fallback search index are rebuilt at
+the end instead.
+"""
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from . import search
+from .models import Course, CourseStats, Enrollment, Lesson, Review
+
+WORDS = (
+    "python django datos análisis guitarra inglés finanzas mercados video edición "
+    "seguridad redes machine learning prompt agentes programación web diseño negocio "
+    "marketing excel power bi estadística cloud docker linux"
+).split()
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+@transaction.atomic
+def seed_catalog(courses=200, lessons_per_course=10, students=200, enrollments_per_student=5,
+                 review_ratio=0.5, instructors=10, seed=0, prefix="seed"):
+    """
+    Create ``courses`` published courses with their lessons, plus students
+    enrolled in random courses, a ``review_ratio`` share of whom leave a
+    review. Returns a dict with the created instructors, students and courses.
+    """
+    rng = random.Random(seed)
+    password = make_password("password")
+
+    users = User.objects.bulk_create([
+        User(username=f"{prefix}-instructor-{i}", email=f"{prefix}-instructor-{i}@example.com",
+             password=password, first_name="Instructor", last_name=str(i))
+        for i in range(instructors)
+    ] + [
+        User(username=f"{prefix}-student-{i}", email=f"{prefix}-student-{i}@example.com", password=password)
+        for i in range(students)
+    ])
+    instructor_users, student_users = users[:instructors], users[instructors:]
+
+    course_objs = Course.objects.bulk_create([
+        Course(
+            title=f"{_text(rng, 3).title()} {i}",
+            slug=f"{prefix}-course-{i}",
+            short_description=_text(rng, 8)[:150],
+            description=_text(rng, 60),
+            instructor=instructor_users[i % instructors],
+            price=rng.choice([0, 9.99, 19.99, 49.99]),
+            is_published=True,
+        )
+        for i in range(courses)
+    ])
+
+    Lesson.objects.bulk_create([
+        Lesson(
+            course=course,
+            title=f"{_text(rng, 4).capitalize()}",
+            content=_text(rng, 80),
+            duration_minutes=rng.randint(3, 45),
+            order=order,
+            slot=order - 1,
+        )
+        for course in course_objs
+        for order in range(1, lessons_per_course + 1)
+    ], batch_size=1000)
+
+    enrollments, reviews = [], []
+    for student in student_users:
+        for course in rng.sample(course_objs, min(enrollments_per_student, len(course_objs))):
+            enrollments.append(Enrollment(user=student, course=course))
+            if rng.random() < review_ratio:
+                reviews.append(Review(user=student, course=course, comment=_text(rng, 20), rating=rng.randint(1, 5)))
+    Enrollment.objects.bulk_create(enrollments, batch_size=1000)
+    Review.objects.bulk_create(reviews, batch_size=1000)
+
+    CourseStats.rebuild()
+    for model in search.SEARCH_DOCUMENTS:
+        search.rebuild_index(model)
+
+    return {"instructors": instructor_users, "students": student_users, "courses": course_objs}
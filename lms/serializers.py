@@ -1,38 +1,423 @@
 # lms/serializers.py
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
 from django.contrib.auth.models import User
-from .models import Course, Lesson, Enrollment, Review
+from django.db import transaction
+from django.db.models import Max, Prefetch
+from django.utils import timezone
+from .models import Course, CourseStats, Lesson, Enrollment, Review
+from . import progress
+from .profiling import SerializationTimingMixin
+from .signals import lessons_bulk_changed
+from .thumbnails import VARIANTS, thumbnail_url
 
-class UserSerializer(serializers.ModelSerializer):
+def _split_param(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets for read requests:
+
+    - ``?fields=id,title`` keeps only those fields.
+    - ``?expand=a,b`` nests the relations in ``Meta.expandable_fields``; when
+      the param is absent ``Meta.default_expand`` (within ``fields``) is
+      used, when present it is authoritative (``?expand=`` collapses every
+      relation to its id).
+
+    Nested serializers take the same choices as ``fields``/``expand`` kwargs.
+    ``optimize_queryset`` applies the matching ``only()``,
+    ``select_related()`` and ``prefetch_related()``; columns a field needs
+    beyond its own source go in ``Meta.field_requirements``.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._requested_fields = fields
+        self._requested_expand = expand
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_field_choices(self):
+        fields, expand = self._requested_fields, self._requested_expand
+        request = self.context.get("request")
+        if request is not None and request.method in ("GET", "HEAD") and self._is_root():
+            params = request.query_params
+            if fields is None and "fields" in params:
+                fields = _split_param(params["fields"])
+            if expand is None and "expand" in params:
+                expand = _split_param(params["expand"])
+        if expand is None:
+            expand = getattr(self.Meta, "default_expand", [])
+            if fields is not None:
+                expand = [name for name in expand if name in fields]
+        return fields, set(expand)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only, expand = self.get_field_choices()
+        for name, spec in getattr(self.Meta, "expandable_fields", {}).items():
+            if name in expand:
+                fields[name] = spec["serializer"]()
+            elif "collapsed" in spec:
+                fields[name] = spec["collapsed"]()
+        if only is not None:
+            keep = set(only) | (expand & fields.keys())
+            fields = {name: field for name, field in fields.items() if name in keep}
+        return fields
+
+    def optimize_queryset(self, queryset):
+        model = queryset.model
+        concrete = {field.name for field in model._meta.concrete_fields}
+        _, expand = self.get_field_choices()
+        expandable = getattr(self.Meta, "expandable_fields", {})
+        requirements = getattr(self.Meta, "field_requirements", {})
+        only, related, prefetch = {model._meta.pk.name}, set(), []
+        for name, field in self.fields.items():
+            spec = requirements.get(name, {})
+            if name in expandable:
+                state = "expanded" if name in expand else "collapsed_requires"
+                spec = expandable[name].get(state, {})
+            source = field.source.split(".")[0]
+            if not spec and source in concrete:
+                only.add(source)
+            only.update(spec.get("only", ()))
+            related.update(spec.get("select_related", ()))
+            prefetch.extend(spec.get("prefetch_related", ()))
+        queryset = queryset.select_related(None).only(*only)
+        if related:
+            queryset = queryset.select_related(*related)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+class UserSerializer(SerializationTimingMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email", "first_name", "last_name"]
 
-class CourseSerializer(serializers.ModelSerializer):
+# Campos de ``?expand=lessons`` en cursos (sin ``content``)
+LESSON_SUMMARY_FIELDS = ["id", "title", "order", "duration_minutes"]
+
+def _stats_requirement(column):
+    return {"select_related": ["stats"], "only": [f"stats__{column}"]}
+
+class CourseSerializer(SerializationTimingMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     instructor = UserSerializer(read_only=True)
     instructor_id = serializers.PrimaryKeyRelatedField(
         write_only=True, source="instructor", queryset=User.objects.all(), required=False
     )
+    # Contadores leídos de CourseStats (sin COUNT por petición)
+    lesson_count = serializers.IntegerField(source="get_stats.lesson_count", read_only=True)
+    total_duration = serializers.IntegerField(source="get_stats.total_duration", read_only=True)
+    enrollment_count = serializers.IntegerField(source="get_stats.enrollment_count", read_only=True)
+    review_count = serializers.IntegerField(source="get_stats.review_count", read_only=True)
+    avg_rating = serializers.FloatField(source="get_stats.avg_rating", read_only=True)
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Course
-        fields = ["id", "title", "description", "instructor", "instructor_id", "created_at", "updated_at"]
+        fields = [
+            "id", "title", "slug", "description", "price", "capacity", "instructor", "instructor_id",
+            "lesson_count", "total_duration", "enrollment_count", "review_count", "avg_rating",
+            "thumbnails", "created_at", "updated_at",
+        ]
         read_only_fields = ["id", "created_at", "updated_at", "instructor"]
+        expandable_fields = {
+            "instructor": {
+                "serializer": lambda: UserSerializer(read_only=True),
+                "collapsed": lambda: serializers.PrimaryKeyRelatedField(read_only=True),
+                "expanded": {
+                    "select_related": ["instructor"],
+                    "only": ["instructor", *(f"instructor__{name}" for name in UserSerializer.Meta.fields)],
+                },
+                "collapsed_requires": {"only": ["instructor"]},
+            },
+            "lessons": {
+                "serializer": lambda: LessonSerializer(
+                    many=True, read_only=True, fields=LESSON_SUMMARY_FIELDS, expand=[]
+                ),
+                "expanded": {
+                    "prefetch_related": [
+                        Prefetch("lessons", queryset=Lesson.objects.only("course", *LESSON_SUMMARY_FIELDS))
+                    ],
+                },
+            },
+        }
+        default_expand = ["instructor"]
+        field_requirements = {
+            "lesson_count": _stats_requirement("lesson_count"),
+            "total_duration": _stats_requirement("total_duration"),
+            "enrollment_count": _stats_requirement("enrollment_count"),
+            "review_count": _stats_requirement("review_count"),
+            "avg_rating": {"select_related": ["stats"], "only": ["stats__review_count", "stats__rating_sum"]},
+            "thumbnails": {"only": ["thumbnail", "thumbnail_digest", "updated_at"]},
+        }
+
+    def get_thumbnails(self, obj):
+        if not obj.thumbnail:
+            return None
+        request = self.context.get("request")
+        urls = {variant: thumbnail_url(obj, variant) for variant in VARIANTS}
+        if request is not None:
+            urls = {variant: request.build_absolute_uri(url) for variant, url in urls.items()}
+        return urls
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves ids from ``parent.preloaded[field_name]`` when a list serializer
+    has loaded them in bulk, avoiding one SELECT per item.
+    """
+    def to_internal_value(self, data):
+        preloaded = getattr(self.parent, "preloaded", {}).get(self.field_name)
+        if preloaded is not None:
+            try:
+                return preloaded[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+class LessonListSerializer(serializers.ListSerializer):
+    """
+    Bulk create/update for lessons: one query to preload courses, one to
+    check (course, order) conflicts, and bulk_create/bulk_update in a single
+    transaction.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            # Solo ids bien formados; el resto lo rechaza la validación del campo con un 400
+            values = [item.get("course") for item in data if isinstance(item, dict)]
+            course_ids = {
+                int(pk) for pk in values
+                if (isinstance(pk, int) and not isinstance(pk, bool)) or (isinstance(pk, str) and pk.isdigit())
+            }
+            self.child.preloaded = {"course": Course.objects.in_bulk(course_ids)}
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        # Para updates, ``instance`` viene alineado con el payload (ver LessonViewSet.bulk)
+        if self.instance is not None:
+            instances = {lesson.pk: lesson for lesson in self.instance}
+            self.child.instance = instances.get(data.get("id") if isinstance(data, dict) else None)
+            if self.child.instance is None:
+                raise serializers.ValidationError({"id": ["Lesson not found."]})
+        return super().run_child_validation(data)
+
+    def validate(self, attrs):
+        instances = list(self.instance or [])
+        final = {}
+        for index, item in enumerate(attrs):
+            current = instances[index] if instances else None
+            course = item.get("course", current.course if current else None)
+            order = item.get("order", current.order if current else 1)
+            if (course.pk, order) in final.values():
+                raise serializers.ValidationError(f"Duplicate order {order} for course {course.pk} in payload.")
+            final[index] = (course.pk, order)
+
+        # Un solo query para los conflictos contra lecciones que no están en el payload
+        touched = [lesson.pk for lesson in instances]
+        conflicts = Lesson.objects.exclude(pk__in=touched).filter(
+            course_id__in={course_id for course_id, _ in final.values()},
+            order__in={order for _, order in final.values()},
+        ).values_list("course_id", "order")
+        clashes = set(conflicts) & set(final.values())
+        if clashes:
+            course_id, order = sorted(clashes)[0]
+            raise serializers.ValidationError(f"Order {order} is already used in course {course_id}.")
+        return attrs
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            lessons = [Lesson(**item) for item in validated_data]
+            progress.assign_slots(lessons)
+            lessons = Lesson.objects.bulk_create(lessons)
+            lessons_bulk_changed({lesson.course_id for lesson in lessons}, lessons)
+        return lessons
+
+    def update(self, instances, validated_data):
+        fields = set()
+        course_ids = {lesson.course_id for lesson in instances}
+        reordered, moved = [], {}
+        with transaction.atomic():
+            lock_courses(course_ids | {item["course"].pk for item in validated_data if "course" in item})
+            for lesson, item in zip(instances, validated_data):
+                if "order" in item and item["order"] != lesson.order:
+                    reordered.append(lesson)
+                if "course" in item and item["course"].pk != lesson.course_id:
+                    moved[lesson] = (lesson.course_id, lesson.slot)
+                for attr, value in item.items():
+                    setattr(lesson, attr, value)
+                fields.update(item)
+            if not fields:
+                return instances
+            # bulk_update no aplica auto_now
+            now = timezone.now()
+            for lesson in instances:
+                lesson.updated_at = now
+            fields.add("updated_at")
+            if reordered:
+                # Órdenes temporales para no chocar con unique (course, order)
+                park_lesson_orders(reordered)
+            if moved:
+                progress.assign_slots(list(moved))
+                fields.add("slot")
+            Lesson.objects.bulk_update(instances, list(fields))
+            vacated = {}
+            for course_id, slot in moved.values():
+                vacated.setdefault(course_id, []).append(slot)
+            for course_id, slots in vacated.items():
+                progress.forget_slots(course_id, slots)
+            course_ids |= {lesson.course_id for lesson in instances}
+            lessons_bulk_changed(course_ids, instances)
+        return instances
+
+def lock_courses(course_ids):
+    """
+    Lock the course rows (in pk order, so concurrent writers cannot deadlock)
+    until the end of the transaction: lesson writes of one course serialise.
+    """
+    list(Course.objects.select_for_update().filter(pk__in=course_ids).order_by("pk").values_list("pk", flat=True))
+
+
+def park_lesson_orders(lessons):
+    """
+    Move ``lessons`` to orders above every existing one of their courses
+    (without touching the in-memory values) so a following bulk_update can
+    assign any permutation without violating unique (course, order).
+    """
+    pks = [lesson.pk for lesson in lessons]
+    # Cursos según la base de datos: en memoria la lección puede estar ya movida
+    current = Lesson.objects.filter(pk__in=pks).values("course_id")
+    ceiling = Lesson.objects.filter(course_id__in=current).aggregate(top=Max("order"))["top"] or 0
+    parked = [Lesson(pk=pk, order=ceiling + index) for index, pk in enumerate(pks, start=1)]
+    Lesson.objects.bulk_update(parked, ["order"])
+
+
+class LessonSerializer(SerializationTimingMixin, DynamicFieldsMixin, serializers.ModelSerializer):
+    course = PreloadedPrimaryKeyRelatedField(queryset=Course.objects.all())
 
-class LessonSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lesson
-        fields = ["id", "course", "title", "content", "order", "created_at"]
+        fields = ["id", "course", "title", "content", "order", "duration_minutes", "created_at"]
         read_only_fields = ["id", "created_at"]
+        list_serializer_class = LessonListSerializer
+        expandable_fields = {
+            "course": {
+                "serializer": lambda: CourseSerializer(read_only=True, fields=["id", "title"], expand=[]),
+                "expanded": {"select_related": ["course"], "only": ["course", "course__id", "course__title"]},
+                "collapsed_requires": {"only": ["course"]},
+            },
+        }
+
+    def get_validators(self):
+        validators = super().get_validators()
+        if isinstance(self.parent, LessonListSerializer):
+            # La lista valida (course, order) de una sola vez
+            validators = [v for v in validators if not isinstance(v, UniqueTogetherValidator)]
+        return validators
+
+class LessonReorderSerializer(serializers.Serializer):
+    """
+    Rewrites ``order`` (1..n) for every lesson of a course in one transaction.
+    ``lessons`` must list all of the course's lesson ids in the new order.
+    """
+    course = serializers.PrimaryKeyRelatedField(queryset=Course.objects.all())
+    lessons = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate(self, attrs):
+        current = set(attrs["course"].lessons.values_list("pk", flat=True))
+        if len(attrs["lessons"]) != len(set(attrs["lessons"])) or set(attrs["lessons"]) != current:
+            raise serializers.ValidationError({"lessons": ["Must contain every lesson of the course exactly once."]})
+        return attrs
+
+    def save(self):
+        course = self.validated_data["course"]
+        # bulk_update no aplica auto_now
+        now = timezone.now()
+        lessons = [
+            Lesson(pk=pk, course=course, order=index, updated_at=now)
+            for index, pk in enumerate(self.validated_data["lessons"], start=1)
+        ]
+        with transaction.atomic():
+            lock_courses([course.pk])
+            # Bajo el bloqueo: otra escritura pudo añadir o quitar lecciones tras validate()
+            self.validate(self.validated_data)
+            park_lesson_orders(lessons)
+            Lesson.objects.bulk_update(lessons, ["order", "updated_at"])
+            lessons_bulk_changed({course.pk}, lessons, reindex=False)
+        return lessons
+
+class EnrollmentSerializer(SerializationTimingMixin, serializers.ModelSerializer):
+    progress_percent = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Enrollment
+        fields = ["id", "user", "course", "enrolled_at", "is_completed", "completed_lessons", "progress_percent"]
+        read_only_fields = ["id", "enrolled_at", "is_completed", "completed_lessons"]
+        extra_kwargs = {"user": {"required": False}}
+        # Los duplicados los resuelve enrollments.enroll con ON CONFLICT, sin SELECT previo
+        validators = []
+
+class DashboardEnrollmentSerializer(SerializationTimingMixin, serializers.ModelSerializer):
+    """
+    One enrolled course of ``/api/dashboard/``. The counters are the
+    annotations of ``dashboard.dashboard_enrollments``.
+    """
+    course = CourseSerializer(
+        read_only=True, fields=["id", "title", "slug", "price", "thumbnails", "instructor"], expand=["instructor"]
+    )
+    lesson_count = serializers.IntegerField(source="lesson_total", read_only=True)
+    total_duration = serializers.IntegerField(source="duration_total", read_only=True)
+    enrollment_count = serializers.IntegerField(source="enrollment_total", read_only=True)
+    progress_percent = serializers.IntegerField(read_only=True)
 
-class EnrollmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Enrollment
-        fields = ["id", "user", "course", "enrolled_at"]
-        read_only_fields = ["id", "enrolled_at"]
+        fields = [
+            "id", "course", "enrolled_at", "is_completed", "completed_lessons", "progress_percent",
+            "lesson_count", "total_duration", "enrollment_count",
+        ]
+        read_only_fields = fields
+
+class LessonProgressSerializer(SerializationTimingMixin, serializers.Serializer):
+    """
+    Marks a batch of lessons of the enrollment's course as completed (or not
+    completed with ``"completed": false``).
+    """
+    lessons = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+    completed = serializers.BooleanField(default=True)
 
-class ReviewSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        enrollment = self.context["enrollment"]
+        lessons = list(Lesson.objects.filter(course_id=enrollment.course_id, pk__in=attrs["lessons"]).only("pk", "slot"))
+        missing = set(attrs["lessons"]) - {lesson.pk for lesson in lessons}
+        if missing:
+            raise serializers.ValidationError({"lessons": [f"Not lessons of this course: {sorted(missing)}"]})
+        attrs["lessons"] = lessons
+        return attrs
+
+    def save(self):
+        enrollment = self.context["enrollment"]
+        return progress.mark_lessons(enrollment, self.validated_data["lessons"], self.validated_data["completed"])
+
+class ReviewSerializer(SerializationTimingMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ["id", "course", "user", "comment", "rating", "published_at"]
         read_only_fields = ["id", "published_at"]
+
+class RatingSummarySerializer(SerializationTimingMixin, serializers.ModelSerializer):
+    """
+    Review count, average and 1-5 star histogram of a course, read from its
+    CourseStats row.
+    """
+    avg_rating = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = CourseStats
+        fields = ["course", "review_count", "avg_rating", "histogram"]
@@ -1,9 +1,12 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from django.core.mail import send_mail
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.conf import settings
+from rest_framework.authtoken.models import Token
+
+from .models import Course, CourseStats, Enrollment, Lesson, Review
+from . import authentication, cache, outbox, progress, search, thumbnails
 
 
 @receiver(post_save, sender=User)
@@ -16,10 +19,233 @@ def send_activation_email(sender, instance, created, **kwargs):
         subject = "Activa tu cuenta"
         message = f"Hola {instance.username},\n\nPor favor activa tu cuenta haciendo clic en el siguiente enlace:\n{activation_link}"
 
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [instance.email],
-            fail_silently=False,
-        )
\ No newline at end of file
+        # Solo se encola; el comando send_outbox hace el envío SMTP
+        outbox.enqueue(subject, message, [instance.email], settings.DEFAULT_FROM_EMAIL)
+
+
+# === Estadísticas denormalizadas por curso (CourseStats) ===
+
+@receiver(post_save, sender=Course)
+def create_course_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CourseStats.objects.get_or_create(course=instance)
+
+
+@receiver(pre_save, sender=Review)
+@receiver(pre_save, sender=Lesson)
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    """
+    Keep the persisted course/rating/duration so post_save can apply deltas
+    instead of recounting.
+    """
+    instance._stats_previous = None
+    if raw or instance.pk is None:
+        return
+    fields = ["course_id", "rating"] if sender is Review else ["course_id", "duration_minutes", "slot"]
+    instance._stats_previous = sender.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+def _review_deltas(rating, sign=1):
+    return {"review_count": sign, "rating_sum": sign * rating, CourseStats.rating_field(rating): sign}
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_stats_previous", None)
+    if created or previous is None:
+        CourseStats.bump(instance.course_id, **_review_deltas(instance.rating))
+    elif previous["course_id"] != instance.course_id:
+        CourseStats.bump(previous["course_id"], **_review_deltas(previous["rating"], sign=-1))
+        CourseStats.bump(instance.course_id, **_review_deltas(instance.rating))
+    elif previous["rating"] != instance.rating:
+        CourseStats.bump(
+            instance.course_id,
+            rating_sum=instance.rating - previous["rating"],
+            **{CourseStats.rating_field(previous["rating"]): -1, CourseStats.rating_field(instance.rating): 1},
+        )
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    CourseStats.bump(instance.course_id, **_review_deltas(instance.rating, sign=-1))
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_stats_previous", None)
+    if created or previous is None:
+        CourseStats.bump(instance.course_id, lesson_count=1, total_duration=instance.duration_minutes)
+    elif previous["course_id"] != instance.course_id:
+        CourseStats.bump(previous["course_id"], lesson_count=-1, total_duration=-previous["duration_minutes"])
+        CourseStats.bump(instance.course_id, lesson_count=1, total_duration=instance.duration_minutes)
+    else:
+        CourseStats.bump(instance.course_id, total_duration=instance.duration_minutes - previous["duration_minutes"])
+
+
+@receiver(post_delete, sender=Lesson)
+def lesson_deleted(sender, instance, **kwargs):
+    CourseStats.bump(instance.course_id, lesson_count=-1, total_duration=-instance.duration_minutes)
+
+
+# === Progreso por lección (bitmaps, ver lms/progress.py) ===
+
+@receiver(pre_save, sender=Lesson)
+def assign_lesson_slot(sender, instance, raw=False, **kwargs):
+    # Debe ir después de remember_previous_values
+    if raw:
+        return
+    previous = getattr(instance, "_stats_previous", None)
+    if instance.slot is None or (previous and previous["course_id"] != instance.course_id):
+        instance.slot = progress.next_slot(instance.course_id)
+
+
+@receiver(post_save, sender=Lesson)
+def forget_moved_lesson_progress(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, "_stats_previous", None)
+    if not raw and previous and previous["course_id"] != instance.course_id:
+        progress.forget_slots(previous["course_id"], [previous["slot"]])
+
+
+@receiver(post_save, sender=Lesson)
+def refresh_course_completion(sender, instance, created, raw=False, **kwargs):
+    # Una lección nueva en el curso deja sin completar a quien ya lo había terminado
+    previous = getattr(instance, "_stats_previous", None)
+    if not raw and (created or previous is None or previous["course_id"] != instance.course_id):
+        progress.refresh_completion([instance.course_id])
+
+
+@receiver(post_delete, sender=Lesson)
+def forget_deleted_lesson_progress(sender, instance, origin=None, **kwargs):
+    # Solo borrados sueltos: progress.delete_lessons agrupa los masivos y, si se
+    # borra el curso (o su instructor), las matrículas caen en la misma cascada
+    if origin is None or isinstance(origin, Lesson):
+        progress.forget_slots(instance.course_id, [instance.slot])
+
+
+def lessons_bulk_changed(course_ids, lessons, reindex=True):
+    """
+    bulk_create/bulk_update skip model signals; apply the same side effects
+    (stats, completion, search index, API cache) for a batch of lessons at once.
+    """
+    CourseStats.rebuild(course_ids=course_ids)
+    progress.refresh_completion(course_ids)
+    if reindex:
+        search.index_instances(lessons)
+    cache.bump(
+        *(cache.object_tag("lesson", lesson.pk) for lesson in lessons),
+        cache.list_tag("lesson"),
+        *(cache.list_tag("lesson", "course", course_id) for course_id in course_ids),
+    )
+    for course_id in course_ids:
+        _invalidate_course(course_id)
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CourseStats.bump(instance.course_id, enrollment_count=1)
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    CourseStats.bump(instance.course_id, enrollment_count=-1)
+
+
+# === Índice de búsqueda (solo motores sin tsvector, ver lms/search.py) ===
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Lesson)
+def index_for_search(sender, instance, raw=False, using="default", **kwargs):
+    if not raw:
+        search.index_instance(instance, using=using)
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Lesson)
+def remove_from_search(sender, instance, using="default", **kwargs):
+    search.remove_instance(sender, instance.pk, using=using)
+
+
+# === Invalidación del caché de respuestas de la API (ver lms/cache.py) ===
+
+def _invalidate_course(course_id, content=True):
+    cache.invalidate_object("course", course_id)
+    if content:
+        # Fragmentos {% cache %} de la ficha y de la tarjeta del curso
+        cache.bump(cache.content_tag(course_id))
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_cache(sender, instance, **kwargs):
+    _invalidate_course(instance.pk)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_course_child_cache(sender, instance, **kwargs):
+    course_ids = {instance.course_id}
+    previous = getattr(instance, "_stats_previous", None)
+    if previous:
+        course_ids.add(previous["course_id"])
+    for course_id in course_ids:
+        cache.invalidate_object(sender._meta.model_name, instance.pk, scopes={"course": course_id})
+        # Los contadores de CourseStats forman parte del payload del curso
+        _invalidate_course(course_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_instructor_course_cache(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Los cursos incluyen los datos del instructor; el login solo toca last_login
+    if raw or (update_fields and set(update_fields) <= {"last_login"}):
+        return
+    for course_id in Course.objects.filter(instructor=instance).values_list("pk", flat=True):
+        _invalidate_course(course_id)
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_enrollment_course_cache(sender, instance, **kwargs):
+    _invalidate_course(instance.course_id, content=False)
+
+
+# === Miniaturas derivadas (ver lms/thumbnails.py) ===
+
+@receiver(pre_save, sender=Course)
+def reset_thumbnail_digest(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    previous = sender.objects.filter(pk=instance.pk).values_list("thumbnail", flat=True).first()
+    if (previous or None) != (instance.thumbnail.name or None):
+        instance.thumbnail_digest = ""
+
+
+@receiver(post_save, sender=Course)
+def generate_thumbnails(sender, instance, raw=False, **kwargs):
+    if raw or not instance.thumbnail or instance.thumbnail_digest:
+        return
+    if getattr(settings, "LMS_THUMBNAILS_ON_UPLOAD", True):
+        # Si falla se reintenta al pedir la URL, pasados thumbnails.RETRY_SECONDS
+        thumbnails.try_generate_variants(instance)
+
+
+# === Revocación de tokens cacheados (ver lms/authentication.py) ===
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def revoke_cached_token(sender, instance, **kwargs):
+    authentication.revoke(instance.key)
+
+
+@receiver(post_save, sender=User)
+def revoke_cached_user_tokens(sender, instance, raw=False, update_fields=None, **kwargs):
+    # El login solo toca last_login, que la autenticación por token no usa
+    if raw or (update_fields and set(update_fields) <= {"last_login"}):
+        return
+    authentication.revoke(*Token.objects.filter(user=instance).values_list("key", flat=True))
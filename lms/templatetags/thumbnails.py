@@ -0,0 +1,13 @@
+from django import template
+
+from lms.thumbnails import thumbnail_url as build_thumbnail_url
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail_url(course, variant="card"):
+    """
+    {{ course|thumbnail_url:"card" }} -> URL of the resized WebP variant.
+    """
+    return build_thumbnail_url(course, variant) or ""
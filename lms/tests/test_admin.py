@@ -0,0 +1,58 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from lms.models import Course, Enrollment, Lesson, Review
+from lms.pagination import EstimatedCountPaginator, estimated_count
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        cls.instructor = User.objects.create_user("profe", password="x")
+        cls.course = Course.objects.create(title="Django", slug="django", instructor=cls.instructor)
+        cls.student = User.objects.create_user("alumno", password="x")
+        Lesson.objects.create(course=cls.course, title="Modelos", order=1)
+        Enrollment.objects.create(user=cls.student, course=cls.course)
+        Review.objects.create(course=cls.course, user=cls.student, comment="Bien", rating=4)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def changelist(self, model_name, query=""):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/admin/lms/{model_name}/{query}")
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        before = {name: self.changelist(name)[1] for name in ("course", "lesson", "enrollment", "review")}
+        for i in range(5):
+            course = Course.objects.create(title=f"Curso {i}", slug=f"curso-{i}", instructor=self.instructor)
+            student = User.objects.create_user(f"alumno{i}", password="x")
+            Lesson.objects.create(course=course, title="Intro", order=1)
+            Enrollment.objects.create(user=student, course=course)
+            Review.objects.create(course=course, user=student, comment="Bien", rating=5)
+        after = {name: self.changelist(name)[1] for name in before}
+        self.assertEqual(after, before)
+
+    def test_course_list_shows_counters_linked_to_filtered_lists(self):
+        response, _ = self.changelist("course")
+        self.assertContains(response, f'/admin/lms/enrollment/?course__id__exact={self.course.pk}">1</a>', html=False)
+        self.assertContains(response, f'/admin/lms/review/?course__id__exact={self.course.pk}">1</a>', html=False)
+        response, _ = self.changelist("enrollment", f"?course__id__exact={self.course.pk}")
+        self.assertContains(response, "alumno -&gt; Django")
+
+    def test_change_forms_use_autocomplete_instead_of_full_selects(self):
+        enrollment = Enrollment.objects.get()
+        response = self.client.get(f"/admin/lms/enrollment/{enrollment.pk}/change/")
+        self.assertContains(response, "admin-autocomplete")
+        self.assertNotContains(response, f'<option value="{self.instructor.pk}"')
+
+    def test_paginator_counts_exactly_without_estimates(self):
+        # SQLite no tiene estadísticas del planificador: COUNT(*) exacto
+        self.assertIsNone(estimated_count(Enrollment.objects.all()))
+        self.assertEqual(EstimatedCountPaginator(Enrollment.objects.order_by("-id"), 100).count, 1)
+        self.assertIsNone(estimated_count(Enrollment.objects.filter(course=self.course)))
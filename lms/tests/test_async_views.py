@@ -0,0 +1,54 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from lms.models import Course, Enrollment, Lesson, Review
+
+
+class AsyncCatalogViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        cls.student = User.objects.create_user("alumno", password="x")
+        cls.course = Course.objects.create(
+            title="Django async", slug="django-async", instructor=instructor, is_published=True
+        )
+        Course.objects.create(title="Python", slug="python", instructor=instructor, is_published=True)
+        Course.objects.create(title="Borrador", slug="borrador", instructor=instructor)
+        for order in range(1, 4):
+            Lesson.objects.create(course=cls.course, title=f"L{order}", order=order, duration_minutes=10)
+        Review.objects.create(course=cls.course, user=cls.student, comment="Bien", rating=4)
+        Enrollment.objects.create(user=cls.student, course=cls.course)
+
+    async def test_index(self):
+        response = await self.async_client.get("/async/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["courses"]), 2)
+
+    async def test_course_detail_matches_sync_view(self):
+        await sync_to_async(self.client.force_login)(self.student)
+        await sync_to_async(self.async_client.force_login)(self.student)
+        sync_response = await sync_to_async(self.client.get)(f"/course/{self.course.slug}/")
+        response = await self.async_client.get(f"/async/course/{self.course.slug}/")
+        self.assertEqual(response.status_code, 200)
+        for key in ("avg_rating", "total_reviews", "total_lessons", "is_enrolled", "is_instructor", "total_duration"):
+            self.assertEqual(response.context[key], sync_response.context[key], key)
+        # El fragmento de lecciones ya lo cacheó la vista sync: llega el queryset sin evaluar
+        lessons = await sync_to_async(list)(response.context["lessons"])
+        self.assertEqual([lesson.title for lesson in lessons], ["L1", "L2", "L3"])
+        self.assertEqual(response.context["enrollment"].user_id, self.student.pk)
+
+    async def test_course_detail_anonymous_and_missing(self):
+        response = await self.async_client.get(f"/async/course/{self.course.slug}/")
+        self.assertFalse(response.context["is_enrolled"])
+        response = await self.async_client.get("/async/course/no-existe/")
+        self.assertEqual(response.status_code, 404)
+
+    async def test_list_courses(self):
+        response = await self.async_client.get("/api/async/courses/", {"limit": 1, "fields": "id,slug"})
+        data = response.json()
+        self.assertEqual(data["count"], 3)
+        self.assertEqual(len(data["courses"]), 1)
+        self.assertEqual(set(data["courses"][0]), {"id", "slug"})
+        response = await self.async_client.get("/api/async/courses/", {"limit": "x"})
+        self.assertEqual(response.status_code, 400)
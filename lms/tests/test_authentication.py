@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from lms import authentication
+from lms.models import Course
+
+
+@override_settings(LMS_TOKEN_AUTH_CACHE={"TIMEOUT": 60, "MAX_ENTRIES": 100, "CACHE_ALIAS": None})
+class CachedTokenAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alumno", password="x")
+        Course.objects.create(title="Django", slug="django", instructor=cls.user, is_published=True)
+
+    def setUp(self):
+        cache.clear()
+        authentication._token_cache = None
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_obtain_token_endpoint(self):
+        response = APIClient().post("/api-token-auth/", {"username": "alumno", "password": "x"})
+        self.assertEqual(response.json(), {"token": self.token.key})
+
+    def test_cached_reads_need_no_auth_queries(self):
+        self.assertEqual(self.client.get("/api/courses/").status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/courses/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+    def test_deleted_tokens_are_revoked(self):
+        self.client.get("/api/courses/")
+        self.token.delete()
+        self.assertEqual(self.client.get("/api/courses/").status_code, 401)
+
+    def test_deactivated_users_are_revoked(self):
+        self.client.get("/api/courses/")
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/courses/").status_code, 401)
+
+    def test_invalid_tokens_are_not_cached(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token nope")
+        self.assertEqual(self.client.get("/api/courses/").status_code, 401)
+        self.assertIsNone(authentication.get_token_cache().get("nope"))
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alumno", password="x")
+        self.token = Token.objects.select_related("user").get(pk=Token.objects.create(user=self.user).pk)
+
+    def test_lru_is_bounded_and_returns_copies(self):
+        token_cache = authentication.TokenCache(timeout=60, max_entries=1)
+        token_cache.set("a", self.token)
+        first = token_cache.get("a")
+        first.user.username = "cambiado"
+        self.assertEqual(token_cache.get("a").user.username, "alumno")
+        token_cache.set("b", self.token)
+        self.assertIsNone(token_cache.get("a"))
+
+    def test_shared_cache_is_seen_and_revoked_across_processes(self):
+        one, other = (authentication.TokenCache(timeout=60, max_entries=10, alias="default") for _ in range(2))
+        one.set(self.token.key, self.token)
+        self.assertEqual(other.get(self.token.key).user, self.user)
+        one.revoke(self.token.key)
+        self.assertIsNone(authentication.TokenCache(timeout=60, max_entries=10, alias="default").get(self.token.key))
@@ -0,0 +1,121 @@
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from lms.models import Course, CourseStats, Lesson, Review
+
+
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user("profe", email="profe@example.com", password="x")
+        cls.course = Course.objects.create(title="Django", instructor=cls.instructor)
+        cls.other = Course.objects.create(title="Flask", instructor=cls.instructor)
+        cls.lesson = Lesson.objects.create(course=cls.course, title="Modelos")
+
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+
+    def test_second_list_request_is_served_from_cache(self):
+        first = self.client.get("/api/courses/")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/courses/")
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_query_params_are_part_of_the_key(self):
+        first = self.client.get("/api/lessons/", {"course": self.course.pk})
+        second = self.client.get("/api/lessons/", {"course": self.other.pk})
+        self.assertEqual(len(first.json()["results"]), 1)
+        self.assertEqual(second.json()["results"], [])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(f"/api/courses/{self.course.pk}/")["ETag"]
+        response = self.client.get(f"/api/courses/{self.course.pk}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_lesson_save_invalidates_only_its_course_lists(self):
+        self.client.get("/api/lessons/", {"course": self.course.pk})
+        self.client.get("/api/lessons/", {"course": self.other.pk})
+
+        self.lesson.title = "Modelos y migraciones"
+        self.lesson.save()
+
+        response = self.client.get("/api/lessons/", {"course": self.course.pk})
+        self.assertEqual(response.json()["results"][0]["title"], "Modelos y migraciones")
+        with self.assertNumQueries(0):
+            self.client.get("/api/lessons/", {"course": self.other.pk})
+
+    def test_review_delete_refreshes_course_counters(self):
+        review = Review.objects.create(course=self.course, user=self.instructor, comment="Bien", rating=4)
+        url = f"/api/courses/{self.course.pk}/"
+        self.assertEqual(self.client.get(url).json()["review_count"], 1)
+        self.assertEqual(self.client.get("/api/reviews/", {"course": self.course.pk}).json()["count"], 1)
+
+        review.delete()
+        self.assertEqual(self.client.get(url).json()["review_count"], 0)
+        self.assertEqual(self.client.get("/api/reviews/", {"course": self.course.pk}).json()["count"], 0)
+
+    def test_anonymous_and_authenticated_responses_are_cached_separately(self):
+        self.client.get("/api/courses/")
+        self.client.force_authenticate(self.instructor)
+        with self.assertNumQueries(2):
+            self.client.get("/api/courses/")
+
+    def test_instructor_save_refreshes_course_payloads(self):
+        url = f"/api/courses/{self.course.pk}/"
+        self.assertEqual(self.client.get(url).json()["instructor"]["first_name"], "")
+        self.instructor.first_name = "Ana"
+        self.instructor.save()
+        self.assertEqual(self.client.get(url).json()["instructor"]["first_name"], "Ana")
+
+    def test_sync_sort_keys_refreshes_course_lists(self):
+        self.client.get("/api/courses/", {"ordering": "-popularity"})
+        # Contador cambiado sin señales, como al acumular bumps entre pasadas
+        CourseStats.objects.filter(course=self.other).update(enrollment_count=5)
+        CourseStats.sync_sort_keys()
+        response = self.client.get("/api/courses/", {"ordering": "-popularity"})
+        self.assertEqual(response.json()["results"][0]["id"], self.other.pk)
+
+
+class FileBasedResponseCacheTests(ResponseCacheTests):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        settings_override = override_settings(CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": self.cache_dir.name,
+            }
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+
+class CacheSettingsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        Course.objects.create(title="Django", instructor=instructor)
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+            "api": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "api"},
+        },
+        LMS_API_CACHE_ALIAS="api",
+    )
+    def test_cache_alias_is_read_at_call_time(self):
+        client = APIClient()
+        client.get("/api/courses/")
+        with self.assertNumQueries(0):
+            client.get("/api/courses/")
+        caches["api"].clear()
+        with self.assertNumQueries(2):
+            client.get("/api/courses/")
@@ -0,0 +1,102 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from lms.models import Course, CourseStats, Enrollment, Review
+
+
+class CatalogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        students = [User.objects.create_user(f"alumno{i}", password="x") for i in range(3)]
+        cls.cheap = Course.objects.create(title="Barato", slug="barato", instructor=instructor, price=Decimal("5"), is_published=True)
+        cls.popular = Course.objects.create(title="Popular", slug="popular", instructor=instructor, price=Decimal("50"), is_published=True)
+        cls.rated = Course.objects.create(title="Valorado", slug="valorado", instructor=instructor, price=Decimal("20"), is_published=True)
+        cls.draft = Course.objects.create(title="Borrador", slug="borrador", instructor=instructor)
+        for student in students:
+            Enrollment.objects.create(user=student, course=cls.popular)
+            Enrollment.objects.create(user=student, course=cls.draft)
+        Enrollment.objects.create(user=students[0], course=cls.rated)
+        Review.objects.create(user=students[0], course=cls.rated, comment="Excelente", rating=5)
+        Review.objects.create(user=students[0], course=cls.popular, comment="Regular", rating=3)
+        Review.objects.create(user=students[1], course=cls.popular, comment="Bien", rating=4)
+        CourseStats.sync_sort_keys()
+
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+
+    def slugs(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [course["slug"] for course in response.data["results"]]
+
+    def test_sort_keys_follow_stats(self):
+        self.popular.refresh_from_db()
+        self.rated.refresh_from_db()
+        self.assertEqual(self.popular.popularity, 3)
+        self.assertEqual(self.popular.rating_avg, 3.5)
+        self.assertEqual(self.rated.rating_avg, 5.0)
+
+        Review.objects.filter(course=self.rated).delete()
+        with CaptureQueriesContext(connection) as queries:
+            Enrollment.objects.create(user=User.objects.get(username="alumno1"), course=self.rated)
+        self.assertFalse(any('UPDATE "lms_course"' in query["sql"] for query in queries))
+        self.rated.refresh_from_db()
+        self.assertEqual((self.rated.rating_avg, self.rated.popularity), (5.0, 1))
+
+        call_command("sync_sort_keys", stdout=StringIO())
+        self.rated.refresh_from_db()
+        self.assertEqual((self.rated.rating_avg, self.rated.popularity), (0, 2))
+
+    def test_api_sorts_published_courses(self):
+        self.assertEqual(self.slugs("/api/catalog/"), ["popular", "valorado", "barato"])
+        self.assertEqual(self.slugs("/api/catalog/?ordering=-rating_avg"), ["valorado", "popular", "barato"])
+        self.assertEqual(self.slugs("/api/catalog/?ordering=price"), ["barato", "valorado", "popular"])
+        self.assertEqual(self.slugs("/api/catalog/?ordering=-price&paginate=cursor"), ["popular", "valorado", "barato"])
+
+    def test_sort_does_not_aggregate(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/catalog/?ordering=-popularity")
+        self.assertFalse(any("lms_enrollment" in query["sql"] or "lms_review" in query["sql"] for query in queries))
+
+    def test_index_page(self):
+        response = self.client.get("/?sort=rating")
+        self.assertEqual([course.slug for course in response.context["courses"]], ["valorado", "popular", "barato"])
+        response = self.client.get("/?sort=nope")
+        self.assertEqual(response.context["sort"], "popular")
+
+
+# Recorre decenas de páginas: sin throttling para no agotar el bucket anónimo
+@override_settings(LMS_THROTTLE_RATES={})
+class CatalogCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        # Casi todos con popularity=0, como un catálogo real
+        courses = Course.objects.bulk_create(
+            Course(title=f"Curso {i}", slug=f"curso-{i}", instructor=instructor, is_published=True,
+                   popularity=5 if i % 100 == 0 else 0)
+            for i in range(1050)
+        )
+        cls.expected = [course.pk for course in sorted(courses, key=lambda course: (-course.popularity, -course.pk))]
+
+    def test_deep_cursor_pages_over_tied_sort_keys(self):
+        caches["default"].clear()
+        client = APIClient()
+        url, ids = "/api/catalog/?paginate=cursor&ordering=-popularity&fields=id", []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(course["id"] for course in response.data["results"])
+            url = response.data["next"]
+            self.assertLessEqual(len(ids), len(self.expected), "el cursor no avanza")
+        self.assertEqual(ids, self.expected)
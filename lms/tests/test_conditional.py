@@ -0,0 +1,96 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils.http import http_date
+
+from lms.models import Course, Enrollment, Lesson, Review
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user("profe", password="x")
+        cls.student = User.objects.create_user("alumno", password="x")
+        cls.course = Course.objects.create(title="Django", slug="django", instructor=cls.instructor, is_published=True)
+        cls.lesson = Lesson.objects.create(course=cls.course, title="Modelos", order=1)
+        cls.review = Review.objects.create(course=cls.course, user=cls.student, comment="Muy claro", rating=5)
+
+    def setUp(self):
+        cache.clear()
+        self.page = f"/course/{self.course.slug}/"
+        self.api = f"/api/courses/{self.course.pk}/"
+
+    def etag(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_page_revalidation_is_one_query(self):
+        response = self.client.get(self.page)
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+        with self.assertNumQueries(1):
+            response = self.client.get(self.page, headers={"if-none-match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.page)["Last-Modified"]
+        response = self.client.get(self.page, headers={"if-modified-since": last_modified})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.page, headers={"if-modified-since": http_date(0)})
+        self.assertEqual(response.status_code, 200)
+
+    def test_course_lesson_review_and_enrollment_changes_change_the_etag(self):
+        etags = {self.etag(self.page)}
+        self.course.description = "Nueva descripción"
+        self.course.save()
+        etags.add(self.etag(self.page))
+        self.lesson.title = "Vistas"
+        self.lesson.save()
+        etags.add(self.etag(self.page))
+        Review.objects.filter(pk=self.review.pk).delete()
+        etags.add(self.etag(self.page))
+        Enrollment.objects.create(user=self.student, course=self.course)
+        etags.add(self.etag(self.page))
+        self.assertEqual(len(etags), 5)
+
+    def test_page_validators_depend_on_the_user(self):
+        anonymous = self.etag(self.page)
+        self.client.force_login(self.student)
+        student = self.etag(self.page)
+        self.assertNotEqual(anonymous, student)
+        Enrollment.objects.create(user=self.student, course=self.course)
+        enrolled = self.etag(self.page, **{"if-none-match": student})
+        Enrollment.objects.filter(user=self.student).update(is_completed=True)
+        self.assertNotEqual(self.etag(self.page, **{"if-none-match": enrolled}), enrolled)
+
+    def test_pending_messages_skip_the_304(self):
+        self.client.force_login(self.student)
+        self.client.post(f"/course/{self.course.slug}/enroll/")
+        self.assertNotIn("ETag", self.client.get(self.page))  # muestra el mensaje de la inscripción
+        etag = self.etag(self.page)
+        self.client.post(f"/course/{self.course.slug}/enroll/")  # "ya estás inscrito"
+        response = self.client.get(self.page, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(self.page, headers={"if-none-match": etag}).status_code, 304)
+
+    async def test_async_page(self):
+        response = await self.async_client.get(f"/async{self.page}")
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(f"/async{self.page}", headers={"if-none-match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    def test_api_revalidation_is_one_query(self):
+        etag = self.etag(self.api)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.api, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("Authorization", response["Vary"])
+        self.assertNotEqual(self.etag(f"{self.api}?fields=id,title"), etag)
+        self.course.title = "Django 5"
+        self.course.save()
+        response = self.client.get(self.api, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Django 5")
+        self.assertEqual(self.client.get("/api/courses/999/").status_code, 404)
@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from lms import progress
+from lms.models import Course, CourseStats, Enrollment, Lesson
+
+
+class DashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user("profe", password="x")
+        cls.student = User.objects.create_user("alumno", password="x")
+        other = User.objects.create_user("otro", password="x")
+        cls.courses = []
+        for index in range(3):
+            course = Course.objects.create(title=f"Curso {index}", slug=f"curso-{index}", instructor=cls.instructor)
+            for order in range(1, index + 2):
+                Lesson.objects.create(course=course, title=f"L{order}", order=order, duration_minutes=10)
+            Enrollment.objects.create(user=other, course=course)
+            cls.courses.append(course)
+        cls.enrollment = Enrollment.objects.create(user=cls.student, course=cls.courses[2])
+        Enrollment.objects.create(user=cls.student, course=cls.courses[0])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_login(self.student)
+
+    def results(self):
+        response = self.client.get("/api/dashboard/")
+        self.assertEqual(response.status_code, 200)
+        return {item["course"]["id"]: item for item in response.json()["results"]}
+
+    def test_returns_each_enrolled_course_with_its_aggregates(self):
+        progress.mark_lessons(self.enrollment, list(self.courses[2].lessons.all()[:2]))
+        results = self.results()
+        self.assertEqual(list(results), [self.courses[0].pk, self.courses[2].pk])
+        item = results[self.courses[2].pk]
+        self.assertEqual(item["course"]["instructor"]["username"], "profe")
+        self.assertEqual(
+            {key: item[key] for key in ("lesson_count", "total_duration", "enrollment_count", "completed_lessons", "progress_percent")},
+            {"lesson_count": 3, "total_duration": 30, "enrollment_count": 2, "completed_lessons": 2, "progress_percent": 67},
+        )
+
+    def test_constant_queries(self):
+        with self.assertNumQueries(3):  # sesión, usuario y el dashboard
+            self.client.get("/api/dashboard/")
+        for course in self.courses[1:2]:
+            Enrollment.objects.create(user=self.student, course=course)
+        with self.assertNumQueries(3):
+            self.assertEqual(len(self.results()), 3)
+
+    def test_missing_stats_rows_fall_back_to_subqueries(self):
+        CourseStats.objects.filter(course=self.courses[2]).delete()
+        item = self.results()[self.courses[2].pk]
+        self.assertEqual((item["lesson_count"], item["total_duration"], item["enrollment_count"]), (3, 30, 2))
+        self.assertFalse(CourseStats.objects.filter(course=self.courses[2]).exists())
+
+    def test_my_courses_shares_the_query(self):
+        response = self.client.get("/my-courses/")
+        self.assertEqual(
+            [(item["course"].pk, item["total_lessons"], item["enrollment_count"]) for item in response.context["courses_data"]],
+            [(self.courses[0].pk, 1, 2), (self.courses[2].pk, 3, 2)],
+        )
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertIn(self.client.get("/api/dashboard/").status_code, (401, 403))
@@ -0,0 +1,146 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from lms import enrollments
+from lms.models import Course, CourseStats, Enrollment
+
+
+class EnrollServiceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user("profe", password="x")
+        cls.students = [User.objects.create_user(f"alumno{i}", password="x") for i in range(3)]
+        cls.course = Course.objects.create(title="Django", slug="django", instructor=cls.instructor, is_published=True)
+        cls.small = Course.objects.create(
+            title="Taller", slug="taller", instructor=cls.instructor, is_published=True, capacity=2
+        )
+
+    def test_enroll_is_idempotent(self):
+        enrollment, created = enrollments.enroll(self.students[0], self.course)
+        self.assertTrue(created)
+        again, created = enrollments.enroll(self.students[0], self.course)
+        self.assertFalse(created)
+        self.assertEqual(again.pk, enrollment.pk)
+        self.assertEqual(Enrollment.objects.filter(course=self.course).count(), 1)
+        self.assertEqual(CourseStats.objects.get(course=self.course).enrollment_count, 1)
+        # La clave de orden del catálogo se copia en lote, no en cada inscripción
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.popularity, 0)
+        CourseStats.sync_sort_keys()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.popularity, 1)
+
+    def test_capacity_is_enforced(self):
+        for student in self.students[:2]:
+            enrollments.enroll(student, self.small)
+        with self.assertRaises(enrollments.CourseFull):
+            enrollments.enroll(self.students[2], self.small)
+        # Los ya inscritos no ocupan otra plaza
+        self.assertFalse(enrollments.enroll(self.students[0], self.small)[1])
+        self.assertEqual(Enrollment.objects.filter(course=self.small).count(), 2)
+        self.assertEqual(CourseStats.objects.get(course=self.small).enrollment_count, 2)
+
+    def test_capacity_with_missing_stats_row(self):
+        CourseStats.objects.filter(course=self.small).delete()
+        self.small = Course.objects.get(pk=self.small.pk)
+        enrollments.enroll(self.students[0], self.small)
+        enrollments.enroll(self.students[1], self.small)
+        with self.assertRaises(enrollments.CourseFull):
+            enrollments.enroll(self.students[2], self.small)
+        self.assertEqual(CourseStats.objects.get(course=self.small).enrollment_count, 2)
+
+    def test_api_create(self):
+        client = APIClient()
+        client.force_authenticate(self.students[0])
+        response = client.post("/api/enrollments/", {"course": self.course.pk}, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["user"], self.students[0].pk)
+        self.assertEqual(response.data["progress_percent"], 0)
+        response = client.post("/api/enrollments/", {"course": self.course.pk}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("non_field_errors", response.data)
+
+    def test_api_and_view_report_full_course(self):
+        self.small.capacity = 0
+        self.small.save()
+        client = APIClient()
+        client.force_authenticate(self.students[0])
+        response = client.post("/api/enrollments/", {"course": self.small.pk}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("course", response.data)
+
+        self.client.force_login(self.students[0])
+        response = self.client.post(f"/course/{self.small.slug}/enroll/", follow=True)
+        self.assertIn("no tiene plazas", " ".join(str(m) for m in response.context["messages"]))
+        self.assertFalse(Enrollment.objects.filter(course=self.small).exists())
+
+
+class ConcurrentEnrollmentTests(TransactionTestCase):
+    """
+    Real concurrent connections on a server database. SQLite locks the whole
+    file on write, so there the same requests run one after another: the
+    duplicate and capacity guarantees are still checked on every backend.
+    """
+    THREADS = 24
+
+    def setUp(self):
+        # Sin contraseña: el hash costaría más que el propio test
+        instructor = User.objects.create_user("profe")
+        self.students = [User.objects.create_user(f"alumno{i}") for i in range(self.THREADS)]
+        self.course = Course.objects.create(title="Lanzamiento", slug="lanzamiento", instructor=instructor, capacity=10)
+
+    def run_threads(self, target):
+        if not connection.features.has_select_for_update:
+            return self.run_sequentially(target)
+        barrier = threading.Barrier(self.THREADS)
+        results, errors = [], []
+
+        def worker(index):
+            try:
+                barrier.wait()
+                results.append(target(index))
+            except Exception as exc:  # noqa: BLE001 - se reporta en la aserción
+                errors.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def run_sequentially(self, target):
+        results, errors = [], []
+        for index in range(self.THREADS):
+            try:
+                results.append(target(index))
+            except Exception as exc:  # noqa: BLE001 - se reporta en la aserción
+                errors.append(exc)
+        return results, errors
+
+    def test_same_student_many_requests(self):
+        student = self.students[0]
+        course = Course.objects.get(pk=self.course.pk)
+        course.capacity = None
+        course.save()
+        results, errors = self.run_threads(lambda i: enrollments.enroll(student, course)[1])
+        self.assertEqual(errors, [])
+        self.assertEqual(results.count(True), 1)
+        self.assertEqual(Enrollment.objects.filter(user=student, course=course).count(), 1)
+        self.assertEqual(CourseStats.objects.get(course=course).enrollment_count, 1)
+
+    def test_capacity_is_never_oversold(self):
+        course = Course.objects.get(pk=self.course.pk)
+        results, errors = self.run_threads(lambda i: enrollments.enroll(self.students[i], course)[1])
+        self.assertEqual(len(results), 10)
+        self.assertEqual(len(errors), self.THREADS - 10)
+        self.assertTrue(all(isinstance(exc, enrollments.CourseFull) for exc in errors), errors)
+        self.assertEqual(Enrollment.objects.filter(course=course).count(), 10)
+        self.assertEqual(CourseStats.objects.get(course=course).enrollment_count, 10)
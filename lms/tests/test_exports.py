@@ -0,0 +1,57 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from lms.models import Course
+
+
+class CourseExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        cls.courses = [
+            Course.objects.create(title=f"Curso {i}", slug=f"curso-{i}", description="á" * 10, instructor=instructor)
+            for i in range(5)
+        ]
+        cls.url = reverse("list_courses_ajax")
+
+    def get(self, **params):
+        return self.client.get(self.url, params, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+
+    def test_default_mode_is_unchanged(self):
+        response = self.get()
+        self.assertEqual(len(response.json()["courses"]), 5)
+        self.assertEqual(set(response.json()["courses"][0]), {"id", "title", "description"})
+
+    def test_stream_json(self):
+        with self.assertNumQueries(1):
+            response = self.get(stream="json", fields="id,slug", chunk_size=2)
+            body = b"".join(response.streaming_content)
+        data = json.loads(body)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(sorted(row["slug"] for row in data["courses"]), [f"curso-{i}" for i in range(5)])
+        self.assertEqual(set(data["courses"][0]), {"id", "slug"})
+
+    def test_stream_ndjson_since(self):
+        cutoff = timezone.now()
+        Course.objects.filter(pk__in=[self.courses[1].pk, self.courses[3].pk]).update(
+            updated_at=cutoff + timedelta(minutes=1)
+        )
+        response = self.get(stream="ndjson", since=cutoff.isoformat())
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual([row["id"] for row in rows], [self.courses[1].pk, self.courses[3].pk])
+
+    def test_stream_empty(self):
+        response = self.get(stream="json", since="2999-01-01T00:00:00Z")
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), {"courses": []})
+
+    def test_invalid_params(self):
+        self.assertEqual(self.get(fields="id,password").status_code, 400)
+        self.assertEqual(self.get(since="ayer").status_code, 400)
+        self.assertEqual(self.get(stream="xml").status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
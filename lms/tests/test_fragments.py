@@ -0,0 +1,67 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from lms import cache as lms_cache
+from lms.models import Course, Enrollment, Lesson, Review
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        cls.student = User.objects.create_user("alumno", password="x")
+        cls.course = Course.objects.create(title="Django", slug="django", instructor=instructor, is_published=True)
+        cls.lesson = Lesson.objects.create(course=cls.course, title="Modelos", order=1)
+        cls.review = Review.objects.create(course=cls.course, user=cls.student, comment="Muy claro", rating=5)
+
+    def setUp(self):
+        cache.clear()
+        self.url = f"/course/{self.course.slug}/"
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, [query["sql"] for query in queries]
+
+    def test_warm_course_page_skips_lesson_and_review_queries(self):
+        _, cold = self.get(self.url)
+        response, warm = self.get(self.url)
+        self.assertEqual(len(warm), len(cold) - 2)
+        # Los validadores de conditional.py solo leen updated_at en subconsultas
+        self.assertFalse(any('"lms_lesson"."id"' in sql or '"lms_review"."id"' in sql for sql in warm))
+        self.assertContains(response, "Modelos")
+        self.assertContains(response, "Muy claro")
+
+    def test_lesson_and_review_writes_refresh_the_fragments(self):
+        self.get(self.url)
+        self.lesson.title = "Vistas"
+        self.lesson.save()
+        Review.objects.filter(pk=self.review.pk).delete()
+        response, _ = self.get(self.url)
+        self.assertContains(response, "Vistas")
+        self.assertNotContains(response, "Muy claro")
+
+    def test_user_specific_parts_stay_outside_the_cache(self):
+        self.get(self.url)  # anónimo: cachea los fragmentos
+        Enrollment.objects.create(user=self.student, course=self.course)
+        self.client.force_login(self.student)
+        response, _ = self.get(self.url)
+        self.assertContains(response, "Estás inscrito en este curso")
+        self.assertContains(response, "Modelos")
+
+    def test_enrollments_do_not_bump_the_content_version(self):
+        before = lms_cache.content_versions([self.course.pk])
+        Enrollment.objects.create(user=self.student, course=self.course)
+        self.assertEqual(lms_cache.content_versions([self.course.pk]), before)
+
+    def test_index_cards_follow_course_saves(self):
+        response, _ = self.get("/")
+        self.assertContains(response, "Django")
+        self.course.title = "Django avanzado"
+        self.course.save()
+        response, _ = self.get("/")
+        self.assertContains(response, "Django avanzado")
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from lms.models import Course, CourseStats, Lesson
+from lms.serializers import LessonReorderSerializer
+
+
+class LessonBulkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("profe", password="x", is_staff=True)
+        cls.course = Course.objects.create(title="Django", slug="django", instructor=cls.staff)
+        cls.other = Course.objects.create(title="Flask", slug="flask", instructor=cls.staff)
+        cls.lessons = [
+            Lesson.objects.create(course=cls.course, title=f"L{order}", order=order, duration_minutes=10)
+            for order in (1, 2, 3)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_login(self.staff)
+
+    def bulk(self, method, data):
+        return getattr(self.client, method)("/api/lessons/bulk/", data, format="json")
+
+    def test_create(self):
+        response = self.bulk("post", [
+            {"course": self.other.pk, "title": "Intro", "order": 1, "duration_minutes": 5},
+            {"course": self.other.pk, "title": "Rutas", "order": 2, "duration_minutes": 7},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(self.other.lessons.order_by("order").values_list("title", flat=True)), ["Intro", "Rutas"])
+        stats = CourseStats.objects.get(course=self.other)
+        self.assertEqual((stats.lesson_count, stats.total_duration), (2, 12))
+
+    def test_patch(self):
+        response = self.bulk("patch", [
+            {"id": self.lessons[0].pk, "duration_minutes": 30},
+            {"id": self.lessons[2].pk, "title": "Final"},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.lessons[0].refresh_from_db()
+        self.assertEqual(self.lessons[0].duration_minutes, 30)
+        self.assertEqual(Lesson.objects.get(pk=self.lessons[2].pk).title, "Final")
+        self.assertEqual(CourseStats.objects.get(course=self.course).total_duration, 50)
+
+    def test_delete(self):
+        response = self.client.delete("/api/lessons/bulk/", {"ids": [self.lessons[0].pk, self.lessons[1].pk]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(self.course.lessons.values_list("pk", flat=True)), [self.lessons[2].pk])
+        self.assertEqual(CourseStats.objects.get(course=self.course).lesson_count, 1)
+
+    def test_malformed_payloads_are_400(self):
+        cases = [
+            ("patch", [{"id": "abc"}]),
+            ("patch", [{"id": [1]}]),
+            ("patch", [{"title": "sin id"}]),
+            ("patch", [{"id": self.lessons[0].pk}, {"id": self.lessons[0].pk}]),
+            ("patch", [{"id": 999999}]),
+            ("patch", {"id": 1}),
+            ("post", [{"course": [1], "title": "x", "order": 9}]),
+            ("post", [{"course": {"id": 1}, "title": "x", "order": 9}]),
+            ("post", [{"course": self.course.pk, "title": "x", "order": 1}]),
+            ("delete", {"ids": ["abc"]}),
+            ("delete", {"ids": [[1]]}),
+            ("delete", {"ids": []}),
+            ("delete", [1, 2]),
+        ]
+        for method, data in cases:
+            with self.subTest(method=method, data=data):
+                self.assertEqual(self.bulk(method, data).status_code, 400)
+        self.assertEqual(self.course.lessons.count(), 3)
+
+    def test_reorder_updates_order_and_updated_at(self):
+        Lesson.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        before = timezone.now()
+        new_order = [self.lessons[2].pk, self.lessons[0].pk, self.lessons[1].pk]
+        response = self.client.post("/api/lessons/reorder/", {"course": self.course.pk, "lessons": new_order}, format="json")
+        self.assertEqual(response.status_code, 200)
+        rows = list(self.course.lessons.order_by("order").values_list("pk", "updated_at"))
+        self.assertEqual([pk for pk, _ in rows], new_order)
+        self.assertTrue(all(updated_at >= before for _, updated_at in rows))
+
+    def test_reorder_rejects_incomplete_or_malformed_lists(self):
+        for lessons in ([self.lessons[0].pk], [self.lessons[0].pk] * 3, ["abc"], []):
+            with self.subTest(lessons=lessons):
+                response = self.client.post("/api/lessons/reorder/", {"course": self.course.pk, "lessons": lessons}, format="json")
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(self.course.lessons.order_by("order").values_list("order", flat=True)), [1, 2, 3])
+
+    def test_reorder_parks_above_its_own_course_only(self):
+        Lesson.objects.create(course=self.other, title="Lejos", order=5000)
+        new_order = [lesson.pk for lesson in reversed(self.lessons)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/lessons/reorder/", {"course": self.course.pk, "lessons": new_order}, format="json")
+        self.assertEqual(response.status_code, 200)
+        ceiling = next(query["sql"] for query in queries if 'MAX("lms_lesson"."order")' in query["sql"])
+        self.assertIn('"course_id" IN (SELECT', ceiling)
+
+    def test_reorder_revalidates_under_the_course_lock(self):
+        serializer = LessonReorderSerializer(data={"course": self.course.pk, "lessons": [lesson.pk for lesson in self.lessons]})
+        self.assertTrue(serializer.is_valid())
+        # Otra petición añade una lección entre la validación y el guardado
+        Lesson.objects.create(course=self.course, title="L4", order=4)
+        with self.assertRaises(ValidationError):
+            serializer.save()
+        self.assertEqual(list(self.course.lessons.order_by("order").values_list("order", flat=True)), [1, 2, 3, 4])
@@ -0,0 +1,58 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from lms import loadtest
+from lms.models import Course, Enrollment, Lesson
+
+
+class LoadTestHarnessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        cls.real = Course.objects.create(title="Real", slug="real", instructor=instructor, is_published=True)
+        cls.real_lessons = [
+            Lesson.objects.create(course=cls.real, title=f"L{order}", order=order, duration_minutes=10) for order in (1, 2)
+        ]
+        Enrollment.objects.create(user=User.objects.create_user("alumno", password="x"), course=cls.real)
+        loadtest.seed(courses=4, lessons_per_course=3, students=3, enrollments_per_student=2, instructors=2)
+
+    def test_refuses_unseeded_databases(self):
+        Course.objects.filter(slug__startswith=f"{loadtest.SEED_PREFIX}-").delete()
+        with self.assertRaises(ValueError):
+            loadtest.Fixtures()
+
+    def test_writes_only_touch_seeded_objects(self):
+        fixtures = loadtest.Fixtures()
+        self.assertNotIn(self.real.pk, [pk for pk, _ in fixtures.courses])
+        transport = loadtest.InProcessTransport({"anon": None, "student": fixtures.student, "staff": fixtures.staff})
+        for scenario in loadtest.build_scenarios(fixtures):
+            if scenario.method != "GET":
+                loadtest.run_scenario(transport, scenario, requests=5, concurrency=1)
+        self.assertEqual(
+            list(Lesson.objects.filter(course=self.real).order_by("pk").values_list("order", "duration_minutes")),
+            [(1, 10), (2, 10)],
+        )
+        self.assertEqual(Enrollment.objects.filter(course=self.real).count(), 1)
+
+    def test_every_scenario_succeeds_in_process(self):
+        fixtures = loadtest.Fixtures()
+        transport = loadtest.InProcessTransport({"anon": None, "student": fixtures.student, "staff": fixtures.staff})
+        for scenario in loadtest.build_scenarios(fixtures):
+            with self.subTest(scenario.name):
+                row = loadtest.run_scenario(transport, scenario, requests=2, concurrency=1)
+                self.assertEqual(row["errors"], 0, row["statuses"])
+                self.assertEqual(row["requests"], 2)
+                self.assertIsNotNone(row["queries"])
+
+    def test_compare_flags_regressions(self):
+        baseline = {"scenarios": {"home": {"rps": 100.0, "p95_ms": 10.0, "queries": 2}}}
+        results = {
+            "home": {"rps": 70.0, "p95_ms": 11.0, "queries": 3},
+            "new-scenario": {"rps": 1.0, "p95_ms": 1.0, "queries": 1},
+        }
+        rows = {row["metric"]: row for row in loadtest.compare(results, baseline, tolerance=0.2)}
+        self.assertEqual(set(rows), {"rps", "p95_ms", "queries"})
+        self.assertTrue(rows["rps"]["regressed"])
+        self.assertEqual(rows["rps"]["change"], -30.0)
+        self.assertFalse(rows["p95_ms"]["regressed"])
+        self.assertTrue(rows["queries"]["regressed"])
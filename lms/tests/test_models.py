@@ -0,0 +1,106 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from lms import enrollments
+from lms.models import Course, CourseStats, Enrollment, Lesson, Review
+
+
+class CourseStatsConsistencyTests(TestCase):
+    """
+    The counters kept incrementally by the signals must always equal a full
+    CourseStats.rebuild(); each test checks them after a different write path.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user("profe", password="x", is_staff=True)
+        cls.students = [User.objects.create_user(f"alumno{i}", password="x") for i in range(3)]
+        cls.course = Course.objects.create(title="Django", slug="django", instructor=cls.instructor)
+        cls.other = Course.objects.create(title="Flask", slug="flask", instructor=cls.instructor)
+        for course in (cls.course, cls.other):
+            for order in (1, 2):
+                Lesson.objects.create(course=course, title=f"L{order}", order=order, duration_minutes=10 * order)
+        for rating, student in zip((5, 3, 4), cls.students):
+            Review.objects.create(course=cls.course, user=student, comment="Bien", rating=rating)
+            Enrollment.objects.create(user=student, course=cls.course)
+
+    def counters(self):
+        fields = list(CourseStats.counter_subqueries())
+        return {row["course"]: row for row in CourseStats.objects.order_by("course").values("course", *fields)}
+
+    def assertMatchesRebuild(self):
+        incremental = self.counters()
+        CourseStats.rebuild()
+        self.assertEqual(incremental, self.counters())
+
+    def test_initial_data(self):
+        self.assertMatchesRebuild()
+
+    def test_review_rating_change(self):
+        review = Review.objects.get(user=self.students[0])
+        review.rating = 1
+        review.save()
+        self.assertMatchesRebuild()
+
+    def test_review_moved_to_another_course(self):
+        review = Review.objects.get(user=self.students[1])
+        review.course = self.other
+        review.rating = 2
+        review.save()
+        self.assertMatchesRebuild()
+
+    def test_lesson_duration_change_and_move(self):
+        lesson = self.course.lessons.get(order=1)
+        lesson.duration_minutes = 45
+        lesson.save()
+        self.assertMatchesRebuild()
+        lesson.course = self.other
+        lesson.order = 3
+        lesson.duration_minutes = 5
+        lesson.save()
+        self.assertMatchesRebuild()
+
+    def test_deletes(self):
+        Review.objects.get(user=self.students[0]).delete()
+        self.course.lessons.get(order=2).delete()
+        Enrollment.objects.filter(user=self.students[1]).delete()
+        self.assertMatchesRebuild()
+        # Cascada: reseñas e inscripciones del usuario en todos sus cursos
+        self.students[2].delete()
+        self.assertMatchesRebuild()
+
+    def test_enroll(self):
+        enrollments.enroll(self.students[0], self.other)
+        self.other.capacity = 5
+        self.other.save()
+        enrollments.enroll(self.students[1], self.other)
+        enrollments.enroll(self.students[1], self.other)
+        self.assertMatchesRebuild()
+
+    def test_bulk_api_paths(self):
+        client = APIClient()
+        client.force_login(self.instructor)
+        first, second = self.course.lessons.order_by("order")
+        response = client.post("/api/lessons/bulk/", [
+            {"course": self.course.pk, "title": "L3", "order": 3, "duration_minutes": 7},
+            {"course": self.other.pk, "title": "L3", "order": 3, "duration_minutes": 8},
+        ], format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertMatchesRebuild()
+
+        response = client.patch("/api/lessons/bulk/", [
+            {"id": first.pk, "duration_minutes": 60},
+            {"id": second.pk, "course": self.other.pk, "order": 9, "duration_minutes": 1},
+        ], format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertMatchesRebuild()
+
+        lessons = list(self.course.lessons.order_by("-order").values_list("pk", flat=True))
+        response = client.post("/api/lessons/reorder/", {"course": self.course.pk, "lessons": lessons}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertMatchesRebuild()
+
+        response = client.delete("/api/lessons/bulk/", {"ids": [first.pk, second.pk]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertMatchesRebuild()
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPServerDisconnected
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from lms import outbox
+from lms.models import OutboundEmail
+
+
+class CountingBackend(LocmemBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class BrokenBackend(LocmemBackend):
+    """Stand-in for an unreachable SMTP server."""
+
+    def open(self):
+        raise SMTPServerDisconnected("Connection unexpectedly closed")
+
+    def send_messages(self, messages):
+        self.open()
+
+
+class InspectingBackend(LocmemBackend):
+    """Records the row status and open transactions while each message is sent."""
+
+    seen = []
+
+    def send_messages(self, messages):
+        for message in messages:
+            email = OutboundEmail.objects.get(to=message.to)
+            InspectingBackend.seen.append((email.status, len(connection.atomic_blocks)))
+        return super().send_messages(messages)
+
+
+class OutboxTests(TestCase):
+    @override_settings(EMAIL_BACKEND="lms.tests.test_outbox.BrokenBackend")
+    def test_signup_only_enqueues_activation_email(self):
+        user = User.objects.create_user("alumno", email="alumno@example.com", password="x")
+
+        self.assertEqual(mail.outbox, [])
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to, [user.email])
+        self.assertEqual(email.status, OutboundEmail.STATUS_PENDING)
+
+    @override_settings(EMAIL_BACKEND="lms.tests.test_outbox.CountingBackend")
+    def test_worker_sends_batch_over_one_connection(self):
+        CountingBackend.opened = 0
+        for i in range(3):
+            outbox.enqueue("Hola", "Cuerpo", [f"user{i}@example.com"])
+
+        call_command("send_outbox", stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+
+    @override_settings(EMAIL_BACKEND="lms.tests.test_outbox.BrokenBackend")
+    def test_failures_are_retried_with_backoff(self):
+        email = outbox.enqueue("Hola", "Cuerpo", ["user@example.com"])
+
+        self.assertEqual(outbox.send_pending(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.status, OutboundEmail.STATUS_PENDING)
+        self.assertGreater(email.next_attempt_at, timezone.now() + outbox.retry_delay(1) - timedelta(seconds=5))
+        self.assertIn("SMTPServerDisconnected", email.last_error)
+
+        # No vuelve a intentarse antes de tiempo
+        self.assertEqual(outbox.send_pending(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND="lms.tests.test_outbox.BrokenBackend")
+    def test_gives_up_after_max_attempts(self):
+        email = outbox.enqueue("Hola", "Cuerpo", ["user@example.com"])
+        for _ in range(2):
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            outbox.send_pending(max_attempts=2)
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_FAILED)
+        self.assertEqual(email.attempts, 2)
+
+    @override_settings(EMAIL_BACKEND="lms.tests.test_outbox.InspectingBackend")
+    def test_sends_outside_the_claim_transaction(self):
+        InspectingBackend.seen = []
+        outbox.enqueue("Hola", "Cuerpo", ["user@example.com"])
+        depth = len(connection.atomic_blocks)
+
+        self.assertEqual(outbox.send_pending(), (1, 0))
+        self.assertEqual(InspectingBackend.seen, [(OutboundEmail.STATUS_SENDING, depth)])
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts, email.claimed_at), (OutboundEmail.STATUS_SENT, 1, None))
+
+    def test_claimed_rows_are_skipped_until_stale(self):
+        email = outbox.enqueue("Hola", "Cuerpo", ["user@example.com"])
+        self.assertEqual(outbox.claim(), [email])
+        self.assertEqual(outbox.claim(), [])
+
+        later = timezone.now() + timedelta(seconds=outbox.CLAIM_TIMEOUT_SECONDS + 1)
+        self.assertEqual(outbox.claim(now=later), [email])
+
+    @override_settings(EMAIL_BACKEND="lms.tests.test_outbox.CountingBackend")
+    def test_reclaimed_rows_ignore_the_stale_worker(self):
+        email = outbox.enqueue("Hola", "Cuerpo", ["user@example.com"])
+        [stale] = outbox.claim()
+        OutboundEmail.objects.update(claimed_at=timezone.now() - timedelta(seconds=outbox.CLAIM_TIMEOUT_SECONDS + 1))
+
+        self.assertEqual(outbox.send_pending(), (1, 0))
+        outbox._record_failure(stale, SMTPServerDisconnected("tarde"), timezone.now(), outbox.MAX_ATTEMPTS)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts, email.last_error), (OutboundEmail.STATUS_SENT, 1, ""))
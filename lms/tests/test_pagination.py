@@ -0,0 +1,69 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from lms.models import Course, Lesson
+
+TIED = 1050
+
+
+# Recorre decenas de páginas: sin throttling para no agotar el bucket anónimo
+@override_settings(LMS_THROTTLE_RATES={})
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        courses = Course.objects.bulk_create(
+            Course(title=f"Curso {i}", slug=f"curso-{i}", instructor=instructor) for i in range(TIED)
+        )
+        # Todas empatan en order=1: más filas empatadas que el offset_cutoff (1000) de DRF
+        Lesson.objects.bulk_create(Lesson(course=course, title="Intro", order=1, slot=0) for course in courses)
+        cls.ids = sorted(Lesson.objects.values_list("id", flat=True))
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def walk(self, url, link="next"):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = [row["id"] for row in response.data["results"]]
+            ids.extend(page if link == "next" else reversed(page))
+            url = response.data[link]
+            pages += 1
+            self.assertLessEqual(pages, TIED, "el cursor no avanza")
+        return ids, pages
+
+    def test_pages_past_more_than_a_thousand_tied_rows(self):
+        ids, pages = self.walk("/api/lessons/?paginate=cursor&fields=id")
+        self.assertEqual(ids, self.ids)
+        self.assertEqual(pages, -(-TIED // 20))
+
+    def test_descending_deep_pages_have_no_duplicates_or_gaps(self):
+        ids, _ = self.walk("/api/lessons/?paginate=cursor&ordering=-order&fields=id")
+        self.assertEqual(ids, self.ids[::-1])
+
+    def test_previous_links_walk_back_over_the_same_rows(self):
+        url = "/api/lessons/?paginate=cursor&fields=id"
+        for _ in range(3):
+            response = self.client.get(url)
+            url = response.data["next"]
+        last = self.client.get(url)
+        ids, _ = self.walk(last.data["previous"], link="previous")
+        self.assertEqual(ids, self.ids[: 60][::-1])
+
+    def test_cursor_of_another_ordering_is_rejected(self):
+        next_url = self.client.get("/api/lessons/?paginate=cursor&fields=id").data["next"]
+        cursor = next_url.split("cursor=")[1].split("&")[0]
+        response = self.client.get(f"/api/lessons/?paginate=cursor&ordering=order,created_at&cursor={cursor}")
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_of_another_ordering_with_as_many_fields_is_rejected(self):
+        next_url = self.client.get("/api/lessons/?paginate=cursor&ordering=order&fields=id").data["next"]
+        cursor = next_url.split("cursor=")[1].split("&")[0]
+        # (order, id) y (created_at, id): mismo número de campos, otras columnas
+        response = self.client.get(f"/api/lessons/?paginate=cursor&ordering=created_at&cursor={cursor}")
+        self.assertEqual(response.status_code, 404)
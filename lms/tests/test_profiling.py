@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from lms import profiling
+from lms.models import Course, Enrollment, Lesson
+
+
+@override_settings(LMS_PROFILING=True, LMS_THROTTLE_RATES={})
+class QueryProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", password="x")
+        cls.student = User.objects.create_user("alumno", password="x")
+        cls.course = Course.objects.create(title="Django", slug="django", instructor=cls.admin, is_published=True)
+        Lesson.objects.create(course=cls.course, title="Intro", order=1, duration_minutes=10)
+        Enrollment.objects.create(user=cls.student, course=cls.course)
+
+    def setUp(self):
+        cache.clear()
+        profiling.store.reset()
+        self.client = APIClient()
+
+    def report(self):
+        return {row["endpoint"]: row for row in profiling.store.report()}
+
+    def test_html_views_report_queries_and_render_time(self):
+        self.client.force_login(self.student)
+        for url in ("/", "/course/django/", "/my-courses/"):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        report = self.report()
+        for endpoint in ("GET home", "GET course_detail", "GET my_courses"):
+            with self.subTest(endpoint=endpoint):
+                row = report[endpoint]
+                self.assertEqual(row["requests"], 1)
+                self.assertGreater(row["queries"], 0)
+                self.assertGreater(row["render_ms"], 0)
+                self.assertGreaterEqual(row["total_ms"], row["view_ms"] + row["render_ms"])
+
+    def test_api_responses_report_serializer_and_render_time(self):
+        self.client.get("/api/courses/")
+        row = self.report()["GET course-list#list"]
+        self.assertGreater(row["queries"], 0)
+        self.assertGreater(row["render_ms"], 0)
+        self.assertGreater(row["serialize_ms"], 0)
+        self.assertLessEqual(row["serialize_ms"], row["view_ms"])
+        self.assertEqual(
+            row["avg_python_ms"], round(max(row["view_ms"] - row["sql_ms"] - row["serialize_ms"], 0), 2)
+        )
+
+    def test_nested_serializers_are_timed_once(self):
+        self.client.force_login(self.student)
+        with mock.patch("lms.profiling.time.perf_counter", side_effect=range(1000)):
+            self.client.get("/api/dashboard/")
+        # Un único intervalo de 1 "segundo" simulado para todo el árbol
+        self.assertEqual(self.report()["GET my_dashboard"]["serialize_ms"], 1000)
+
+    def test_requests_are_aggregated_per_endpoint(self):
+        for _ in range(3):
+            self.client.get("/")
+        row = self.report()["GET home"]
+        self.assertEqual(row["requests"], 3)
+        self.assertEqual(row["avg_queries"], round(row["queries"] / 3, 2))
+        self.assertGreaterEqual(row["max_queries"] * 3, row["queries"])
+
+    def test_report_endpoint_is_admin_only_and_resets(self):
+        self.client.get("/")
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get("/api/profiling/").status_code, 403)
+        self.client.force_login(self.admin)
+        response = self.client.get("/api/profiling/")
+        self.assertTrue(response.data["enabled"])
+        self.assertIn("GET home", [row["endpoint"] for row in response.data["endpoints"]])
+        self.assertEqual(self.client.delete("/api/profiling/").status_code, 204)
+        # Solo queda la propia petición DELETE, registrada tras el reset
+        self.assertEqual([row["endpoint"] for row in profiling.store.report()], ["DELETE profiling_report"])
+
+
+class ProfileStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = profiling.ProfileStore()
+
+    def recorder(self, *queries):
+        recorder = profiling.QueryRecorder()
+        for sql in queries:
+            recorder(lambda *args: None, sql, None, False, {})
+        return recorder
+
+    def test_duplicate_fingerprints_are_counted(self):
+        recorder = self.recorder(
+            'SELECT * FROM "lms_lesson" WHERE "course_id" = 1',
+            'SELECT * FROM "lms_lesson" WHERE "course_id" = 2',
+            'SELECT * FROM "lms_course"',
+        )
+        self.store.record("GET home", recorder, view_ms=3, render_ms=2, total_ms=6)
+        row = self.store.report()[0]
+        self.assertEqual((row["queries"], row["duplicate_queries"]), (3, 1))
+        self.assertEqual(list(row["duplicates"].values()), [2])
+        self.assertEqual(row["avg_render_ms"], 2)
+
+    def test_flush_keeps_samples_while_another_process_writes(self):
+        self.store.record("GET home", self.recorder("SELECT 1"), view_ms=1, render_ms=1, total_ms=2)
+        cache.add(profiling.LOCK_KEY, 1)
+        self.store.flush()
+        self.assertIsNone(cache.get(profiling.CACHE_KEY))
+        cache.delete(profiling.LOCK_KEY)
+        self.assertEqual(self.store.report()[0]["requests"], 1)
+
+    def test_stores_merge_into_the_shared_report(self):
+        other = profiling.ProfileStore()
+        for store in (self.store, other):
+            store.record("GET home", self.recorder("SELECT 1"), view_ms=1, render_ms=1, total_ms=2)
+            store.flush()
+        self.assertEqual(self.store.report()[0]["requests"], 2)
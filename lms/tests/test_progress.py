@@ -0,0 +1,148 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from lms import progress
+from lms.models import Course, Enrollment, Lesson
+
+
+class BitmapTests(TestCase):
+    def test_set_and_clear_bits(self):
+        bitmap = progress.set_bits(b"", [0, 9, 49])
+        self.assertEqual(len(bitmap), 7)
+        self.assertEqual(progress.count_bits(bitmap), 3)
+        self.assertEqual(progress.set_slots(bitmap), [0, 9, 49])
+        bitmap = progress.set_bits(bitmap, [49, 60], value=False)
+        self.assertEqual(progress.set_slots(bitmap), [0, 9])
+        self.assertEqual(len(bitmap), 2)
+
+
+class LessonProgressTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        cls.student = User.objects.create_user("alumno", password="x")
+        cls.course = Course.objects.create(title="Django", slug="django", instructor=instructor)
+        cls.other = Course.objects.create(title="Python", slug="python", instructor=instructor)
+        cls.lessons = [Lesson.objects.create(course=cls.course, title=f"L{i}", order=i) for i in range(1, 5)]
+        cls.enrollment = Enrollment.objects.create(user=cls.student, course=cls.course)
+        Enrollment.objects.create(user=cls.student, course=cls.other)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_login(self.student)
+        self.url = f"/api/enrollments/{self.enrollment.pk}/progress/"
+
+    def mark(self, lessons, **extra):
+        return self.client.post(self.url, {"lessons": [lesson.pk for lesson in lessons], **extra}, format="json")
+
+    def test_slots_are_stable_across_reorder(self):
+        self.assertEqual([lesson.slot for lesson in self.lessons], [0, 1, 2, 3])
+        response = self.client.post(
+            "/api/lessons/reorder/",
+            {"course": self.course.pk, "lessons": [lesson.pk for lesson in reversed(self.lessons)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Lesson.objects.filter(course=self.course).order_by("pk").values_list("slot", flat=True)), [0, 1, 2, 3])
+
+    def test_mark_batch_and_read_progress(self):
+        response = self.mark(self.lessons[:3])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["completed_lessons"], 3)
+        self.assertEqual(response.data["progress_percent"], 75)
+        self.assertEqual(response.data["lessons"], [lesson.pk for lesson in self.lessons[:3]])
+
+        self.mark(self.lessons[3:])
+        self.enrollment.refresh_from_db()
+        self.assertTrue(self.enrollment.is_completed)
+
+        self.mark(self.lessons[:1], completed=False)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 3)
+        self.assertFalse(self.enrollment.is_completed)
+
+    def test_rejects_foreign_lessons_and_enrollments(self):
+        foreign = Lesson.objects.create(course=self.other, title="Otra", order=1)
+        self.assertEqual(self.mark([foreign]).status_code, 400)
+        intruder = User.objects.create_user("intruso", password="x")
+        self.client.force_login(intruder)
+        self.assertEqual(self.mark(self.lessons[:1]).status_code, 403)
+
+    def test_user_progress_in_one_query(self):
+        self.mark(self.lessons[:2])
+        with self.assertNumQueries(1):
+            rows = progress.user_progress(self.student)
+        by_course = {row["course"]: row for row in rows}
+        self.assertEqual(by_course[self.course.pk]["percent"], 50)
+        self.assertEqual(by_course[self.other.pk]["percent"], 0)
+
+    def test_deleting_or_moving_a_lesson_clears_its_bit(self):
+        self.mark(self.lessons[:3])
+        self.lessons[0].delete()
+        moved = self.lessons[1]
+        moved.course = self.other
+        moved.order = 10
+        moved.save()
+        self.assertEqual(moved.slot, 0)
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        self.assertEqual(progress.completed_lesson_ids(self.enrollment), [self.lessons[2].pk])
+
+    def test_bulk_delete_forgets_slots_once_per_course(self):
+        self.mark(self.lessons)
+        self.client.force_login(User.objects.create_superuser("admin", password="x"))
+        with mock.patch("lms.progress.forget_slots", wraps=progress.forget_slots) as forget:
+            response = self.client.delete(
+                "/api/lessons/bulk/", {"ids": [lesson.pk for lesson in self.lessons[:3]]}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        forget.assert_called_once_with(self.course.pk, [0, 1, 2])
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_lessons, 1)
+        self.assertEqual(progress.completed_lesson_ids(self.enrollment), [self.lessons[3].pk])
+
+    def test_adding_or_deleting_lessons_recomputes_completion(self):
+        self.mark(self.lessons)
+        Lesson.objects.create(course=self.course, title="L5", order=5)
+        self.enrollment.refresh_from_db()
+        self.assertFalse(self.enrollment.is_completed)
+
+        Lesson.objects.get(course=self.course, order=5).delete()
+        self.enrollment.refresh_from_db()
+        self.assertTrue(self.enrollment.is_completed)
+
+        self.client.force_login(User.objects.create_superuser("admin", password="x"))
+        response = self.client.post("/api/lessons/bulk/", [{"course": self.course.pk, "title": "L5", "order": 5}], format="json")
+        self.assertEqual(response.status_code, 201)
+        self.enrollment.refresh_from_db()
+        self.assertFalse(self.enrollment.is_completed)
+
+        self.client.delete("/api/lessons/bulk/", {"ids": [response.data[0]["id"]]}, format="json")
+        self.enrollment.refresh_from_db()
+        self.assertTrue(self.enrollment.is_completed)
+
+    def test_course_cascade_skips_per_lesson_forget(self):
+        self.mark(self.lessons)
+        with mock.patch("lms.progress.forget_slots") as forget:
+            self.course.delete()
+        forget.assert_not_called()
+        self.assertFalse(Enrollment.objects.filter(pk=self.enrollment.pk).exists())
+
+    def test_bulk_created_lessons_get_slots(self):
+        self.client.force_login(User.objects.create_superuser("admin", password="x"))
+        response = self.client.post(
+            "/api/lessons/bulk/",
+            [{"course": self.course.pk, "title": "L5", "order": 5}, {"course": self.course.pk, "title": "L6", "order": 6}],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(sorted(Lesson.objects.filter(course=self.course).values_list("slot", flat=True)), [0, 1, 2, 3, 4, 5])
+
+    def test_my_courses_shows_progress(self):
+        self.mark(self.lessons[:1])
+        response = self.client.get("/my-courses/")
+        item = next(item for item in response.context["courses_data"] if item["course"] == self.course)
+        self.assertEqual(item["progress_percent"], 25)
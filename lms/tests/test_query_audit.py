@@ -0,0 +1,38 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from lms import query_audit
+from lms.models import Course, Enrollment, Lesson, Review
+
+
+class QueryAuditTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        student = User.objects.create_user("alumno", password="x")
+        course = Course.objects.create(title="Django", slug="django", instructor=instructor, is_published=True)
+        Lesson.objects.create(course=course, title="Modelos", order=1)
+        Enrollment.objects.create(user=student, course=course)
+        Review.objects.create(course=course, user=student, comment="Bien", rating=4)
+
+    def test_hot_paths_use_indexes(self):
+        flagged = dict(query_audit.audit(0))
+        self.assertIn("api:reviews?user=", flagged)
+        self.assertIn("admin:enrollment?is_completed=False:count", flagged)
+        hot = [name for name in flagged if not name.startswith("api:courses?ordering=")]
+        self.assertEqual({name: flagged[name] for name in hot if flagged[name]}, {})
+
+    def test_flags_unindexed_filters(self):
+        queries = {"by_comment": Review.objects.filter(comment="Bien")}
+        self.assertEqual(query_audit.audit(0, queries), [("by_comment", [("lms_review", 1)])])
+        self.assertEqual(query_audit.audit(1, queries), [("by_comment", [])])
+
+    def test_command(self):
+        out = StringIO()
+        call_command("explain_queries", only="course_page", stdout=out)
+        self.assertIn("ok        course_page:lessons", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("explain_queries", threshold=0, only="ordering=price", fail_on_scan=True, stdout=StringIO())
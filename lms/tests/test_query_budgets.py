@@ -0,0 +1,116 @@
+"""
+Query budgets for every HTML view and API endpoint.
+
+The catalog is seeded with hundreds of courses and thousands of lessons,
+enrollments and reviews; each budget is a fixed number of queries that must
+not grow with the data. A reintroduced N+1 loop fails here.
+Run on SQLite: DB_ENGINE=django.db.backends.sqlite3 python manage.py test lms
+"""
+from django.core.cache import caches
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from lms.models import Course, Enrollment, Lesson, Review
+from lms.seeding import seed_catalog
+
+# Autenticado = +2 queries (sesión y usuario)
+HTML_BUDGETS = {
+    "index": 4,  # + COUNT del paginador
+    "course_detail": 7,  # + validadores ETag/Last-Modified
+    "my_courses": 3,
+}
+API_BUDGETS = {
+    "course-list": 4,
+    "course-detail": 4,  # + validadores ETag/Last-Modified
+    "lesson-list": 4,
+    "lesson-list-by-course": 5,  # + validación del filtro ?course=
+    "lesson-detail": 3,
+    "enrollment-list": 4,
+    "enrollment-detail": 3,
+    "enrollment-progress": 3,
+    "dashboard": 3,
+    "review-list": 4,
+    "review-list-by-course": 5,  # + validación del filtro ?course=
+    "review-detail": 3,
+}
+
+
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        data = seed_catalog(courses=300, lessons_per_course=10, students=600, enrollments_per_student=5)
+        cls.student = data["students"][0]
+        cls.course = data["courses"][0]
+        # Un estudiante con muchas inscripciones para comprobar que my_courses no crece
+        cls.heavy_student = data["students"][1]
+        enrolled = set(Enrollment.objects.filter(user=cls.heavy_student).values_list("course_id", flat=True))
+        for course in data["courses"][:60]:
+            if course.pk not in enrolled:
+                Enrollment.objects.create(user=cls.heavy_student, course=course)
+
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+        self.client.force_login(self.student)
+
+    def assertBudget(self, budget, url, **extra):
+        with self.assertNumQueries(budget):
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200, url)
+        return response
+
+    def test_seeded_volume(self):
+        self.assertGreaterEqual(Course.objects.count(), 300)
+        self.assertGreaterEqual(Lesson.objects.count(), 3000)
+        self.assertGreaterEqual(Enrollment.objects.count(), 3000)
+        self.assertGreaterEqual(Review.objects.count(), 1000)
+
+    def test_index(self):
+        response = self.assertBudget(HTML_BUDGETS["index"], "/")
+        self.assertGreaterEqual(response.context["page_obj"].paginator.count, 300)
+        for sort in ("rating", "price", "-price", "newest"):
+            self.assertBudget(HTML_BUDGETS["index"], f"/?sort={sort}&page=3")
+
+    def test_course_detail(self):
+        self.assertBudget(HTML_BUDGETS["course_detail"], f"/course/{self.course.slug}/")
+
+    def test_my_courses_does_not_grow_with_enrollments(self):
+        self.assertBudget(HTML_BUDGETS["my_courses"], "/my-courses/")
+        self.client.force_login(self.heavy_student)
+        response = self.assertBudget(HTML_BUDGETS["my_courses"], "/my-courses/")
+        self.assertGreaterEqual(response.context["total_enrolled"], 60)
+
+    def test_list_courses_ajax(self):
+        self.client.logout()
+        response = self.assertBudget(1, "/api/ajax/courses/", HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        self.assertGreaterEqual(len(response.json()["courses"]), 300)
+
+    def test_course_endpoints(self):
+        self.assertBudget(API_BUDGETS["course-list"], "/api/courses/")
+        self.assertBudget(API_BUDGETS["course-list"], "/api/catalog/?ordering=-rating_avg")
+        self.assertBudget(API_BUDGETS["course-detail"], f"/api/courses/{self.course.pk}/")
+
+    def test_lesson_endpoints(self):
+        lesson = self.course.lessons.first()
+        self.assertBudget(API_BUDGETS["lesson-list"], "/api/lessons/")
+        self.assertBudget(API_BUDGETS["lesson-list-by-course"], f"/api/lessons/?course={self.course.pk}")
+        self.assertBudget(API_BUDGETS["lesson-detail"], f"/api/lessons/{lesson.pk}/")
+
+    def test_enrollment_endpoints(self):
+        enrollment = Enrollment.objects.filter(user=self.student).first()
+        self.assertBudget(API_BUDGETS["enrollment-list"], "/api/enrollments/")
+        self.assertBudget(API_BUDGETS["enrollment-detail"], f"/api/enrollments/{enrollment.pk}/")
+        self.client.force_login(self.heavy_student)
+        response = self.assertBudget(API_BUDGETS["enrollment-progress"], "/api/enrollments/progress/")
+        self.assertGreaterEqual(len(response.json()), 60)
+        response = self.assertBudget(API_BUDGETS["dashboard"], "/api/dashboard/")
+        self.assertGreaterEqual(response.json()["count"], 60)
+
+    def test_review_endpoints(self):
+        review = Review.objects.first()
+        self.assertBudget(API_BUDGETS["review-list"], "/api/reviews/")
+        self.assertBudget(API_BUDGETS["review-list-by-course"], f"/api/reviews/?course={review.course_id}")
+        self.assertBudget(API_BUDGETS["review-detail"], f"/api/reviews/{review.pk}/")
+
+    def test_keyset_pages_skip_the_count(self):
+        self.assertBudget(API_BUDGETS["review-list"] - 1, "/api/reviews/?paginate=cursor")
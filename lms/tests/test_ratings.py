@@ -0,0 +1,78 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from lms.models import Course, CourseStats, Review
+
+
+class RatingAggregateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        instructor = User.objects.create_user("profe", password="x")
+        cls.students = [User.objects.create_user(f"alumno{i}", password="x") for i in range(4)]
+        cls.course = Course.objects.create(title="Django", slug="django", instructor=instructor, is_published=True)
+        cls.other = Course.objects.create(title="Python", slug="python", instructor=instructor, is_published=True)
+        for student, rating in zip(cls.students, [5, 5, 4, 1]):
+            Review.objects.create(course=cls.course, user=student, comment="ok", rating=rating)
+
+    def setUp(self):
+        cache.clear()
+
+    def histogram(self, course):
+        return CourseStats.objects.get(course=course).histogram
+
+    def test_histogram_follows_review_writes(self):
+        self.assertEqual(self.histogram(self.course), {1: 1, 2: 0, 3: 0, 4: 1, 5: 2})
+        review = Review.objects.get(user=self.students[3])
+        review.rating = 3
+        review.save()
+        self.assertEqual(self.histogram(self.course), {1: 0, 2: 0, 3: 1, 4: 1, 5: 2})
+        review.course = self.other
+        review.save()
+        self.assertEqual(self.histogram(self.course), {1: 0, 2: 0, 3: 0, 4: 1, 5: 2})
+        self.assertEqual(self.histogram(self.other), {1: 0, 2: 0, 3: 1, 4: 0, 5: 0})
+        Review.objects.filter(user=self.students[0]).delete()
+        self.assertEqual(self.histogram(self.course), {1: 0, 2: 0, 3: 0, 4: 1, 5: 1})
+
+        stats = CourseStats.objects.get(course=self.course)
+        self.assertEqual(CourseStats.rebuild(course_ids=[self.course.pk])[0].histogram, stats.histogram)
+
+    def test_aggregate_action(self):
+        response = self.client.get(f"/api/reviews/aggregate/?course={self.course.pk}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "course": self.course.pk,
+            "review_count": 4,
+            "avg_rating": 3.8,
+            "histogram": {"1": 1, "2": 0, "3": 0, "4": 1, "5": 2},
+        })
+        self.assertEqual(self.client.get("/api/reviews/aggregate/").status_code, 400)
+        self.assertEqual(self.client.get("/api/reviews/aggregate/?course=999999").status_code, 404)
+
+    def test_aggregate_is_cached_until_a_review_changes(self):
+        url = f"/api/reviews/aggregate/?course={self.course.pk}"
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        Review.objects.filter(user=self.students[3]).update(rating=1)  # sin señales: sigue en caché
+        Review.objects.get(user=self.students[2]).delete()
+        self.assertEqual(self.client.get(url).json()["review_count"], 3)
+
+    def test_bulk_aggregates(self):
+        CourseStats.objects.filter(course=self.other).delete()
+        url = f"/api/reviews/aggregates/?courses={self.other.pk},{self.course.pk},999999"
+        with self.assertNumQueries(1 + 3):  # lectura + recálculo de la fila que falta
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["course"] for row in response.json()], [self.other.pk, self.course.pk])
+        self.assertEqual(response.json()[0]["review_count"], 0)
+        too_many = ",".join(str(pk) for pk in range(1, 102))
+        self.assertEqual(self.client.get(f"/api/reviews/aggregates/?courses={too_many}").status_code, 400)
+        self.assertEqual(self.client.get("/api/reviews/aggregates/?courses=a,b").status_code, 400)
+
+    def test_course_page_shows_breakdown(self):
+        response = self.client.get(f"/course/{self.course.slug}/")
+        self.assertEqual(
+            [(row["rating"], row["count"], row["percent"]) for row in response.context["rating_breakdown"]],
+            [(5, 2, 50), (4, 1, 25), (3, 0, 0), (2, 0, 0), (1, 1, 25)],
+        )
@@ -0,0 +1,128 @@
+import os
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, router
+from django.test import SimpleTestCase, TestCase
+
+from lms import replicas
+from lms.models import Course, CourseStats, Enrollment, Lesson, Review
+from project.database import REPLICA_ALIAS, database_config
+
+
+class DatabaseConfigTests(SimpleTestCase):
+    base_dir = Path("/srv/lms")
+
+    def test_postgres_defaults_use_persistent_connections(self):
+        default = database_config({}, self.base_dir)["default"]
+        self.assertEqual(default["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual((default["HOST"], default["NAME"]), ("db", "mydatabase"))
+        self.assertEqual(default["CONN_MAX_AGE"], 60)
+        self.assertTrue(default["CONN_HEALTH_CHECKS"])
+
+    def test_sqlite_defaults(self):
+        databases = database_config({"DB_ENGINE": "django.db.backends.sqlite3"}, self.base_dir)
+        self.assertEqual(databases["default"]["NAME"], self.base_dir / "db.sqlite3")
+        self.assertEqual(databases["default"]["CONN_MAX_AGE"], 0)
+        self.assertNotIn(REPLICA_ALIAS, databases)
+
+    def test_connection_options(self):
+        env = {"DB_CONN_MAX_AGE": "none", "DB_CONN_HEALTH_CHECKS": "0", "DB_CONNECT_TIMEOUT": "3"}
+        default = database_config(env, self.base_dir)["default"]
+        self.assertIsNone(default["CONN_MAX_AGE"])
+        self.assertFalse(default["CONN_HEALTH_CHECKS"])
+        self.assertEqual(default["OPTIONS"], {"connect_timeout": 3})
+        with self.assertRaises(ImproperlyConfigured):
+            database_config({"DB_CONN_MAX_AGE": "mucho"}, self.base_dir)
+
+    def test_pool_replaces_persistent_connections(self):
+        default = database_config({"DB_POOL": "1", "DB_POOL_MAX_SIZE": "20"}, self.base_dir)["default"]
+        self.assertEqual(default["OPTIONS"]["pool"], {"min_size": 2, "max_size": 20, "timeout": 10})
+        self.assertEqual(default["CONN_MAX_AGE"], 0)
+        with self.assertRaises(ImproperlyConfigured):
+            database_config({"DB_ENGINE": "django.db.backends.sqlite3", "DB_POOL": "1"}, self.base_dir)
+
+    def test_replica_inherits_primary_settings(self):
+        env = {"DB_USER": "lms", "DB_PASSWORD": "secreto", "DB_REPLICA_HOST": "db-replica"}
+        replica = database_config(env, self.base_dir)[REPLICA_ALIAS]
+        self.assertEqual((replica["HOST"], replica["USER"], replica["PASSWORD"]), ("db-replica", "lms", "secreto"))
+        self.assertEqual(replica["TEST"], {"MIRROR": "default"})
+
+
+class ReplicaRoutingTests(TestCase):
+    """
+    A second SQLite database stands in for the replica; it holds different
+    rows than the primary so each response shows where it was read from.
+    It is registered after the primary's test setup and lives in a
+    temporary file, outside the test transactions.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user("profe", password="x")
+        Course.objects.create(title="Curso en la primaria", slug="primaria", instructor=cls.instructor, is_published=True)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.primary_databases = cls.databases
+        cls.databases = {*cls.databases, REPLICA_ALIAS}
+        cls.tmp = tempfile.TemporaryDirectory()
+        connections.settings[REPLICA_ALIAS] = {
+            **connections.settings["default"],
+            "NAME": os.path.join(cls.tmp.name, "replica.sqlite3"),
+        }
+        with connections[REPLICA_ALIAS].schema_editor() as editor:
+            for model in (User, Course, CourseStats, Lesson, Review, Enrollment):
+                editor.create_model(model)
+        # bulk_create no dispara señales: nada de esto debe escribirse en la primaria
+        User.objects.using(REPLICA_ALIAS).bulk_create([User(pk=cls.instructor.pk, username="profe")])
+        course = Course(title="Curso en la réplica", slug="replica", instructor_id=cls.instructor.pk, is_published=True)
+        Course.objects.using(REPLICA_ALIAS).bulk_create([course])
+        CourseStats.objects.using(REPLICA_ALIAS).bulk_create([CourseStats(course_id=course.pk)])
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA_ALIAS].close()
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+        cls.tmp.cleanup()
+        cls.databases = cls.primary_databases
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, response):
+        return [course["title"] for course in response.json()["results"]]
+
+    def test_router_only_reads_from_the_replica_when_asked(self):
+        self.assertEqual(router.db_for_read(Course), "default")
+        with replicas.replica_reads():
+            self.assertEqual(router.db_for_read(Course), REPLICA_ALIAS)
+            self.assertEqual(router.db_for_write(Course), "default")
+        with replicas.replica_reads(False):
+            self.assertEqual(router.db_for_read(Course), "default")
+        self.assertFalse(router.allow_migrate(REPLICA_ALIAS, "lms"))
+
+    def test_read_only_actions_and_catalog_views_use_the_replica(self):
+        self.assertEqual(self.titles(self.client.get("/api/courses/")), ["Curso en la réplica"])
+        self.assertEqual(self.titles(self.client.get("/api/catalog/")), ["Curso en la réplica"])
+        response = self.client.get("/")
+        self.assertContains(response, "Curso en la réplica")
+        self.assertNotContains(response, "Curso en la primaria")
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        self.client.force_login(self.instructor)
+        response = self.client.post("/api/courses/", {"title": "Nuevo", "slug": "nuevo"}, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(replicas.PIN_COOKIE, response.cookies)
+        self.assertEqual(
+            sorted(self.titles(self.client.get("/api/courses/"))), ["Curso en la primaria", "Nuevo"]
+        )
+        del self.client.cookies[replicas.PIN_COOKIE]
+        cache.clear()  # la respuesta anterior quedó en caché
+        self.assertEqual(self.titles(self.client.get("/api/courses/")), ["Curso en la réplica"])
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresWrapper
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from lms import search
+from lms.models import Course, Lesson, SearchEntry
+
+
+class TokenizeTests(TestCase):
+    def test_accents_and_plurals_share_a_stem(self):
+        self.assertEqual(search.tokenize("Lección"), search.tokenize("lecciones"))
+        self.assertEqual(search.tokenize("Programming"), search.tokenize("programs"))
+
+    def test_stopwords_are_dropped(self):
+        self.assertEqual(search.tokenize("la de the of"), [])
+
+
+class PostgresQueryTests(TestCase):
+    """SQL of the tsvector path, compiled for PostgreSQL without a server."""
+
+    def compile(self, queryset):
+        postgres = PostgresWrapper({**connection.settings_dict, "ENGINE": "django.db.backends.postgresql"})
+        return queryset.query.get_compiler(connection=postgres).as_sql()
+
+    def test_filters_and_ranks_on_the_generated_column(self):
+        with mock.patch("lms.search.is_postgres", return_value=True):
+            sql, params = self.compile(search.search(Lesson.objects.all(), "modelos"))
+        tsquery = "(websearch_to_tsquery(%s::regconfig, %s) || websearch_to_tsquery(%s::regconfig, %s))"
+        self.assertIn(f'ts_rank("lms_lesson"."search_vector", {tsquery}) AS "search_rank"', sql)
+        self.assertIn(f'WHERE "lms_lesson"."search_vector" @@ {tsquery}', sql)
+        self.assertEqual(params, ("spanish", "modelos", "english", "modelos") * 2)
+
+
+class FallbackSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user("profe", email="profe@example.com", password="x")
+        cls.python = Course.objects.create(
+            title="Python para principiantes", description="Aprende programación desde cero", instructor=cls.instructor
+        )
+        cls.guitar = Course.objects.create(
+            title="Guitarra", description="Acordes y canciones de python rock", instructor=cls.instructor
+        )
+        cls.lesson = Lesson.objects.create(course=cls.python, title="Variables", content="Tipos de datos en Python")
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_results_are_ranked_by_field_weight(self):
+        response = self.client.get("/api/courses/", {"search": "python"})
+        ids = [course["id"] for course in response.json()["results"]]
+        self.assertEqual(ids, [self.python.pk, self.guitar.pk])
+
+    def test_every_term_must_match(self):
+        response = self.client.get("/api/courses/", {"search": "python programar"})
+        self.assertEqual([c["id"] for c in response.json()["results"]], [self.python.pk])
+
+    def test_explicit_ordering_overrides_rank(self):
+        response = self.client.get("/api/courses/", {"search": "python", "ordering": "-created_at"})
+        self.assertEqual([c["id"] for c in response.json()["results"]], [self.guitar.pk, self.python.pk])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.lesson.content = "Listas y diccionarios"
+        self.lesson.save()
+        self.assertFalse(search.search(Lesson.objects.all(), "datos").exists())
+        self.assertTrue(search.search(Lesson.objects.all(), "diccionario").exists())
+
+        self.lesson.delete()
+        self.assertFalse(SearchEntry.objects.filter(label="lms.lesson", object_id=self.lesson.pk).exists())
+
+    def test_rebuild_index(self):
+        SearchEntry.objects.all().delete()
+        self.assertEqual(search.rebuild_index(Lesson), 1)
+        self.assertEqual(list(search.search(Lesson.objects.all(), "variable")), [self.lesson])
@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from lms.models import Course, Lesson
+
+
+class SparseFieldsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user("profe", password="x", first_name="Ana")
+        cls.course = Course.objects.create(title="Django", slug="django", description="x" * 500, instructor=cls.instructor)
+        for order in range(1, 4):
+            Lesson.objects.create(course=cls.course, title=f"L{order}", content="y" * 500, order=order)
+
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        data = response.json()
+        return data["results"] if "results" in data else data, [query["sql"] for query in queries]
+
+    def test_default_payload_is_unchanged(self):
+        results, _ = self.get("/api/courses/")
+        self.assertEqual(results[0]["instructor"]["first_name"], "Ana")
+        self.assertIn("description", results[0])
+        self.assertNotIn("lessons", results[0])
+
+    def test_fields_trim_output_and_columns(self):
+        results, queries = self.get("/api/courses/?fields=id,title")
+        self.assertEqual(results, [{"id": self.course.pk, "title": "Django"}])
+        select = next(sql for sql in queries if sql.startswith('SELECT "lms_course"."id"'))
+        self.assertNotIn("description", select)
+        self.assertNotIn("auth_user", select)
+        self.assertNotIn("lms_coursestats", select)
+
+        results, queries = self.get("/api/lessons/?fields=id,title")
+        self.assertEqual(set(results[0]), {"id", "title"})
+        self.assertFalse(any('"content"' in sql for sql in queries))
+
+    def test_expand_lessons_prefetches_summary(self):
+        results, queries = self.get("/api/courses/?fields=id,lesson_count&expand=lessons")
+        self.assertEqual(results[0]["lesson_count"], 3)
+        self.assertEqual([lesson["title"] for lesson in results[0]["lessons"]], ["L1", "L2", "L3"])
+        self.assertNotIn("content", results[0]["lessons"][0])
+        self.assertNotIn("instructor", results[0])
+        self.assertEqual(len([sql for sql in queries if 'FROM "lms_lesson"' in sql]), 1)
+        self.assertFalse(any('"content"' in sql for sql in queries))
+
+    def test_empty_expand_collapses_instructor(self):
+        results, queries = self.get(f"/api/courses/{self.course.pk}/?expand=")
+        self.assertEqual(results["instructor"], self.instructor.pk)
+        self.assertFalse(any("auth_user" in sql for sql in queries))
+
+    def test_expand_course_on_lessons(self):
+        results, _ = self.get("/api/lessons/?fields=id,course&expand=course")
+        self.assertEqual(results[0]["course"], {"id": self.course.pk, "title": "Django"})
+
+    def test_writes_ignore_query_params(self):
+        admin = User.objects.create_superuser("admin", password="x")
+        self.client.force_login(admin)
+        response = self.client.post(
+            "/api/lessons/?fields=id", {"course": self.course.pk, "title": "L4", "order": 4}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["course"], self.course.pk)
+        self.assertIn("title", response.data)
@@ -0,0 +1,107 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from lms import throttling
+from lms.models import Course
+
+LOCAL_STORE = {"BACKEND": "lms.throttling.LocalMemoryStore"}
+
+
+@override_settings(LMS_THROTTLE_STORE=LOCAL_STORE, LMS_THROTTLE_RATES={"anon": "2/min", "user": "3/min", "export": "1/min"})
+class ThrottlingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alumno", password="x")
+        Course.objects.create(title="Django", slug="django", instructor=cls.user, is_published=True)
+
+    def setUp(self):
+        # Store nuevo por test: el receptor de setting_changed lo descarta al salir del override
+        throttling._store = None
+        self.client = APIClient()
+
+    def get(self, path="/api/courses/", **extra):
+        return self.client.get(path, **extra)
+
+    def test_anonymous_clients_get_a_bucket_per_ip(self):
+        self.assertEqual([self.get().status_code for _ in range(2)], [200, 200])
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response["Retry-After"]) <= 30)
+        self.assertEqual(self.get(REMOTE_ADDR="10.0.0.2").status_code, 200)
+
+    def test_authenticated_users_get_their_own_bucket(self):
+        for _ in range(2):
+            self.get()
+        self.client.force_login(self.user)
+        self.assertEqual([self.get().status_code for _ in range(3)], [200, 200, 200])
+        self.assertEqual(self.get().status_code, 429)
+
+    def test_throttling_adds_no_queries(self):
+        self.client.force_login(self.user)
+        self.get()
+        with CaptureQueriesContext(connection) as throttled:
+            self.get()
+        with override_settings(LMS_THROTTLE_RATES={}), CaptureQueriesContext(connection) as unthrottled:
+            self.get()
+        self.assertEqual(len(throttled), len(unthrottled))
+
+    def test_export_view_has_its_own_scope(self):
+        path = "/api/ajax/courses/"
+        self.assertEqual(self.get(path, HTTP_X_REQUESTED_WITH="XMLHttpRequest").status_code, 200)
+        response = self.get(path, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "60")
+        # El bucket del endpoint no gasta el del API
+        self.assertEqual(self.get().status_code, 200)
+
+    def test_rate_changes_start_with_fresh_buckets(self):
+        # Sin esto, los tests que cambian las tasas heredarían los buckets gastados por otros
+        with override_settings(LMS_THROTTLE_RATES={"anon": "1/min"}):
+            self.assertEqual([self.get().status_code for _ in range(2)], [200, 429])
+        with override_settings(LMS_THROTTLE_RATES={"anon": "1/min"}):
+            self.assertEqual(self.get().status_code, 200)
+
+
+class BucketTests(TestCase):
+    def test_refills_at_the_rate(self):
+        capacity, refill = throttling.parse_rate("2/min")
+        state, wait = throttling.take(None, capacity, refill, now=0)
+        state, wait = throttling.take(state, capacity, refill, now=0)
+        self.assertEqual(wait, 0)
+        state, wait = throttling.take(state, capacity, refill, now=15)
+        self.assertEqual(wait, 15)
+        self.assertEqual(throttling.take(state, capacity, refill, now=30)[1], 0)
+
+    def test_shared_stores_see_each_others_tokens(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stores = [
+                (throttling.SQLiteStore(Path(tmp) / "buckets.sqlite3"), throttling.SQLiteStore(Path(tmp) / "buckets.sqlite3")),
+                (throttling.CacheStore(), throttling.CacheStore()),
+            ]
+            for first, second in stores:
+                with self.subTest(type(first).__name__):
+                    self.assertEqual(first.consume("k", 1, 1 / 60, 100.0), 0)
+                    self.assertEqual(second.consume("k", 1, 1 / 60, 100.0), 60)
+
+    def test_sqlite_store_fails_open_when_locked(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "buckets.sqlite3"
+            store = throttling.SQLiteStore(path, timeout=0.05)
+            self.assertEqual(store.consume("k", 1, 1 / 60, 100.0), 0)
+            locker = sqlite3.connect(path, isolation_level=None)
+            locker.execute("BEGIN IMMEDIATE")
+            try:
+                with self.assertLogs("lms.throttling", "WARNING"):
+                    self.assertEqual(store.consume("k", 1, 1 / 60, 100.0), 0)
+            finally:
+                locker.execute("ROLLBACK")
+                locker.close()
+            # Liberado el bloqueo vuelve a limitar con el estado guardado
+            self.assertEqual(store.consume("k", 1, 1 / 60, 100.0), 60)
@@ -0,0 +1,114 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from lms import thumbnails
+from lms.models import Course
+
+
+def image_file(name="portada.png", color="red", size=(1200, 900)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user("profe", password="x")
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def create_course(self, thumbnail, slug="django"):
+        return Course.objects.create(title="Django", slug=slug, instructor=self.instructor, thumbnail=thumbnail)
+
+    def assert_variants_exist(self, digest):
+        for variant, size in thumbnails.VARIANTS.items():
+            with default_storage.open(thumbnails.variant_name(digest, variant)) as stored:
+                self.assertEqual(Image.open(stored).size, size)
+
+    def test_variants_are_generated_on_upload(self):
+        course = self.create_course(image_file())
+        self.assertTrue(course.thumbnail_digest)
+        self.assertEqual(Course.objects.get(pk=course.pk).thumbnail_digest, course.thumbnail_digest)
+        self.assert_variants_exist(course.thumbnail_digest)
+        self.assertEqual(
+            thumbnails.thumbnail_url(course, "retina"),
+            f"/media/{thumbnails.variant_name(course.thumbnail_digest, 'retina')}",
+        )
+
+    def test_new_image_resets_the_digest(self):
+        course = self.create_course(image_file())
+        old_digest = course.thumbnail_digest
+        course.title = "Django 5"
+        course.save()
+        self.assertEqual(Course.objects.get(pk=course.pk).thumbnail_digest, old_digest)
+
+        course.thumbnail = image_file("nueva.png", color="blue")
+        course.save()
+        self.assertNotIn(course.thumbnail_digest, ("", old_digest))
+        self.assert_variants_exist(course.thumbnail_digest)
+
+    @override_settings(LMS_THUMBNAILS_ON_UPLOAD=False)
+    def test_lazy_generation_on_first_url(self):
+        course = self.create_course(image_file())
+        self.assertEqual(course.thumbnail_digest, "")
+        url = thumbnails.thumbnail_url(course)
+        self.assertEqual(url, f"/media/{thumbnails.variant_name(course.thumbnail_digest, 'card')}")
+        self.assertEqual(thumbnails.thumbnail_url(Course.objects.get(pk=course.pk), lazy=False), url)
+
+    def test_broken_images_fall_back_without_retrying_every_request(self):
+        broken = SimpleUploadedFile("rota.png", b"not an image", content_type="image/png")
+        with self.assertLogs("lms.thumbnails", "ERROR"):
+            course = self.create_course(broken)
+        self.assertEqual(course.thumbnail_digest, "")
+
+        with mock.patch("lms.thumbnails.generate_variants") as generate:
+            for _ in range(3):
+                self.assertEqual(thumbnails.thumbnail_url(course), course.thumbnail.url)
+        generate.assert_not_called()
+
+        # Pasado el plazo se vuelve a intentar
+        cache.delete(thumbnails.failure_key(course))
+        with mock.patch("lms.thumbnails.generate_variants", return_value="abc") as generate:
+            self.assertEqual(thumbnails.thumbnail_url(course), f"/media/{thumbnails.variant_name('abc', 'card')}")
+        generate.assert_called_once_with(course)
+
+    def test_decompression_bombs_are_remembered_like_other_failures(self):
+        with override_settings(LMS_THUMBNAILS_ON_UPLOAD=False):
+            course = self.create_course(image_file())
+        bomb = Image.DecompressionBombError("demasiados píxeles")
+        with mock.patch("lms.thumbnails.generate_variants", side_effect=bomb) as generate, self.assertLogs("lms.thumbnails"):
+            for _ in range(2):
+                self.assertEqual(thumbnails.thumbnail_url(course), course.thumbnail.url)
+        generate.assert_called_once_with(course)
+
+    def test_force_overwrites_existing_variants(self):
+        course = self.create_course(image_file())
+        name = thumbnails.variant_name(course.thumbnail_digest, "card")
+        default_storage.delete(name)
+        default_storage.save(name, ContentFile(b"corrupto"))
+
+        call_command("generate_thumbnails", stdout=StringIO())
+        with default_storage.open(name) as stored:
+            self.assertEqual(stored.read(), b"corrupto")
+
+        call_command("generate_thumbnails", force=True, stdout=StringIO())
+        self.assert_variants_exist(course.thumbnail_digest)
+        self.assertEqual(default_storage.listdir(f"{thumbnails.DERIVED_DIR}/{course.thumbnail_digest}")[1].count("card.webp"), 1)
@@ -0,0 +1,264 @@
+# lms/throttling.py
+"""
+Token-bucket throttling for the API and the AJAX catalog.
+
+Rates come from ``LMS_THROTTLE_RATES`` in DRF's ``"<n>/<period>"`` format:
+each key gets a bucket of ``n`` tokens refilled at ``n/period`` per second,
+so a client can burst up to ``n`` requests and then sustain the rate. A
+throttled request gets a 429 with ``Retry-After`` (the time until the next
+token).
+
+- ``AnonBucketThrottle``: anonymous clients, per IP (``anon`` rate).
+- ``UserBucketThrottle``: authenticated users, per user (``user`` rate).
+- ``ScopedBucketThrottle``: views with a ``throttle_scope`` that has a rate,
+  per user or IP.
+- ``throttle(scope)``: the same buckets for plain Django views, per IP.
+
+Buckets live in the store configured by ``LMS_THROTTLE_STORE`` (``BACKEND``
+and ``OPTIONS``, like ``CACHES``): ``LocalMemoryStore`` (per process, the
+default), ``CacheStore`` (a Django cache alias, shared by every process that
+uses a shared cache) or ``SQLiteStore`` (a SQLite file on local disk shared
+by the processes of one host). None of them touch the Django databases:
+the key is the IP or the already authenticated ``request.user``.
+"""
+import logging
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import JsonResponse
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE = {"BACKEND": "lms.throttling.LocalMemoryStore"}
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """
+    ``"120/min"`` -> ``(capacity, tokens per second)``, or None for no limit.
+    """
+    if not rate:
+        return None
+    num, period = rate.split("/")
+    capacity = int(num)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def take(state, capacity, refill, now):
+    """
+    Take one token from a bucket ``state`` (``(tokens, timestamp)``, None for
+    a new full bucket). Returns ``(new_state, wait)``: ``wait`` is 0 when the
+    request is allowed, else the seconds until the next token.
+    """
+    tokens, stamp = state or (capacity, now)
+    tokens = min(capacity, tokens + max(now - stamp, 0) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0.0
+    return (tokens, now), (1 - tokens) / refill
+
+
+class LocalMemoryStore:
+    """
+    Buckets in a dict of this process. With several workers each one counts
+    on its own, so the effective limit is multiplied by the worker count.
+    The least recently used buckets are dropped past ``max_entries`` (a
+    dropped bucket comes back full).
+    """
+
+    def __init__(self, max_entries=10_000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill, now):
+        with self._lock:
+            state, wait = take(self._buckets.pop(key, None), capacity, refill, now)
+            self._buckets[key] = state
+            if len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class CacheStore:
+    """
+    Buckets in a Django cache (``alias``), shared by every process using the
+    same cache server. The read-modify-write is not atomic: concurrent
+    requests of one client can get a few tokens more than the rate.
+    """
+
+    def __init__(self, alias="default", key_prefix="lms:throttle:"):
+        self.alias = alias
+        self.key_prefix = key_prefix
+
+    def consume(self, key, capacity, refill, now):
+        cache = caches[self.alias]
+        cache_key = self.key_prefix + key
+        state, wait = take(cache.get(cache_key), capacity, refill, now)
+        # Un bucket que se recarga completo equivale a no tenerlo: expira entonces
+        cache.set(cache_key, state, math.ceil(capacity / refill))
+        return wait
+
+
+class SQLiteStore:
+    """
+    Buckets in a SQLite file (``path``) shared by the processes of one host,
+    updated atomically under ``BEGIN IMMEDIATE``. Only for a single server
+    without a shared cache; the file must be on local disk, not NFS. When
+    the file stays locked past ``timeout`` (or cannot be opened) the request
+    is let through and the error logged, instead of failing with a 500.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path, timeout=1.0):
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, stamp REAL NOT NULL, expires REAL NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def consume(self, key, capacity, refill, now):
+        try:
+            return self._consume(key, capacity, refill, now)
+        except sqlite3.OperationalError:
+            logger.warning("Throttle store %s unavailable, request not throttled", self.path, exc_info=True)
+            return 0.0
+
+    def _consume(self, key, capacity, refill, now):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tokens, stamp FROM buckets WHERE key = ?", [key]).fetchone()
+            (tokens, stamp), wait = take(row, capacity, refill, now)
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, stamp, expires) VALUES (?, ?, ?, ?)",
+                [key, tokens, stamp, now + capacity / refill],
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                connection.execute("DELETE FROM buckets WHERE expires < ?", [now])
+            connection.execute("COMMIT")
+        except BaseException:
+            # Un COMMIT fallido puede haber cerrado ya la transacción
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        return wait
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        config = getattr(settings, "LMS_THROTTLE_STORE", DEFAULT_STORE)
+        _store = import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+    return _store
+
+
+@receiver(setting_changed)
+def _reset_store(setting, **kwargs):
+    global _store
+    # Con otras tasas los buckets guardados no valen; en tests, cada override empieza de cero
+    if setting in ("LMS_THROTTLE_STORE", "LMS_THROTTLE_RATES"):
+        _store = None
+
+
+def consume(scope, ident):
+    """
+    Take a token from the ``scope`` bucket of ``ident``; returns the seconds
+    to wait (0 when allowed or when ``scope`` has no rate).
+    """
+    rate = parse_rate(getattr(settings, "LMS_THROTTLE_RATES", {}).get(scope))
+    if rate is None:
+        return 0.0
+    return get_store().consume(f"{scope}:{ident}", *rate, time.time())
+
+
+class BucketThrottle(BaseThrottle):
+    """
+    DRF throttle over ``consume``; subclasses return the bucket key for a
+    request (None to skip it) from ``get_ident_key``.
+    """
+
+    scope = None
+
+    def get_scope(self, view):
+        return self.scope
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0.0
+        scope = self.get_scope(view)
+        ident = self.get_ident_key(request) if scope else None
+        if ident is not None:
+            self.wait_seconds = consume(scope, ident)
+        return self.wait_seconds == 0
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonBucketThrottle(BucketThrottle):
+    scope = "anon"
+
+    def get_ident_key(self, request):
+        return None if request.user.is_authenticated else self.get_ident(request)
+
+
+class UserBucketThrottle(BucketThrottle):
+    scope = "user"
+
+    def get_ident_key(self, request):
+        return f"u{request.user.pk}" if request.user.is_authenticated else None
+
+
+class ScopedBucketThrottle(BucketThrottle):
+    def get_scope(self, view):
+        return getattr(view, "throttle_scope", None)
+
+    def get_ident_key(self, request):
+        return f"u{request.user.pk}" if request.user.is_authenticated else self.get_ident(request)
+
+
+def throttle(scope):
+    """
+    Decorator for Django views: per-IP ``scope`` bucket, 429 with
+    ``Retry-After`` when empty. Keyed by IP so that it never loads the
+    session or the user.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            wait = consume(scope, BaseThrottle().get_ident(request))
+            if wait:
+                response = JsonResponse({"error": "too many requests"}, status=429)
+                response["Retry-After"] = str(math.ceil(wait))
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
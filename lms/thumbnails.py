@@ -0,0 +1,115 @@
+# lms/thumbnails.py
+"""
+Resized WebP derivatives of ``Course.thumbnail``.
+
+Variants are stored content-addressed next to the originals
+(``courses/thumbnails/derived/<digest>/<variant>.webp``), so identical
+uploads share files and a new upload never serves a stale image. The digest
+is saved on the course, which lets templates and serializers build variant
+URLs without touching storage. A failed generation is remembered in the
+cache for ``RETRY_SECONDS`` so a broken upload is not re-read and re-decoded
+on every request that shows it.
+"""
+import hashlib
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Nombre -> (ancho, alto); "retina" es la tarjeta a 2x
+VARIANTS = getattr(settings, "LMS_THUMBNAIL_VARIANTS", {
+    "card": (400, 200),
+    "retina": (800, 400),
+    "detail": (800, 600),
+})
+DERIVED_DIR = "courses/thumbnails/derived"
+WEBP_QUALITY = 80
+RETRY_SECONDS = getattr(settings, "LMS_THUMBNAIL_RETRY_SECONDS", 300)
+# DecompressionBombError (imágenes enormes) no hereda de OSError
+GENERATION_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def variant_name(digest, variant):
+    return f"{DERIVED_DIR}/{digest}/{variant}.webp"
+
+
+def render_variant(image, size):
+    resized = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    resized.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def generate_variants(course, force=False):
+    """
+    Create any missing variants for the course thumbnail (all of them,
+    overwriting existing files, when ``force``) and store the digest on the
+    course. Returns the digest, or "" when there is nothing to generate.
+    """
+    from .models import Course
+
+    if not course.thumbnail:
+        return ""
+    storage = course.thumbnail.storage
+    with course.thumbnail.open("rb") as original:
+        data = original.read()
+    digest = hashlib.sha256(data).hexdigest()[:20]
+
+    image = None
+    for variant, size in VARIANTS.items():
+        name = variant_name(digest, variant)
+        if storage.exists(name):
+            if not force:
+                continue
+            # save() no sobrescribe: añadiría un sufijo al nombre
+            storage.delete(name)
+        if image is None:
+            image = ImageOps.exif_transpose(Image.open(BytesIO(data))).convert("RGB")
+        storage.save(name, ContentFile(render_variant(image, size)))
+
+    # update() para no disparar post_save (y con ello updated_at/caché) otra vez
+    Course.objects.filter(pk=course.pk).update(thumbnail_digest=digest)
+    course.thumbnail_digest = digest
+    return digest
+
+
+def failure_key(course):
+    # Por curso e imagen: subir otra imagen vuelve a intentarlo sin esperar
+    name = hashlib.sha256(course.thumbnail.name.encode()).hexdigest()[:20]
+    return f"lms:thumbnails:failed:{course.pk}:{name}"
+
+
+def try_generate_variants(course):
+    """
+    ``generate_variants`` that logs a failure and skips the image for
+    ``RETRY_SECONDS`` afterwards. Returns the digest, or "" on failure.
+    """
+    key = failure_key(course)
+    if cache.get(key):
+        return ""
+    try:
+        return generate_variants(course)
+    except GENERATION_ERRORS:
+        logger.exception("Could not generate thumbnails for course %s", course.pk)
+        cache.set(key, True, RETRY_SECONDS)
+        return ""
+
+
+def thumbnail_url(course, variant="card", lazy=True):
+    """
+    URL of a thumbnail variant; generates the variants on first use when
+    ``lazy`` and falls back to the original image if that fails.
+    """
+    if not course.thumbnail:
+        return None
+    digest = course.thumbnail_digest
+    if not digest and lazy:
+        digest = try_generate_variants(course)
+    if not digest:
+        return course.thumbnail.url
+    return course.thumbnail.storage.url(variant_name(digest, variant))
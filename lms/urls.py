@@ -1,15 +1,20 @@
 # lms/urls.py
 from rest_framework.routers import DefaultRouter
 from .views import (
+    CatalogViewSet,
     CourseViewSet, 
     LessonViewSet, 
     EnrollmentViewSet, 
     ReviewViewSet,
-    list_courses_ajax
+    list_courses_ajax,
+    my_dashboard,
+    profiling_report,
 )
 from django.urls import path
+from . import async_views
 
 router = DefaultRouter()
+router.register(r"catalog", CatalogViewSet, basename="catalog")
 router.register(r"courses", CourseViewSet)
 router.register(r"lessons", LessonViewSet)
 router.register(r"enrollments", EnrollmentViewSet)
@@ -19,4 +24,7 @@ urlpatterns = router.urls
 
 urlpatterns += [
     path('ajax/courses/', list_courses_ajax, name='list_courses_ajax'),
+    path('dashboard/', my_dashboard, name='my_dashboard'),
+    path('async/courses/', async_views.list_courses, name='async_list_courses'),
+    path('profiling/', profiling_report, name='profiling_report'),
 ]
\ No newline at end of file
@@ -1,22 +1,47 @@
 # lms/views.py
-from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from .models import Course, Lesson, Enrollment, Review
-from .serializers import CourseSerializer, LessonSerializer, EnrollmentSerializer, ReviewSerializer
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from . import cache, catalog, conditional, dashboard, enrollments, exports, profiling, progress
+from .throttling import throttle
+from .cache import CachedResponseMixin
+from .replicas import ReplicaReadMixin, use_replica
+from .models import Course, CourseStats, Lesson, Enrollment, Review
+from .serializers import (
+    CourseSerializer, DashboardEnrollmentSerializer, LessonSerializer, LessonReorderSerializer, EnrollmentSerializer,
+    LessonProgressSerializer, RatingSummarySerializer, ReviewSerializer,
+)
+from django.core.paginator import Paginator
+from django.utils.cache import patch_vary_headers
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, Http404
+from django.http import JsonResponse, Http404, StreamingHttpResponse
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.conf import settings
 from allauth.account.models import EmailAddress
 
+@use_replica
 def index(request):
-    courses = Course.objects.all()
+    """
+    Published course catalog, paginated and sortable with ``?sort=``
+    (see catalog.SORTS).
+    """
+    sort = request.GET.get('sort') if request.GET.get('sort') in catalog.SORTS else catalog.DEFAULT_SORT
+    page = Paginator(catalog.catalog_queryset(sort), catalog.PAGE_SIZE).get_page(request.GET.get('page'))
     context = {
-        'courses': courses
+        'courses': catalog.with_content_versions(page.object_list),
+        'page_obj': page,
+        'sort': sort,
+        'sorts': catalog.SORT_LABELS,
+        'fragment_timeout': cache.fragment_timeout(),
     }
-    return render(request, 'index.html', context)
+    return profiling.render(request, 'index.html', context)
 
+@use_replica
+@conditional.conditional_course_page
 def course_detail(request, slug):
     """
     View to display complete course information including:
@@ -24,11 +49,16 @@ def course_detail(request, slug):
     - Lessons list
     - Reviews and ratings
     - Enrollment status (if user is authenticated)
+
+    The lesson list and the reviews are cached template fragments keyed on
+    the course content version, so on a hit their querysets never run.
+    Revalidations are answered with 304 (see conditional.py).
     """
     course = get_object_or_404(
-        Course.objects.select_related('instructor').prefetch_related('lessons', 'reviews__user'),
+        Course.objects.select_related('instructor', 'stats'),
         slug=slug
     )
+    stats = course.get_stats()
     
     # Get lessons ordered by order field
     lessons = course.lessons.all().order_by('order', 'id')
@@ -36,13 +66,6 @@ def course_detail(request, slug):
     # Get reviews with user information
     reviews = course.reviews.all().select_related('user')
     
-    # Calculate average rating
-    if reviews.exists():
-        avg_rating = sum(review.rating for review in reviews) / reviews.count()
-        avg_rating = round(avg_rating, 1)
-    else:
-        avg_rating = None
-    
     # Check if user is enrolled (if authenticated)
     is_enrolled = False
     enrollment = None
@@ -55,26 +78,25 @@ def course_detail(request, slug):
         except Enrollment.DoesNotExist:
             pass
     
-    # Calculate total course duration
-    total_duration = sum(lesson.duration_minutes for lesson in lessons)
-    
-    # Get enrollment count
-    enrollment_count = course.enrollments.count()
-    
+    # Counters come from the denormalized CourseStats row
     context = {
         'course': course,
         'lessons': lessons,
         'reviews': reviews,
-        'avg_rating': avg_rating,
-        'total_reviews': reviews.count(),
+        'avg_rating': stats.avg_rating,
+        'total_reviews': stats.review_count,
+        'total_lessons': stats.lesson_count,
         'is_enrolled': is_enrolled,
         'enrollment': enrollment,
         'is_instructor': is_instructor,
-        'total_duration': total_duration,
-        'enrollment_count': enrollment_count,
+        'total_duration': stats.total_duration,
+        'enrollment_count': stats.enrollment_count,
+        'rating_breakdown': stats.rating_breakdown,
+        'content_version': cache.content_versions([course.pk])[course.pk],
+        'fragment_timeout': cache.fragment_timeout(),
     }
     
-    return render(request, 'course_detail.html', context)
+    return profiling.render(request, 'course_detail.html', context)
 
 @login_required
 def enroll_course(request, slug):
@@ -93,11 +115,11 @@ def enroll_course(request, slug):
         messages.warning(request, 'No puedes inscribirte en tu propio curso.')
         return redirect('course_detail', slug=slug)
     
-    # Check if user is already enrolled
-    enrollment, created = Enrollment.objects.get_or_create(
-        user=request.user,
-        course=course
-    )
+    try:
+        enrollment, created = enrollments.enroll(request.user, course)
+    except enrollments.CourseFull:
+        messages.error(request, f'"{course.title}" no tiene plazas disponibles.')
+        return redirect('course_detail', slug=slug)
     
     if created:
         messages.success(request, f'¡Te has inscrito exitosamente en "{course.title}"!')
@@ -111,33 +133,27 @@ def my_courses(request):
     """
     View to display all courses the logged-in user is enrolled in.
     Shows enrollment date, completion status, and course details.
+    Same single query as the dashboard API (see dashboard.py).
     """
-    enrollments = Enrollment.objects.filter(
-        user=request.user
-    ).select_related('course', 'course__instructor').prefetch_related('course__lessons').order_by('-enrolled_at')
-    
-    # Calculate stats for each enrollment
-    courses_data = []
-    for enrollment in enrollments:
-        course = enrollment.course
-        lessons = course.lessons.all()
-        total_lessons = lessons.count()
-        total_duration = sum(lesson.duration_minutes for lesson in lessons)
-        
-        courses_data.append({
+    courses_data = [
+        {
             'enrollment': enrollment,
-            'course': course,
-            'total_lessons': total_lessons,
-            'total_duration': total_duration,
-            'enrollment_count': course.enrollments.count(),
-        })
+            'course': enrollment.course,
+            'total_lessons': enrollment.lesson_total,
+            'total_duration': enrollment.duration_total,
+            'enrollment_count': enrollment.enrollment_total,
+            'completed_lessons': enrollment.completed_lessons,
+            'progress_percent': enrollment.progress_percent,
+        }
+        for enrollment in dashboard.dashboard_enrollments(request.user)
+    ]
     
     context = {
         'courses_data': courses_data,
         'total_enrolled': len(courses_data),
     }
     
-    return render(request, 'my_courses.html', context)
+    return profiling.render(request, 'my_courses.html', context)
 
 def registro(request):
     if request.method == 'POST':
@@ -191,13 +207,24 @@ def activate_account(request, user_id):
         messages.error(request, 'Error al activar la cuenta. Por favor, contacta al administrador.')
         return redirect('account_login')
 
-class CourseViewSet(viewsets.ModelViewSet):
-    queryset = Course.objects.select_related("instructor").all()
+class SparseFieldsMixin:
+    """
+    On list/retrieve, narrow the queryset to the columns and relations the
+    serializer's ``?fields=``/``?expand=`` choice needs.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            queryset = self.get_serializer().optimize_queryset(queryset)
+        return queryset
+
+class CourseViewSet(ReplicaReadMixin, SparseFieldsMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Course.objects.select_related("instructor", "stats").all()
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     filterset_fields = ["instructor"]
     search_fields = ["title", "description"]
-    ordering_fields = ["created_at", "updated_at"]
+    ordering_fields = ["created_at", "updated_at", "popularity", "rating_avg", "price"]
     ordering = ["-created_at"]
 
     def perform_create(self, serializer):
@@ -206,37 +233,282 @@ class CourseViewSet(viewsets.ModelViewSet):
         else:
             serializer.save()
 
-class LessonViewSet(viewsets.ModelViewSet):
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Conditional GET: a matching revalidation costs the single validator
+        query of conditional.py instead of the cache lookup and payload.
+        """
+        row = conditional.validator_row({"pk": kwargs[self.lookup_url_kwarg or self.lookup_field]})
+        if row is None:
+            return super().retrieve(request, *args, **kwargs)
+        validators = conditional.validators(
+            row, request.accepted_renderer.format, sorted(request.query_params.lists())
+        )
+        response = conditional.not_modified(request, *validators)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        else:
+            patch_vary_headers(response, ["Cookie", "Authorization"])
+        return conditional.set_validators(response, *validators)
+
+class CatalogViewSet(ReplicaReadMixin, SparseFieldsMixin, CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Published courses. ``?ordering=`` accepts popularity, rating_avg, price
+    and created_at (prefix ``-`` for descending); ``id`` is always appended
+    as a tiebreak, and the keyset cursor (``?paginate=cursor``) carries both
+    values so pages over tied sort keys neither repeat nor skip rows.
+    """
+    queryset = catalog.published_courses().select_related("instructor", "stats")
+    serializer_class = CourseSerializer
+    permission_classes = [AllowAny]
+    filterset_fields = ["instructor"]
+    search_fields = ["title", "description"]
+    ordering_fields = ["popularity", "rating_avg", "price", "created_at"]
+    ordering = list(catalog.SORTS[catalog.DEFAULT_SORT])
+
+    def get_cache_model_name(self):
+        return "course"
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        ordering = [str(field) for field in queryset.query.order_by]
+        if ordering and not any(field.lstrip("-") in ("id", "pk") for field in ordering):
+            queryset = queryset.order_by(*ordering, "-id" if ordering[0].startswith("-") else "id")
+        return queryset
+
+class LessonViewSet(ReplicaReadMixin, SparseFieldsMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Lesson.objects.select_related("course").all()
     serializer_class = LessonSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cache_list_scope = "course"
     filterset_fields = ["course"]
     search_fields = ["title", "content"]
     ordering_fields = ["order", "created_at"]
     ordering = ["order"]
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
-    queryset = Enrollment.objects.select_related("user", "course").all()
+    @staticmethod
+    def lesson_ids(value, field):
+        """
+        ``value`` validated as a non-empty list of lesson ids, or a 400 under ``field``.
+        """
+        try:
+            return serializers.ListField(child=serializers.IntegerField(), allow_empty=False).run_validation(value)
+        except ValidationError as exc:
+            raise ValidationError({field: exc.detail})
+
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Bulk lesson writes in one transaction:
+        - POST: list of lessons to create
+        - PATCH: list of partial lessons, each with its "id"
+        - DELETE: {"ids": [...]}
+        """
+        if request.method == "DELETE":
+            ids = self.lesson_ids(request.data.get("ids") if isinstance(request.data, dict) else None, "ids")
+            deleted, _ = progress.delete_lessons(Lesson.objects.filter(pk__in=ids))
+            return Response({"deleted": deleted}, status=status.HTTP_200_OK)
+
+        if request.method == "PATCH":
+            if not isinstance(request.data, list) or not all(isinstance(item, dict) for item in request.data):
+                raise ValidationError("Expected a list of lessons.")
+            ids = self.lesson_ids([item.get("id") for item in request.data], "id")
+            if len(set(ids)) != len(ids):
+                raise ValidationError({"id": ["Each lesson can appear only once."]})
+            lessons = Lesson.objects.select_related("course").in_bulk(ids)
+            missing = [pk for pk in ids if pk not in lessons]
+            if missing:
+                raise ValidationError({"id": [f"Lessons not found: {missing}"]})
+            serializer = self.get_serializer([lessons[pk] for pk in ids], data=request.data, many=True, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+            return Response(serializer.data)
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], serializer_class=LessonReorderSerializer)
+    def reorder(self, request):
+        """
+        Atomically rewrite the order of every lesson of a course:
+        {"course": 1, "lessons": [ids in the new order]}
+        """
+        serializer = LessonReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lessons = serializer.save()
+        return Response({"course": serializer.validated_data["course"].pk, "lessons": [lesson.pk for lesson in lessons]})
+
+class EnrollmentViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    queryset = Enrollment.objects.select_related("user", "course", "course__stats").all()
     serializer_class = EnrollmentSerializer
     permission_classes = [IsAuthenticated]
+    ordering_fields = ["enrolled_at"]
+    ordering = ["-enrolled_at"]
 
     def perform_create(self, serializer):
-        if "user" not in serializer.validated_data:
-            serializer.save(user=self.request.user)
-        else:
+        user = serializer.validated_data.get("user", self.request.user)
+        try:
+            enrollment, created = enrollments.enroll(user, serializer.validated_data["course"])
+        except enrollments.CourseFull:
+            raise ValidationError({"course": ["This course has no seats left."]})
+        if not created:
+            raise ValidationError({"non_field_errors": ["The fields user, course must make a unique set."]}, code="unique")
+        serializer.instance = enrollment
+
+    @action(detail=True, methods=["get", "post"], serializer_class=LessonProgressSerializer)
+    def progress(self, request, pk=None):
+        """
+        GET: ids of the completed lessons.
+        POST: {"lessons": [ids], "completed": true} marks a batch of lessons.
+        """
+        enrollment = self.get_object()
+        if enrollment.user_id != request.user.pk and not request.user.is_staff:
+            raise PermissionDenied("You can only track your own progress.")
+        if request.method == "POST":
+            serializer = LessonProgressSerializer(data=request.data, context={"enrollment": enrollment})
+            serializer.is_valid(raise_exception=True)
             serializer.save()
+        return Response({
+            "enrollment": enrollment.pk,
+            "completed_lessons": enrollment.completed_lessons,
+            "progress_percent": enrollment.progress_percent,
+            "is_completed": enrollment.is_completed,
+            "lessons": progress.completed_lesson_ids(enrollment),
+        })
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=["get"], url_path="progress")
+    def my_progress(self, request):
+        """
+        Progress percentages for all of the current user's enrollments.
+        """
+        return Response(progress.user_progress(request.user))
+
+class ReviewViewSet(ReplicaReadMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Review.objects.select_related("user", "course").all()
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    cache_list_scope = "course"
     filterset_fields = ["course", "user"]
     ordering_fields = ["published_at"]
     ordering = ["-published_at"]
+    max_aggregate_courses = 100
+
+    def get_cache_tags(self):
+        if self.action in ("aggregate", "aggregates"):
+            # Los agregados salen de CourseStats, que se invalida junto con el curso
+            return [cache.object_tag("course", pk) for pk in self.aggregate_course_ids()]
+        return super().get_cache_tags()
+
+    def aggregate_course_ids(self):
+        param = "course" if self.action == "aggregate" else "courses"
+        value = self.request.query_params.get(param, "")
+        try:
+            course_ids = list(dict.fromkeys(int(item) for item in value.split(",") if item.strip()))
+        except ValueError:
+            course_ids = None
+        if not course_ids or (param == "course" and len(course_ids) > 1):
+            message = "Expected a course id." if param == "course" else "Expected comma-separated course ids."
+            raise ValidationError({param: [message]})
+        if len(course_ids) > self.max_aggregate_courses:
+            raise ValidationError({param: [f"At most {self.max_aggregate_courses} courses per request."]})
+        return course_ids
+
+    def course_stats(self, course_ids):
+        """
+        CourseStats rows in ``course_ids`` order, rebuilding missing ones;
+        ids of unknown courses are skipped.
+        """
+        stats = {row.course_id: row for row in CourseStats.objects.filter(course_id__in=course_ids)}
+        missing = [pk for pk in course_ids if pk not in stats]
+        if missing:
+            stats.update((row.course_id, row) for row in CourseStats.rebuild(course_ids=missing))
+        return [stats[pk] for pk in course_ids if pk in stats]
+
+    @action(detail=False, methods=["get"], serializer_class=RatingSummarySerializer)
+    def aggregate(self, request):
+        """
+        Review count, average and 1-5 star histogram of ``?course=<id>``.
+        """
+        def handler(request):
+            stats = self.course_stats(self.aggregate_course_ids())
+            if not stats:
+                raise NotFound("No Course matches the given query.")
+            return Response(RatingSummarySerializer(stats[0]).data)
+        return self.cached_response(handler, request)
+
+    @action(detail=False, methods=["get"], serializer_class=RatingSummarySerializer)
+    def aggregates(self, request):
+        """
+        Same as ``aggregate`` for ``?courses=1,2,3`` (up to 100) in one
+        request, in the given order; unknown ids are left out.
+        """
+        def handler(request):
+            stats = self.course_stats(self.aggregate_course_ids())
+            return Response(RatingSummarySerializer(stats, many=True).data)
+        return self.cached_response(handler, request)
 
+@throttle('export')
+@use_replica
 def list_courses_ajax(request):
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest' and request.method == 'GET':
-        courses = list(Course.objects.all().values(
-            'id', 'title', 'description'))
-        return JsonResponse({'courses': courses})
-    return JsonResponse({'error': 'bad request'}, status=400)
\ No newline at end of file
+    """
+    Course catalog as JSON for AJAX clients.
+
+    Optional query params:
+    - stream=json|ndjson: stream the rows through a server-side cursor
+    - fields=id,title,...: columns to include (see exports.COURSE_EXPORT_FIELDS)
+    - since=<ISO datetime>: only courses updated after it, for incremental sync
+    - chunk_size=<n>: rows fetched per round trip while streaming
+    """
+    if request.headers.get('X-Requested-With') != 'XMLHttpRequest' or request.method != 'GET':
+        return JsonResponse({'error': 'bad request'}, status=400)
+
+    try:
+        courses, fields = exports.course_export_query(request.GET)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    stream = request.GET.get('stream')
+    if not stream:
+        return JsonResponse({'courses': list(courses.values(*fields))})
+
+    try:
+        chunk_size = min(int(request.GET.get('chunk_size', exports.DEFAULT_CHUNK_SIZE)), exports.MAX_CHUNK_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'invalid chunk_size'}, status=400)
+    # El stream se consume después de salir de la vista: se fija ya la base (réplica o primaria)
+    courses = courses.using(courses.db)
+    rows = exports.iter_rows(courses, fields, chunk_size=max(chunk_size, 1))
+    if stream == 'ndjson':
+        return StreamingHttpResponse(exports.stream_ndjson(rows), content_type='application/x-ndjson')
+    if stream == 'json':
+        return StreamingHttpResponse(exports.stream_json(rows, 'courses'), content_type='application/json')
+    return JsonResponse({'error': 'invalid stream'}, status=400)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def my_dashboard(request):
+    """
+    Every course the current user is enrolled in, with its counters and the
+    user's progress, in one query (see dashboard.py). Replaces fetching
+    /api/enrollments/ plus the course and lessons of each enrollment.
+    """
+    enrollments = dashboard.dashboard_enrollments(request.user)
+    serializer = DashboardEnrollmentSerializer(enrollments, many=True, context={"request": request})
+    return Response({"count": len(serializer.data), "results": serializer.data})
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAdminUser])
+def profiling_report(request):
+    """
+    Aggregated query/latency profile per endpoint (admin only).
+    Requires LMS_PROFILING = True; DELETE resets the counters.
+    """
+    if request.method == "DELETE":
+        profiling.store.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response({
+        "enabled": getattr(settings, "LMS_PROFILING", False),
+        "endpoints": profiling.store.report(),
+    })
@@ -0,0 +1,103 @@
+# project/database.py
+"""
+``DATABASES`` built from environment variables (see .env.example).
+
+- ``DB_CONN_MAX_AGE``: seconds a connection is reused across requests
+  (``none`` = forever, ``0`` = one per request). Defaults to 60 for server
+  databases and 0 for SQLite.
+- ``DB_CONN_HEALTH_CHECKS``: ping a persistent connection before reusing it
+  (default on).
+- ``DB_CONNECT_TIMEOUT``: seconds to wait when opening a connection.
+- ``DB_POOL=1``: psycopg 3 connection pool (``DB_POOL_MIN_SIZE``,
+  ``DB_POOL_MAX_SIZE``, ``DB_POOL_TIMEOUT``). The pool replaces persistent
+  connections, so CONN_MAX_AGE is forced to 0; requires ``psycopg[pool]``
+  instead of psycopg2.
+- ``DB_REPLICA_HOST`` (or ``DB_REPLICA_NAME`` for SQLite): adds the
+  ``replica`` alias that ``lms.replicas.ReplicaRouter`` reads from. Other
+  ``DB_REPLICA_*`` settings default to the primary's.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE = "django.db.backends.sqlite3"
+POSTGRESQL = "django.db.backends.postgresql"
+REPLICA_ALIAS = "replica"
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def _int(env, name, default):
+    value = env.get(name) or ""
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured(f"{name} must be an integer, got {value!r}.")
+
+
+def _bool(env, name, default):
+    value = env.get(name) or ""
+    return value.lower() in TRUE_VALUES if value else default
+
+
+def _conn_max_age(env, engine):
+    value = (env.get("DB_CONN_MAX_AGE") or "").lower()
+    if value == "none":
+        return None
+    return _int(env, "DB_CONN_MAX_AGE", 0 if engine == SQLITE else 60)
+
+
+def _database(env, prefix, engine, defaults):
+    def get(name):
+        return env.get(f"{prefix}{name}") or defaults.get(name)
+
+    pool = _bool(env, "DB_POOL", False)
+    if pool and engine != POSTGRESQL:
+        raise ImproperlyConfigured("DB_POOL is only supported with PostgreSQL (psycopg 3).")
+
+    config = {
+        "ENGINE": engine,
+        "NAME": get("NAME"),
+        "CONN_MAX_AGE": _conn_max_age(env, engine),
+        "CONN_HEALTH_CHECKS": _bool(env, "DB_CONN_HEALTH_CHECKS", True),
+        "OPTIONS": {},
+    }
+    if engine == SQLITE:
+        return config
+
+    config.update(USER=get("USER"), PASSWORD=get("PASSWORD"), HOST=get("HOST"), PORT=get("PORT") or "")
+    timeout = _int(env, "DB_CONNECT_TIMEOUT", None)
+    if timeout is not None:
+        config["OPTIONS"]["connect_timeout"] = timeout
+    if pool:
+        config["OPTIONS"]["pool"] = {
+            "min_size": _int(env, "DB_POOL_MIN_SIZE", 2),
+            "max_size": _int(env, "DB_POOL_MAX_SIZE", 10),
+            "timeout": _int(env, "DB_POOL_TIMEOUT", 10),
+        }
+        # Django no admite conexiones persistentes junto con el pool
+        config["CONN_MAX_AGE"] = 0
+    return config
+
+
+def database_config(env, base_dir):
+    """
+    ``DATABASES`` for the given environment mapping.
+    """
+    # DB_ENGINE=django.db.backends.sqlite3 permite correr los tests sin PostgreSQL
+    engine = env.get("DB_ENGINE") or POSTGRESQL
+    if engine == SQLITE:
+        defaults = {"NAME": base_dir / "db.sqlite3"}
+    else:
+        defaults = {"NAME": "mydatabase", "USER": "user", "PASSWORD": "password", "HOST": "db"}
+    primary = _database(env, "DB_", engine, defaults)
+    databases = {"default": primary}
+
+    replica_key = "DB_REPLICA_NAME" if engine == SQLITE else "DB_REPLICA_HOST"
+    if env.get(replica_key):
+        inherited = {name: primary.get(name) for name in ("NAME", "USER", "PASSWORD", "HOST", "PORT")}
+        replica = _database(env, "DB_REPLICA_", engine, inherited)
+        # Los tests leen la réplica desde la base principal
+        replica["TEST"] = {"MIRROR": "default"}
+        databases[REPLICA_ALIAS] = replica
+    return databases
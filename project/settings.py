@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from .database import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework.authtoken',
     'django_filters',
     'drf_yasg',
     'django.contrib.sites',
@@ -52,6 +55,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Solo activo con una réplica configurada (ver lms/replicas.py)
+    'lms.replicas.PrimaryPinningMiddleware',
+    # Solo activo con LMS_PROFILING=1 (ver lms/profiling.py)
+    'lms.profiling.QueryProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -84,16 +91,55 @@ WSGI_APPLICATION = 'project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# Conexiones persistentes, pool, health checks y réplica opcional desde el entorno (ver project/database.py)
+DATABASES = database_config(os.environ, BASE_DIR)
+DATABASE_ROUTERS = ['lms.replicas.ReplicaRouter']
+# Segundos que las lecturas de un cliente van a la primaria tras escribir (ver lms/replicas.py)
+LMS_REPLICA_PIN_SECONDS = int(os.environ.get('LMS_REPLICA_PIN_SECONDS') or 5)
+
+
+# Cache (locmem por defecto; CACHE_BACKEND/CACHE_LOCATION para usar p.ej. FileBasedCache)
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'mydatabase',
-        'USER': 'user',
-        'PASSWORD': 'password',
-        'HOST': 'db',
+        'BACKEND': os.environ.get('CACHE_BACKEND') or 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION') or 'lms',
     }
 }
 
+# Caché de respuestas list/retrieve de la API (lms/cache.py)
+LMS_API_CACHE_TIMEOUT = 300
+# Fragmentos {% cache %} de index.html y course_detail.html; se invalidan por versión, no por tiempo
+LMS_FRAGMENT_CACHE_TIMEOUT = 3600
+
+
+# Tokens de la API ya resueltos (lms/authentication.py): LRU en proceso y, con CACHE_ALIAS, caché compartida
+LMS_TOKEN_AUTH_CACHE = {
+    'TIMEOUT': int(os.environ.get('LMS_TOKEN_AUTH_TIMEOUT') or 60),
+    'MAX_ENTRIES': 10000,
+    'CACHE_ALIAS': os.environ.get('LMS_TOKEN_AUTH_CACHE_ALIAS') or None,
+}
+
+# Rate limiting (lms/throttling.py): "n/periodo" = ráfaga de n y recarga de n por periodo
+LMS_THROTTLE_RATES = {
+    'anon': os.environ.get('LMS_THROTTLE_ANON') or '120/min',
+    'user': os.environ.get('LMS_THROTTLE_USER') or '600/min',
+    # throttle_scope de vistas concretas
+    'export': os.environ.get('LMS_THROTTLE_EXPORT') or '30/min',
+}
+# LocalMemoryStore cuenta por proceso; CacheStore (caché compartida) o SQLiteStore (un host) entre workers
+LMS_THROTTLE_STORE = {
+    'BACKEND': os.environ.get('LMS_THROTTLE_STORE') or 'lms.throttling.LocalMemoryStore',
+    'OPTIONS': {'path': os.environ['LMS_THROTTLE_PATH']} if os.environ.get('LMS_THROTTLE_PATH') else {},
+}
+
+
+# Vistas async (lms/async_views.py): queries independientes en hilos/conexiones propias
+LMS_ASYNC_PARALLEL_QUERIES = os.environ.get('LMS_ASYNC_PARALLEL_QUERIES') == '1'
+
+
+# Perfilado de queries/latencia por endpoint (lms/profiling.py)
+LMS_PROFILING = os.environ.get('LMS_PROFILING') == '1'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -138,19 +184,27 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework settings
 REST_FRAMEWORK = {
+    # Token primero: una petición con token no carga además la sesión
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'lms.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'lms.pagination.LmsPagination',
     'PAGE_SIZE': 20,
+    # Token buckets por IP (anónimos), por usuario y por throttle_scope de la vista (lms/throttling.py)
+    'DEFAULT_THROTTLE_CLASSES': [
+        'lms.throttling.AnonBucketThrottle',
+        'lms.throttling.UserBucketThrottle',
+        'lms.throttling.ScopedBucketThrottle',
+    ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
+        # Full-text (tsvector en PostgreSQL); va después de OrderingFilter para ordenar por relevancia
+        'lms.search.FullTextSearchFilter',
     ],
 }
 
@@ -18,9 +18,10 @@ from django.contrib import admin
 from django.urls import path, re_path, include, reverse_lazy
 from django.views.generic import RedirectView
 from rest_framework import permissions
+from rest_framework.authtoken.views import obtain_auth_token
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
-from lms import views as lms_views
+from lms import async_views, views as lms_views
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -45,12 +46,17 @@ urlpatterns = [
     path("course/<slug:slug>/enroll/", lms_views.enroll_course, name="enroll_course"),
     path("my-courses/", lms_views.my_courses, name="my_courses"),
 
+    # Variantes async de las vistas de catálogo (servir con project.asgi)
+    path("async/", async_views.index, name="async_home"),
+    path("async/course/<slug:slug>/", async_views.course_detail, name="async_course_detail"),
+
     # Account activation
     path("activate/<int:user_id>/", lms_views.activate_account, name="activate_account"),
 
     # API
     path("api/", include("lms.urls")),
     path("api-auth/", include("rest_framework.urls")),
+    path("api-token-auth/", obtain_auth_token, name="api_token_auth"),
 
     # Admin
     path("admin/", admin.site.urls),